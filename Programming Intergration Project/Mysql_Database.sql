@@ -77,7 +77,7 @@ CREATE TABLE Checkouts (
 CREATE INDEX idx_checkouts_bookid ON Checkouts(BookID);
 
 CREATE TABLE Ratings (
-    ReviewID INT PRIMARY KEY,
+    ReviewID INT AUTO_INCREMENT PRIMARY KEY,
     BookID VARCHAR(10),
     Rating INT,
     ReviewerID INT,
@@ -86,6 +86,21 @@ CREATE TABLE Ratings (
 CREATE INDEX idx_ratings_bookid ON Ratings(BookID);
 CREATE INDEX idx_ratings_reviewerid ON Ratings(ReviewerID);
 
+-- Per-book rating aggregates, rebuild with: python rebuild.py rating_summary
+CREATE TABLE book_rating_summary (
+    BookID VARCHAR(10) PRIMARY KEY,
+    RatingCount INT NOT NULL DEFAULT 0,
+    RatingSum INT NOT NULL DEFAULT 0,
+    Stars1 INT NOT NULL DEFAULT 0,
+    Stars2 INT NOT NULL DEFAULT 0,
+    Stars3 INT NOT NULL DEFAULT 0,
+    Stars4 INT NOT NULL DEFAULT 0,
+    Stars5 INT NOT NULL DEFAULT 0,
+    BayesianAverage DOUBLE,
+    FOREIGN KEY (BookID) REFERENCES Book(BookID)
+);
+CREATE INDEX idx_book_rating_summary_bayesian ON book_rating_summary(BayesianAverage);
+
 CREATE TABLE Award (
     AwardID INT AUTO_INCREMENT PRIMARY KEY,
     BookID VARCHAR(10),
@@ -107,6 +122,8 @@ CREATE TABLE OrderDetails (
     ItemID VARCHAR(30),
     ISBN VARCHAR(20),
 	Quantity INT NOT NULL DEFAULT 1,
+    -- Copy of Orders.SaleDate, the partition key (see migrations/0004_partition_orders.py)
+    SaleDate DATE,
     PRIMARY KEY (OrderID, ItemID),
     FOREIGN KEY (OrderID) REFERENCES Orders(OrderID),
     FOREIGN KEY (ISBN) REFERENCES Edition(ISBN)
@@ -127,6 +144,90 @@ ON DELETE CASCADE;
 -- Verify the changes
 SHOW CREATE TABLE OrderDetails;
 
+-- Denormalized read model for order search, one row per order line
+-- Rebuild with: python rebuild.py order_search
+CREATE TABLE order_search (
+    OrderID VARCHAR(30),
+    ItemID VARCHAR(30),
+    SaleDate DATE,
+    ISBN VARCHAR(20),
+    BookID VARCHAR(10),
+    TitleLower VARCHAR(255),
+    LastNameLower VARCHAR(50),
+    Quantity INT,
+    Price DECIMAL(6,2),
+    PRIMARY KEY (OrderID, ItemID)
+);
+CREATE INDEX idx_order_search_date_id ON order_search(SaleDate, OrderID);
+CREATE INDEX idx_order_search_title_date ON order_search(TitleLower, SaleDate, OrderID);
+CREATE INDEX idx_order_search_lastname_date ON order_search(LastNameLower, SaleDate, OrderID);
+CREATE INDEX idx_order_search_isbn_date ON order_search(ISBN, SaleDate, OrderID);
+CREATE INDEX idx_order_search_bookid ON order_search(BookID);
+
+-- Materialized revenue per day and ISBN, rebuild with: python rebuild.py daily_revenue
+CREATE TABLE daily_revenue (
+    SaleDate DATE,
+    ISBN VARCHAR(20),
+    Quantity INT NOT NULL DEFAULT 0,
+    OrderLines INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (SaleDate, ISBN)
+);
+CREATE INDEX idx_daily_revenue_isbn_date ON daily_revenue(ISBN, SaleDate);
+
+-- Background job queue, run by the API process or by: python worker.py
+CREATE TABLE jobs (
+    JobID INT AUTO_INCREMENT PRIMARY KEY,
+    Kind VARCHAR(50) NOT NULL,
+    Params TEXT,
+    Status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    Stage VARCHAR(100),
+    Progress INT NOT NULL DEFAULT 0,
+    Total INT,
+    Result TEXT,
+    Error TEXT,
+    CancelRequested BOOLEAN NOT NULL DEFAULT FALSE,
+    WorkerID VARCHAR(100),
+    CreatedBy INT,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    StartedAt DATETIME,
+    HeartbeatAt DATETIME,
+    FinishedAt DATETIME
+);
+CREATE INDEX idx_jobs_status_id ON jobs(Status, JobID);
+
+-- Versioned schema changes applied by: python migrate.py
+CREATE TABLE schema_migrations (
+    Version INT PRIMARY KEY,
+    Name VARCHAR(100) NOT NULL,
+    AppliedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    DurationMs INT
+);
+
+-- Every OrderID in use, hot or archived; keeps OrderIDs unique once Orders is partitioned
+CREATE TABLE order_ids (
+    OrderID VARCHAR(30) PRIMARY KEY
+);
+
+-- Cold orders moved out of Orders/OrderDetails by: python archive_orders.py
+CREATE TABLE orders_archive (
+    OrderID VARCHAR(30) PRIMARY KEY,
+    SaleDate DATE NOT NULL,
+    ArchivedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+CREATE INDEX idx_orders_archive_date_id ON orders_archive(SaleDate, OrderID);
+
+CREATE TABLE orderdetails_archive (
+    OrderID VARCHAR(30),
+    ItemID VARCHAR(30),
+    ISBN VARCHAR(20),
+    Quantity INT NOT NULL DEFAULT 1,
+    SaleDate DATE NOT NULL,
+    PRIMARY KEY (OrderID, ItemID),
+    FOREIGN KEY (OrderID) REFERENCES orders_archive(OrderID)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+CREATE INDEX idx_orderdetails_archive_isbn ON orderdetails_archive(ISBN, SaleDate);
+
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
     username VARCHAR(64) NOT NULL UNIQUE,
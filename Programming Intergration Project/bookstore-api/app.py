@@ -7,13 +7,13 @@ from models import db
 def create_app(config_class=Config):
     # Initialize Flask app
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
 
     # Enhanced CORS configuration 
     cors = CORS(app, 
         resources={r"/api/*": {
             "origins": ["http://localhost:3000"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
             "allow_headers": ["Content-Type", "Authorization"],
             "expose_headers": ["Content-Type", "Authorization"],
             "supports_credentials": True
@@ -22,6 +22,10 @@ def create_app(config_class=Config):
 
     db.init_app(app)
 
+    # Compress large JSON and export responses for clients that accept it
+    from utils.compression import init_compression
+    init_compression(app)
+
     # Add a test route to verify API is accessible
     @app.route('/api/v1/test', methods=['GET'])
     def test_route():
@@ -37,6 +41,13 @@ def create_app(config_class=Config):
     from routes.authors import authors_bp
     from routes.orders import orders_bp
     from routes.publishers import publishers_bp
+    from routes.suggest import suggest_bp
+    from routes.catalog import catalog_bp
+    from routes.analytics import analytics_bp
+    from routes.series import series_bp
+    from routes.awards import awards_bp
+    from routes.jobs import jobs_bp
+    from routes.health import health_bp
 
     # Register blueprints with the API prefix from Config
     app.register_blueprint(auth_bp, url_prefix=Config.API_PREFIX)
@@ -44,6 +55,35 @@ def create_app(config_class=Config):
     app.register_blueprint(authors_bp, url_prefix=Config.API_PREFIX)
     app.register_blueprint(orders_bp, url_prefix=Config.API_PREFIX)
     app.register_blueprint(publishers_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(suggest_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(catalog_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(analytics_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(series_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(awards_bp, url_prefix=Config.API_PREFIX)
+    app.register_blueprint(jobs_bp, url_prefix=Config.API_PREFIX)
+
+    # Probes for the load balancer live outside the API prefix
+    app.register_blueprint(health_bp)
+
+    # Load the catalog snapshot used by the serializers
+    from utils.catalog import catalog
+    with app.app_context():
+        catalog.get()
+
+    # Start the background job workers, or leave the queue to worker.py
+    from utils.jobs import job_runner
+    if app.config['JOBS_IN_PROCESS'] and app.config['JOB_WORKERS'] > 0:
+        job_runner.start(app, app.config['JOB_WORKERS'])
+
+    # Replay the order spool and start flushing it when write-behind is on
+    from utils.order_buffer import order_buffer
+    if app.config['ORDER_WRITE_BEHIND']:
+        order_buffer.start(app)
+
+    # Capture the query workload for index_advisor.py when QUERY_CAPTURE_PATH is set
+    from utils.query_capture import query_capture
+    with app.app_context():
+        query_capture.init_app(app, db.engine)
 
     # Add error handler for debugging
     @app.errorhandler(Exception)
@@ -56,6 +96,14 @@ def create_app(config_class=Config):
         
         return jsonify({"message": f"Server error: {str(e)}"}), 500
 
+    # Warm the pool, mappers, caches and common queries in the background;
+    # /health/ready reports ready once this has finished
+    from utils.warmup import warmup
+    if app.config['WARMUP_ENABLED']:
+        warmup.start(app)
+    else:
+        warmup.skip()
+
     if __name__ == "__main__":
         # Print all registered routes for debugging
         print("\nRegistered routes:")
@@ -0,0 +1,47 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.archive import archive_cutoff, archive_orders
+from utils.bulk import parse_date
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+def archive(before, days, batch_size):
+    """
+    Move orders sold before the cutoff into the compressed archive tables
+    """
+    def progress(done, total):
+        print(f"  orders: {done}/{total}")
+    
+    with app.app_context():
+        cutoff = before or archive_cutoff(days)
+        print(f"Archiving orders sold before {cutoff.isoformat()}...")
+        done = archive_orders(cutoff, batch_size, progress=progress)
+        print(f"Archived {done} orders.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move cold orders into the orders_archive tables")
+    cutoff = parser.add_mutually_exclusive_group()
+    cutoff.add_argument('--before', help="archive orders sold before this date (YYYY-MM-DD)")
+    cutoff.add_argument('--days', type=int, help=f"archive orders older than this many days (default: ORDER_ARCHIVE_DAYS, {Config.ORDER_ARCHIVE_DAYS})")
+    parser.add_argument('--batch-size', type=int, help=f"orders moved per transaction (default: ORDER_ARCHIVE_BATCH, {Config.ORDER_ARCHIVE_BATCH})")
+    args = parser.parse_args()
+    
+    try:
+        before = parse_date(args.before)
+    except ValueError:
+        parser.error("--before must be a date in YYYY-MM-DD format")
+    
+    archive(before, args.days, args.batch_size)
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import argparse
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from config import Config
+from utils.compression import GzipCodec, BrotliCodec, ZstdCodec, brotli, zstandard
+
+DEFAULT_PATHS = [
+    '/books?per_page=100',
+    '/books/search?q=the&per_page=100',
+    '/orders?per_page=100'
+]
+
+def codecs_to_try():
+    codecs = [GzipCodec(level) for level in (1, 6, 9)]
+    if brotli is not None:
+        codecs += [BrotliCodec(quality) for quality in (1, 4, 6, 11)]
+    if zstandard is not None:
+        codecs += [ZstdCodec(level) for level in (1, 3, 9)]
+    return codecs
+
+def fetch(paths, username, password):
+    """
+    Uncompressed bodies of the given API paths, fetched through the app in-process
+    """
+    app = create_app()
+    client = app.test_client()
+    
+    response = client.post(f"{Config.API_PREFIX}/auth/login", json={'username': username, 'password': password})
+    if response.status_code != 200:
+        sys.exit(f"Login failed: {response.get_json()}")
+    headers = {
+        'Authorization': f"Bearer {response.get_json()['access_token']}",
+        'Accept-Encoding': 'identity'
+    }
+    
+    bodies = {}
+    for path in paths:
+        response = client.get(Config.API_PREFIX + path, headers=headers)
+        if response.status_code != 200:
+            print(f"Skipping {path}: HTTP {response.status_code}")
+            continue
+        bodies[path] = response.get_data()
+    return bodies
+
+def bench(bodies, bandwidth_mbit, repeat):
+    """
+    Per codec and level: CPU time to compress, size ratio and the net time
+    saved on a link of bandwidth_mbit (transfer saved minus CPU spent)
+    """
+    bytes_per_second = bandwidth_mbit * 1_000_000 / 8
+    
+    for path, body in bodies.items():
+        print(f"\n{path}: {len(body) / 1024:.1f} KiB uncompressed")
+        print(f"  {'codec':<10}{'size KiB':>10}{'ratio':>8}{'cpu ms':>9}{'MB/s':>9}{'saved ms':>10}")
+        
+        for codec in codecs_to_try():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                compressed = codec.compress(body)
+            cpu = (time.perf_counter() - started) / repeat
+            
+            level = getattr(codec, 'level', getattr(codec, 'quality', ''))
+            transfer_saved = (len(body) - len(compressed)) / bytes_per_second
+            print(
+                f"  {codec.name + '-' + str(level):<10}"
+                f"{len(compressed) / 1024:>10.1f}"
+                f"{len(body) / max(len(compressed), 1):>8.1f}"
+                f"{cpu * 1000:>9.2f}"
+                f"{len(body) / cpu / 1_000_000 if cpu else 0:>9.0f}"
+                f"{(transfer_saved - cpu) * 1000:>10.1f}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare response compression codecs on real API payloads")
+    parser.add_argument('paths', nargs='*', help=f"API paths to fetch (default: {', '.join(DEFAULT_PATHS)})")
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--bandwidth', type=float, default=20, help="link speed in Mbit/s used for the saved-time column")
+    parser.add_argument('--repeat', type=int, default=5, help="compressions per codec, the mean is reported")
+    args = parser.parse_args()
+    
+    bench(fetch(args.paths or DEFAULT_PATHS, args.username, args.password), args.bandwidth, args.repeat)
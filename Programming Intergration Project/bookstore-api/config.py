@@ -27,7 +27,11 @@ class Config:
     DB_PORT = os.getenv("DB_PORT", "3306")
     DB_NAME = os.getenv("DB_NAME", "bookstore")
     
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # DATABASE_URL overrides the MySQL settings, e.g. sqlite:///bookstore.db for local runs
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "DATABASE_URL",
+        f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default_secret_key_please_change")
@@ -36,4 +40,103 @@ class Config:
     
     API_TITLE = "BookStore API"
     API_VERSION = "v1"
-    API_PREFIX = "/api/v1"
\ No newline at end of file
+    API_PREFIX = "/api/v1"
+    
+    # In-process catalog snapshot used by the serializers
+    CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "true").lower() == "true"
+    CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", "60"))
+    
+    # Virtual votes at the global mean used for Bayesian rating averages
+    RATING_PRIOR_WEIGHT = int(os.getenv("RATING_PRIOR_WEIGHT", "10"))
+    
+    # How often the cached analytics snapshots check the source tables for changes
+    CHECKOUT_ANALYTICS_CHECK_SECONDS = int(os.getenv("CHECKOUT_ANALYTICS_CHECK_SECONDS", "30"))
+    SALES_CUBE_CHECK_SECONDS = int(os.getenv("SALES_CUBE_CHECK_SECONDS", "30"))
+    
+    # Most orders returned by one batch lookup
+    ORDER_BATCH_MAX = int(os.getenv("ORDER_BATCH_MAX", "100"))
+    
+    # Startup warm-up (utils.warmup), run in the background by create_app; /health/ready
+    # answers 503 until it has finished. Steps: pool, mappers, catalog, suggest,
+    # sales_cube, checkout_analytics, requests (GET each of WARMUP_PATHS once)
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_STEPS = [step.strip() for step in os.getenv(
+        "WARMUP_STEPS", "pool,mappers,catalog,suggest,sales_cube,checkout_analytics,requests"
+    ).split(",") if step.strip()]
+    WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "5"))
+    WARMUP_PATHS = [path.strip() for path in os.getenv(
+        "WARMUP_PATHS",
+        "/api/v1/books?page=1,/api/v1/books/bestsellers?days=30,/api/v1/authors?page=1,"
+        "/api/v1/orders?page=1,/api/v1/orders/summary"
+    ).split(",") if path.strip()]
+    
+    # Health probes (/health/live, /health/ready, /health/deep): how long a deep
+    # report is reused, and the limits past which it reports "degraded"
+    HEALTH_DEEP_CACHE_SECONDS = float(os.getenv("HEALTH_DEEP_CACHE_SECONDS", "5"))
+    HEALTH_DB_LATENCY_MAX_MS = float(os.getenv("HEALTH_DB_LATENCY_MAX_MS", "250"))
+    HEALTH_POOL_SATURATION_MAX = float(os.getenv("HEALTH_POOL_SATURATION_MAX", "0.9"))
+    HEALTH_JOB_BACKLOG_MAX_SECONDS = int(os.getenv("HEALTH_JOB_BACKLOG_MAX_SECONDS", "300"))
+    HEALTH_REPLICA_LAG_MAX_SECONDS = int(os.getenv("HEALTH_REPLICA_LAG_MAX_SECONDS", "30"))
+    
+    # Longest a request waits for an identical in-flight request (utils.single_flight)
+    # before computing the response itself
+    SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "30"))
+    
+    # Background jobs: in-process worker pool, queue polling and stale-worker detection
+    JOBS_IN_PROCESS = os.getenv("JOBS_IN_PROCESS", "true").lower() == "true"
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_SECONDS = int(os.getenv("JOB_POLL_SECONDS", "5"))
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+    JOB_EXPORT_DIR = os.getenv("JOB_EXPORT_DIR", "exports")
+    
+    # Append the SELECTs the API runs to a JSON lines workload for index_advisor.py
+    QUERY_CAPTURE_PATH = os.getenv("QUERY_CAPTURE_PATH", "")
+    QUERY_CAPTURE_SAMPLE = float(os.getenv("QUERY_CAPTURE_SAMPLE", "1.0"))
+    
+    # Schema migrations (python migrate.py): backfill batch size, how long online
+    # DDL waits for a metadata lock, how often index build progress is reported
+    MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+    MIGRATION_LOCK_WAIT_SECONDS = int(os.getenv("MIGRATION_LOCK_WAIT_SECONDS", "5"))
+    MIGRATION_PROGRESS_SECONDS = int(os.getenv("MIGRATION_PROGRESS_SECONDS", "5"))
+    
+    # Range partitioning of orders/orderdetails by SaleDate (migration 0004, MySQL):
+    # period per partition (month or year) and how many future periods to keep ready
+    ORDER_PARTITION_INTERVAL = os.getenv("ORDER_PARTITION_INTERVAL", "month")
+    ORDER_PARTITIONS_AHEAD = int(os.getenv("ORDER_PARTITIONS_AHEAD", "3"))
+    
+    # Cold order archiving (python archive_orders.py): orders older than this many
+    # days move to the compressed orders_archive tables, this many orders per batch
+    ORDER_ARCHIVE_DAYS = int(os.getenv("ORDER_ARCHIVE_DAYS", "365"))
+    ORDER_ARCHIVE_BATCH = int(os.getenv("ORDER_ARCHIVE_BATCH", "1000"))
+    
+    # Opt-in write-behind for create_order: spool locally, flush in batches
+    # Processes sharing ORDER_SPOOL_DIR each spool into a locked subdirectory
+    ORDER_WRITE_BEHIND = os.getenv("ORDER_WRITE_BEHIND", "false").lower() == "true"
+    ORDER_SPOOL_DIR = os.getenv("ORDER_SPOOL_DIR", "spool")
+    ORDER_SPOOL_FSYNC = os.getenv("ORDER_SPOOL_FSYNC", "true").lower() == "true"
+    ORDER_FLUSH_MS = int(os.getenv("ORDER_FLUSH_MS", "50"))
+    ORDER_FLUSH_BATCH = int(os.getenv("ORDER_FLUSH_BATCH", "500"))
+    
+    # bcrypt cost for new hashes; older hashes are upgraded at the next login
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    
+    # Password hashing process pool and its queue bound
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+    PASSWORD_QUEUE_MAX = int(os.getenv("PASSWORD_QUEUE_MAX", "32"))
+    PASSWORD_TIMEOUT_SECONDS = int(os.getenv("PASSWORD_TIMEOUT_SECONDS", "10"))
+    
+    # Login attempts allowed per username and per client IP: burst, then per minute
+    # A successful login gives the username its attempts back; 0 turns a limit off
+    LOGIN_USERNAME_BURST = int(os.getenv("LOGIN_USERNAME_BURST", "5"))
+    LOGIN_USERNAME_PER_MINUTE = int(os.getenv("LOGIN_USERNAME_PER_MINUTE", "5"))
+    LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+    LOGIN_IP_PER_MINUTE = int(os.getenv("LOGIN_IP_PER_MINUTE", "30"))
+    
+    # Response compression, br and zstd are used when the brotli / zstandard packages are installed
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_ALGORITHMS = os.getenv("COMPRESSION_ALGORITHMS", "zstd,br,gzip")
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    COMPRESSION_MIMETYPES = ('application/json', 'text/csv', 'text/plain', 'text/html')
\ No newline at end of file
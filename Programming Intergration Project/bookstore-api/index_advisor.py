@@ -0,0 +1,114 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.jobs import REBUILDERS
+from utils.index_advisor import (
+    load_workload, analyze, migration_script, generate_dataset, is_generated_dataset
+)
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+def apply_schema(path):
+    """
+    Run the CREATE TABLE / CREATE INDEX statements of a schema file such as
+    ../Mysql_Database.sql, so the dataset gets the production indexes
+    """
+    with open(path, encoding='utf-8') as schema:
+        statements = [statement.strip() for statement in schema.read().split(';')]
+    
+    with db.engine.begin() as connection:
+        for statement in statements:
+            if statement.upper().startswith(('CREATE TABLE', 'CREATE INDEX', 'CREATE UNIQUE INDEX', 'ALTER TABLE')):
+                connection.exec_driver_sql(statement)
+
+def generate(scale, seed, schema):
+    """
+    Fill an empty scratch database with a synthetic dataset to analyze against
+    """
+    def progress(name, done, total):
+        print(f"  {name}: {done}/{total}")
+    
+    with app.app_context():
+        if schema:
+            print(f"Applying schema '{schema}'...")
+            apply_schema(schema)
+        db.create_all()
+        
+        print(f"Generating dataset at scale {scale}...")
+        counts = generate_dataset(scale, seed, progress=progress)
+        for name, rows in counts.items():
+            print(f"  {name}: {rows} rows")
+        
+        for name in sorted(REBUILDERS):
+            print(f"Rebuilding '{name}'...")
+            REBUILDERS[name]()
+        print("Dataset ready.")
+
+def advise(workload, output, max_candidates, min_gain, repeat, force):
+    """
+    Replay the workload, measure index adds and drops, write the migration script
+    """
+    def progress(stage, done, total):
+        print(f"  {stage}: {done}/{total}", end='\r' if done < total else '\n')
+    
+    with app.app_context():
+        with db.engine.connect() as connection:
+            if not is_generated_dataset(connection) and not force:
+                sys.exit("This database was not filled by 'index_advisor.py generate'. "
+                         "The analysis creates and drops indexes; pass --force to run it anyway.")
+            
+            statements, skipped = load_workload(workload, connection.dialect.name)
+            if not statements:
+                sys.exit(f"No {connection.dialect.name} statements in '{workload}' ({skipped} for other databases).")
+            print(f"Replaying {len(statements)} statements from '{workload}'...")
+            
+            accepted, rejected = analyze(
+                connection, statements,
+                max_candidates=max_candidates, min_gain_pct=min_gain, repeat=repeat, progress=progress
+            )
+            connection.commit()
+    
+    print(f"\n{'action':<6} {'index':<45} {'gain ms':>10} {'gain %':>8}  note")
+    for proposal in accepted + rejected:
+        status = 'proposed' if proposal in accepted else (f"error: {proposal.error}" if proposal.error else 'rejected')
+        print(f"{proposal.action:<6} {proposal.table + '(' + ', '.join(proposal.columns) + ')':<45} "
+              f"{proposal.gain_ms:>10.2f} {proposal.gain_pct:>7.1f}%  {status}, {proposal.reason}")
+    
+    with open(output, 'w', encoding='utf-8') as migration:
+        migration.write(migration_script(accepted, workload, statements))
+    print(f"\nWrote {len(accepted)} proposals to '{output}'.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propose index changes from a captured query workload (QUERY_CAPTURE_PATH)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    generate_parser = commands.add_parser('generate', help="fill an empty scratch database with a synthetic dataset")
+    generate_parser.add_argument('--scale', type=int, default=1, help="1 = 1,000 books and 20,000 orders (default: 1)")
+    generate_parser.add_argument('--seed', type=int, default=42)
+    generate_parser.add_argument('--schema', help="schema file to create the tables and indexes from, e.g. ../Mysql_Database.sql")
+    
+    analyze_parser = commands.add_parser('analyze', help="replay a workload and write a migration script")
+    analyze_parser.add_argument('--workload', required=True, help="JSON lines file written by QUERY_CAPTURE_PATH")
+    analyze_parser.add_argument('--output', default='index_migration.sql')
+    analyze_parser.add_argument('--max-candidates', type=int, default=30)
+    analyze_parser.add_argument('--min-gain', type=float, default=10.0, help="percent of the affected workload an index must save (default: 10)")
+    analyze_parser.add_argument('--repeat', type=int, default=3, help="timing runs per sample when EXPLAIN ANALYZE is unavailable")
+    analyze_parser.add_argument('--force', action='store_true', help="analyze a database not filled by 'generate'")
+    args = parser.parse_args()
+    
+    if args.command == 'generate':
+        generate(args.scale, args.seed, args.schema)
+    else:
+        advise(args.workload, args.output, args.max_candidates, args.min_gain, args.repeat, args.force)
@@ -3,6 +3,7 @@ import sys
 from flask import Flask
 from config import Config
 from models import db
+from utils.migrations import MigrationRunner
 
 # Ensure the correct path is added to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,10 +17,10 @@ db.init_app(app)
 
 def init_db():
     """
-    Create all tables in the database.
+    Create all tables in the database by applying the schema migrations.
     """
     with app.app_context():
-        db.create_all()
+        MigrationRunner(app).upgrade()
         print("Database initialized successfully.")
 
 if __name__ == "__main__":
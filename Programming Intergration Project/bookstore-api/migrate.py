@@ -0,0 +1,63 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.migrations import MigrationRunner, MigrationError
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+def progress(stage, done, total):
+    if total:
+        print(f"  {stage}: {done}/{total} ({100 * done // total}%)")
+    elif done is not None:
+        print(f"  {stage}: {done}")
+    else:
+        print(f"  {stage}")
+
+def status():
+    with app.app_context():
+        for migration, applied in MigrationRunner(app).status():
+            state = f"applied {applied.AppliedAt:%Y-%m-%d %H:%M} ({applied.DurationMs} ms)" if applied else "pending"
+            print(f"{migration.version:04d}_{migration.name:<30} {state:<36} {migration.description}")
+
+def upgrade(target):
+    with app.app_context():
+        done = MigrationRunner(app, progress=progress).upgrade(target)
+        print(f"Applied {len(done)} migrations." if done else "Database is up to date.")
+
+def downgrade(target):
+    with app.app_context():
+        done = MigrationRunner(app, progress=progress).downgrade(target)
+        print(f"Reverted {len(done)} migrations.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations from the migrations directory")
+    commands = parser.add_subparsers(dest='command')
+    
+    commands.add_parser('status', help="list migrations and whether they are applied")
+    upgrade_parser = commands.add_parser('upgrade', help="apply pending migrations (default command)")
+    upgrade_parser.add_argument('--to', type=int, help="last version to apply (default: all)")
+    downgrade_parser = commands.add_parser('downgrade', help="revert migrations newer than a version")
+    downgrade_parser.add_argument('--to', type=int, required=True, help="version to go back to, 0 for none")
+    args = parser.parse_args()
+    
+    try:
+        if args.command == 'status':
+            status()
+        elif args.command == 'downgrade':
+            downgrade(args.to)
+        else:
+            upgrade(getattr(args, 'to', None))
+    except MigrationError as e:
+        sys.exit(str(e))
@@ -0,0 +1,9 @@
+"""
+Create the model tables missing from the database
+
+Databases created from Mysql_Database.sql or by db.create_all() already have
+them; this only fills in tables added since.
+"""
+
+def upgrade(op):
+    op.create_all()
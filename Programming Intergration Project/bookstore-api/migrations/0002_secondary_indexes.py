@@ -0,0 +1,27 @@
+"""
+Secondary indexes of Mysql_Database.sql that the models do not declare
+
+Databases created by db.create_all() lack them. Indexes that are a prefix of
+another index or of the primary key are left out, as are the expression and
+FULLTEXT indexes, which only exist on MySQL.
+"""
+
+INDEXES = [
+    ('book', 'idx_book_authid', ['AuthID']),
+    ('book', 'idx_book_title_authid', ['Title', 'AuthID']),
+    ('edition', 'idx_edition_bookid', ['BookID']),
+    ('info', 'idx_info_seriesid', ['SeriesID']),
+    ('ratings', 'idx_ratings_bookid', ['BookID']),
+    ('ratings', 'idx_ratings_reviewerid', ['ReviewerID']),
+    ('orders', 'idx_orders_date_id', ['SaleDate', 'OrderID']),
+    ('orderdetails', 'idx_orderdetails_isbn', ['ISBN']),
+    ('users', 'idx_users_role', ['role'])
+]
+
+def upgrade(op):
+    for table, name, columns in INDEXES:
+        op.create_index(table, name, columns)
+
+def downgrade(op):
+    for table, name, columns in reversed(INDEXES):
+        op.drop_index(table, name)
@@ -0,0 +1,19 @@
+"""
+Copy Orders.SaleDate onto OrderDetails
+
+The copy is the partition key that lets date-filtered queries prune
+OrderDetails as well as Orders (migration 0004). Existing lines are filled in
+batches; new lines get it from the order write paths.
+"""
+from models import OrderDetail
+
+def upgrade(op):
+    op.add_column(OrderDetail.__table__.c.SaleDate)
+    op.backfill(
+        'orderdetails', 'OrderID',
+        "SaleDate = (SELECT orders.SaleDate FROM orders WHERE orders.OrderID = orderdetails.OrderID)",
+        where="SaleDate IS NULL"
+    )
+
+def downgrade(op):
+    op.drop_column('orderdetails', 'SaleDate')
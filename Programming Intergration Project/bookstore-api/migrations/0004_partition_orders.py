@@ -0,0 +1,67 @@
+"""
+Range-partition orders and orderdetails by SaleDate (MySQL)
+
+Partitions cover ORDER_PARTITION_INTERVAL periods (month or year) from the
+oldest order to ORDER_PARTITIONS_AHEAD periods from now, plus a MAXVALUE
+catch-all; keep future partitions coming with: python partitions.py add-future
+
+MySQL requires the partition key in every unique key and does not support
+foreign keys or FULLTEXT indexes on partitioned tables, so this widens both
+primary keys with SaleDate, drops the foreign keys from and to both tables and
+drops the OrderID ngram index (OrderID substring search falls back to LIKE).
+PARTITION BY copies each table and blocks writes to it while it runs; on a
+large live database run it in a maintenance window or move the data with an
+online schema change tool first. Skipped on other databases.
+"""
+from datetime import date
+from utils.migrations import MigrationError
+from utils.partitions import PARTITIONED_TABLES, partition_clause, partition_definitions, is_partitioned, horizon
+
+FULLTEXT_INDEX = 'idx_orders_orderid_fulltext'
+
+def upgrade(op):
+    if op.dialect != 'mysql':
+        op.report("skipped: range partitioning needs MySQL")
+        return
+
+    with op.engine.connect() as connection:
+        if all(is_partitioned(connection, table) for table in PARTITIONED_TABLES):
+            return
+
+        missing = connection.exec_driver_sql(
+            "SELECT (SELECT COUNT(*) FROM orders WHERE SaleDate IS NULL)"
+            " + (SELECT COUNT(*) FROM orderdetails WHERE SaleDate IS NULL)"
+        ).scalar()
+        if missing:
+            raise MigrationError(f"{missing} orders/order lines have no SaleDate; set one before partitioning")
+
+        first_day = connection.exec_driver_sql("SELECT MIN(SaleDate) FROM orders").scalar() or date.today()
+
+    for table, name, referred in op.foreign_keys():
+        if table.lower() in PARTITIONED_TABLES or referred.lower() in PARTITIONED_TABLES:
+            op.drop_foreign_key(table, name)
+    op.drop_index('orders', FULLTEXT_INDEX)
+
+    op.alter_table('orders', "MODIFY SaleDate DATE NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (OrderID, SaleDate)")
+    op.alter_table('orderdetails', "MODIFY SaleDate DATE NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (OrderID, ItemID, SaleDate)")
+
+    interval = op.config['ORDER_PARTITION_INTERVAL']
+    last_day = horizon(interval, op.config['ORDER_PARTITIONS_AHEAD'])
+    clause = partition_clause(partition_definitions(first_day, last_day, interval))
+    for table in PARTITIONED_TABLES:
+        op.alter_table(table, clause)
+
+def downgrade(op):
+    if op.dialect != 'mysql':
+        return
+
+    with op.engine.connect() as connection:
+        partitioned = [table for table in PARTITIONED_TABLES if is_partitioned(connection, table)]
+    for table in partitioned:
+        op.alter_table(table, "REMOVE PARTITIONING")
+
+    op.alter_table('orderdetails', "DROP PRIMARY KEY, ADD PRIMARY KEY (OrderID, ItemID)")
+    op.alter_table('orders', "DROP PRIMARY KEY, ADD PRIMARY KEY (OrderID)")
+    op.alter_table('orderdetails', "ADD CONSTRAINT orderdetails_ibfk_1 FOREIGN KEY (OrderID) REFERENCES orders(OrderID) ON DELETE CASCADE")
+    op.alter_table('orderdetails', "ADD CONSTRAINT orderdetails_ibfk_2 FOREIGN KEY (ISBN) REFERENCES edition(ISBN)")
+    op.execute(f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON orders(OrderID) WITH PARSER ngram")
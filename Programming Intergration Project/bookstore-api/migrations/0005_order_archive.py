@@ -0,0 +1,16 @@
+"""
+Archive tables for cold orders
+
+orders_archive and orderdetails_archive receive the orders moved out of the
+hot tables by archive_orders.py. They use compressed InnoDB pages on MySQL;
+the orders_archive primary key is the index for point lookups by OrderID.
+"""
+from models import OrderArchive, OrderDetailArchive
+
+def upgrade(op):
+    op.create_table(OrderArchive)
+    op.create_table(OrderDetailArchive)
+
+def downgrade(op):
+    op.drop_table(OrderDetailArchive)
+    op.drop_table(OrderArchive)
@@ -0,0 +1,21 @@
+"""
+OrderID uniqueness table for partitioned orders
+
+The partitioned orders table (migration 0004) only has a unique key on
+(OrderID, SaleDate). order_ids holds every OrderID in use, hot or archived,
+and the order write paths insert into it in the order's transaction, so a
+duplicate OrderID fails atomically with an IntegrityError.
+"""
+from models import OrderKey
+
+def upgrade(op):
+    op.create_table(OrderKey)
+    # The baseline's create_all may already have created the table
+    op.execute(
+        "INSERT INTO order_ids (OrderID) SELECT used.OrderID FROM "
+        "(SELECT OrderID FROM orders UNION SELECT OrderID FROM orders_archive) used "
+        "WHERE NOT EXISTS (SELECT 1 FROM order_ids taken WHERE taken.OrderID = used.OrderID)"
+    )
+
+def downgrade(op):
+    op.drop_table(OrderKey)
@@ -13,4 +13,11 @@ from .award import Award
 from .order import Order
 from .order_detail import OrderDetail
 from .rating import Rating
-from .checkout import Checkout
\ No newline at end of file
+from .checkout import Checkout
+from .order_search import OrderSearch
+from .rating_summary import RatingSummary
+from .daily_revenue import DailyRevenue
+from .job import Job
+from .schema_migration import SchemaMigration
+from .order_archive import OrderArchive, OrderDetailArchive
+from .order_key import OrderKey
\ No newline at end of file
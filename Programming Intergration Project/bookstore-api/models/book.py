@@ -1,3 +1,4 @@
+from sqlalchemy.orm import selectinload
 from . import db
 
 class Book(db.Model):
@@ -22,7 +23,27 @@ class Book(db.Model):
             'AuthID': self.AuthID
         }
     
+    @classmethod
+    def extended_load_options(cls):
+        """
+        Loader options for everything to_dict_extended touches, one batched
+        SELECT ... IN query per relationship whatever the number of books
+        """
+        return (
+            selectinload(cls.author),
+            selectinload(cls.info),
+            selectinload(cls.editions)
+        )
+    
     def to_dict_extended(self):
+        # Resolve author, info and editions from the catalog snapshot when available
+        from utils.catalog import catalog
+        snapshot = catalog.get()
+        if snapshot is not None:
+            extended = snapshot.book_extended(self.BookID)
+            if extended is not None:
+                return extended
+        
         return {
             **self.to_dict(),
             'Author': self.author.to_dict() if self.author else None,
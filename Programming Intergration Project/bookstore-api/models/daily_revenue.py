@@ -0,0 +1,26 @@
+from . import db
+
+class DailyRevenue(db.Model):
+    """
+    Materialized revenue per sale date and ISBN, maintained by utils.revenue
+    """
+    __tablename__ = 'daily_revenue'
+    
+    SaleDate = db.Column(db.Date, primary_key=True)
+    ISBN = db.Column(db.String(20), primary_key=True)
+    Quantity = db.Column(db.Integer, nullable=False, default=0)
+    OrderLines = db.Column(db.Integer, nullable=False, default=0)
+    Revenue = db.Column(db.DECIMAL(12, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        db.Index('idx_daily_revenue_isbn_date', 'ISBN', 'SaleDate'),
+    )
+    
+    def to_dict(self):
+        return {
+            'SaleDate': self.SaleDate.isoformat() if self.SaleDate else None,
+            'ISBN': self.ISBN,
+            'Quantity': self.Quantity,
+            'OrderLines': self.OrderLines,
+            'Revenue': float(self.Revenue) if self.Revenue is not None else None
+        }
@@ -0,0 +1,49 @@
+import json
+from . import db
+
+class Job(db.Model):
+    """
+    Background job record, claimed and run by utils.jobs
+    Status moves queued -> running -> succeeded | failed | cancelled
+    """
+    __tablename__ = 'jobs'
+    
+    JobID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Kind = db.Column(db.String(50), nullable=False)
+    Params = db.Column(db.Text)
+    Status = db.Column(db.String(20), nullable=False, default='queued')
+    Stage = db.Column(db.String(100))
+    Progress = db.Column(db.Integer, nullable=False, default=0)
+    Total = db.Column(db.Integer)
+    Result = db.Column(db.Text)
+    Error = db.Column(db.Text)
+    CancelRequested = db.Column(db.Boolean, nullable=False, default=False)
+    WorkerID = db.Column(db.String(100))
+    CreatedBy = db.Column(db.Integer, db.ForeignKey('users.id'))
+    CreatedAt = db.Column(db.DateTime, server_default=db.func.now())
+    StartedAt = db.Column(db.DateTime)
+    HeartbeatAt = db.Column(db.DateTime)
+    FinishedAt = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('idx_jobs_status_id', 'Status', 'JobID'),
+    )
+    
+    def to_dict(self):
+        return {
+            'JobID': self.JobID,
+            'Kind': self.Kind,
+            'Params': json.loads(self.Params) if self.Params else {},
+            'Status': self.Status,
+            'Stage': self.Stage,
+            'Progress': self.Progress,
+            'Total': self.Total,
+            'Result': json.loads(self.Result) if self.Result else None,
+            'Error': self.Error,
+            'CancelRequested': bool(self.CancelRequested),
+            'WorkerID': self.WorkerID,
+            'CreatedBy': self.CreatedBy,
+            'CreatedAt': self.CreatedAt.isoformat() if self.CreatedAt else None,
+            'StartedAt': self.StartedAt.isoformat() if self.StartedAt else None,
+            'FinishedAt': self.FinishedAt.isoformat() if self.FinishedAt else None
+        }
@@ -1,14 +1,36 @@
+from sqlalchemy.orm import selectinload
 from . import db
 
 class Order(db.Model):
     __tablename__ = 'orders'
     
+    # Once partitioned (migration 0004) the table's primary key is (OrderID, SaleDate),
+    # OrderID uniqueness is then enforced by order_ids (OrderKey)
     OrderID = db.Column(db.String(30), primary_key=True)
     SaleDate = db.Column(db.Date)
     
     # Relationships
     order_details = db.relationship('OrderDetail', back_populates='order')
     
+    @classmethod
+    def detail_load_options(cls, with_catalog=True):
+        """
+        Loader options for to_dict: order lines in one batched query and,
+        when with_catalog is set, their editions and books as well
+        Shared with OrderArchive, whose lines have the same relationships
+        """
+        from .book import Edition, Book
+        
+        details = selectinload(cls.order_details)
+        if not with_catalog:
+            return (details,)
+        detail = cls.order_details.property.mapper.class_
+        return (
+            details.selectinload(detail.edition).selectinload(Edition.book).options(
+                *Book.extended_load_options()
+            ),
+        )
+    
     def to_dict(self):
         return {
             'OrderID': self.OrderID,
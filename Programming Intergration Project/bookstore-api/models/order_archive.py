@@ -0,0 +1,54 @@
+from . import db
+from .order import Order
+from .order_detail import OrderDetail
+
+# InnoDB compressed pages for the archive tables, ignored by other databases
+ARCHIVE_TABLE_OPTIONS = {'mysql_row_format': 'COMPRESSED', 'mysql_key_block_size': '8'}
+
+class OrderArchive(db.Model):
+    """
+    Order moved out of the hot tables by utils.archive, read-only
+    The primary key is the index over archived OrderIDs for point lookups
+    """
+    __tablename__ = 'orders_archive'
+    
+    OrderID = db.Column(db.String(30), primary_key=True)
+    SaleDate = db.Column(db.Date, nullable=False)
+    ArchivedAt = db.Column(db.DateTime, server_default=db.func.now())
+    
+    # Relationships
+    order_details = db.relationship('OrderDetailArchive', back_populates='order')
+    
+    __table_args__ = (
+        db.Index('idx_orders_archive_date_id', 'SaleDate', 'OrderID'),
+        ARCHIVE_TABLE_OPTIONS
+    )
+    
+    # Same serialization and loading as live orders
+    detail_load_options = classmethod(Order.detail_load_options.__func__)
+    to_dict = Order.to_dict
+
+class OrderDetailArchive(db.Model):
+    """
+    Line of an archived order, with the order's SaleDate
+    """
+    __tablename__ = 'orderdetails_archive'
+    
+    OrderID = db.Column(db.String(30), db.ForeignKey('orders_archive.OrderID'), primary_key=True)
+    ItemID = db.Column(db.String(30), primary_key=True)
+    ISBN = db.Column(db.String(20))
+    Quantity = db.Column(db.Integer, nullable=False, default=1)
+    SaleDate = db.Column(db.Date, nullable=False)
+    
+    # Relationships; no foreign key to edition so archived lines never block catalog changes
+    order = db.relationship('OrderArchive', back_populates='order_details')
+    edition = db.relationship(
+        'Edition', primaryjoin='foreign(OrderDetailArchive.ISBN) == Edition.ISBN', viewonly=True
+    )
+    
+    __table_args__ = (
+        db.Index('idx_orderdetails_archive_isbn', 'ISBN', 'SaleDate'),
+        ARCHIVE_TABLE_OPTIONS
+    )
+    
+    to_dict = OrderDetail.to_dict
@@ -9,12 +9,28 @@ class OrderDetail(db.Model):
     ItemID = db.Column(db.String(30), primary_key=True)
     ISBN = db.Column(db.String(20), db.ForeignKey('edition.ISBN'))
     Quantity = db.Column(db.Integer, nullable=False, default=1)
+    # Copy of Orders.SaleDate, the partition key that lets date ranges prune OrderDetails too
+    SaleDate = db.Column(db.Date)
     
     # Relationships
     order = db.relationship('Order', back_populates='order_details')
     edition = db.relationship('Edition', back_populates='order_details')
     
     def to_dict(self):
+        # Resolve the edition and book from the catalog snapshot when available
+        from utils.catalog import catalog
+        snapshot = catalog.get()
+        if snapshot is not None and self.ISBN in snapshot.editions:
+            edition = snapshot.editions[self.ISBN]
+            return {
+                'OrderID': self.OrderID,
+                'ItemID': self.ItemID,
+                'ISBN': self.ISBN,
+                'Quantity': self.Quantity,
+                'Book': snapshot.book_extended(edition.BookID),
+                'Price': edition.Price
+            }
+        
         return {
             'OrderID': self.OrderID,
             'ItemID': self.ItemID,
@@ -0,0 +1,12 @@
+from . import db
+
+class OrderKey(db.Model):
+    """
+    One row per OrderID in use, hot or archived
+    Unpartitioned, so its primary key keeps OrderIDs unique once the orders
+    primary key is widened to (OrderID, SaleDate); insert it in the same
+    transaction as the order
+    """
+    __tablename__ = 'order_ids'
+    
+    OrderID = db.Column(db.String(30), primary_key=True)
@@ -0,0 +1,38 @@
+from . import db
+
+class OrderSearch(db.Model):
+    """
+    Denormalized read model for order search, one row per order line
+    Kept in sync by utils.order_search on order and catalog writes
+    """
+    __tablename__ = 'order_search'
+    
+    OrderID = db.Column(db.String(30), primary_key=True)
+    ItemID = db.Column(db.String(30), primary_key=True)
+    SaleDate = db.Column(db.Date)
+    ISBN = db.Column(db.String(20))
+    BookID = db.Column(db.String(10))
+    TitleLower = db.Column(db.String(255))
+    LastNameLower = db.Column(db.String(50))
+    Quantity = db.Column(db.Integer)
+    Price = db.Column(db.DECIMAL(6, 2))
+    
+    # Composite indexes so every filter combination is a single-table range scan
+    __table_args__ = (
+        db.Index('idx_order_search_date_id', 'SaleDate', 'OrderID'),
+        db.Index('idx_order_search_title_date', 'TitleLower', 'SaleDate', 'OrderID'),
+        db.Index('idx_order_search_lastname_date', 'LastNameLower', 'SaleDate', 'OrderID'),
+        db.Index('idx_order_search_isbn_date', 'ISBN', 'SaleDate', 'OrderID'),
+        db.Index('idx_order_search_bookid', 'BookID'),
+    )
+    
+    def to_dict(self):
+        return {
+            'OrderID': self.OrderID,
+            'ItemID': self.ItemID,
+            'SaleDate': self.SaleDate.isoformat() if self.SaleDate else None,
+            'ISBN': self.ISBN,
+            'BookID': self.BookID,
+            'Quantity': self.Quantity,
+            'Price': float(self.Price) if self.Price else None
+        }
@@ -0,0 +1,39 @@
+from . import db
+
+class RatingSummary(db.Model):
+    """
+    Per-book rating aggregates, maintained by utils.ratings
+    """
+    __tablename__ = 'book_rating_summary'
+    
+    BookID = db.Column(db.String(10), db.ForeignKey('book.BookID'), primary_key=True)
+    RatingCount = db.Column(db.Integer, nullable=False, default=0)
+    RatingSum = db.Column(db.Integer, nullable=False, default=0)
+    Stars1 = db.Column(db.Integer, nullable=False, default=0)
+    Stars2 = db.Column(db.Integer, nullable=False, default=0)
+    Stars3 = db.Column(db.Integer, nullable=False, default=0)
+    Stars4 = db.Column(db.Integer, nullable=False, default=0)
+    Stars5 = db.Column(db.Integer, nullable=False, default=0)
+    BayesianAverage = db.Column(db.Float)
+    
+    __table_args__ = (
+        db.Index('idx_book_rating_summary_bayesian', 'BayesianAverage'),
+    )
+    
+    def histogram(self):
+        return {
+            '1': self.Stars1 or 0,
+            '2': self.Stars2 or 0,
+            '3': self.Stars3 or 0,
+            '4': self.Stars4 or 0,
+            '5': self.Stars5 or 0
+        }
+    
+    def to_dict(self):
+        return {
+            'BookID': self.BookID,
+            'RatingCount': self.RatingCount,
+            'AverageRating': round(self.RatingSum / self.RatingCount, 4) if self.RatingCount else None,
+            'BayesianAverage': round(self.BayesianAverage, 4) if self.BayesianAverage is not None else None,
+            'Histogram': self.histogram()
+        }
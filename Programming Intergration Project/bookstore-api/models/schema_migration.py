@@ -0,0 +1,20 @@
+from . import db
+
+class SchemaMigration(db.Model):
+    """
+    Applied schema migration, recorded by utils.migrations
+    """
+    __tablename__ = 'schema_migrations'
+    
+    Version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Name = db.Column(db.String(100), nullable=False)
+    AppliedAt = db.Column(db.DateTime, server_default=db.func.now())
+    DurationMs = db.Column(db.Integer)
+    
+    def to_dict(self):
+        return {
+            'Version': self.Version,
+            'Name': self.Name,
+            'AppliedAt': self.AppliedAt.isoformat() if self.AppliedAt else None,
+            'DurationMs': self.DurationMs
+        }
@@ -1,5 +1,5 @@
 from . import db
-import bcrypt
+from utils.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,15 +18,11 @@ class User(db.Model):
         self.role = role
     
     def set_password(self, password):
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt(12)
-        hashed = bcrypt.hashpw(password_bytes, salt)
-        self.password_hash = hashed.decode('utf-8')
+        # Hashes in the calling thread, the login route uses utils.passwords.password_pool
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
-        password_bytes = password.encode('utf-8')
-        stored_hash = self.password_hash.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, stored_hash)
+        return verify_password(password, self.password_hash)
         
     def to_dict(self):
         return {
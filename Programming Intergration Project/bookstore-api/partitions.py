@@ -0,0 +1,63 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.partitions import PARTITIONED_TABLES, list_partitions, add_future_partitions
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+def _require_mysql(connection):
+    if connection.dialect.name != 'mysql':
+        sys.exit("Partition maintenance needs MySQL; other databases keep orders unpartitioned.")
+
+def status():
+    with app.app_context():
+        with db.engine.connect() as connection:
+            _require_mysql(connection)
+            for table in PARTITIONED_TABLES:
+                partitions = list_partitions(connection, table)
+                if not partitions:
+                    print(f"{table}: not partitioned (python migrate.py)")
+                    continue
+                
+                print(f"{table}: {len(partitions)} partitions")
+                for partition in partitions:
+                    bound = partition.bound.isoformat() if partition.bound else 'MAXVALUE'
+                    print(f"  {partition.name:<10} < {bound:<10} ~{partition.rows} rows")
+
+def add_future(ahead):
+    """
+    Keep empty partitions ready ahead of today; run it from cron, e.g. weekly
+    """
+    with app.app_context():
+        with db.engine.connect() as connection:
+            _require_mysql(connection)
+            for table in PARTITIONED_TABLES:
+                added = add_future_partitions(connection, table, app.config['ORDER_PARTITION_INTERVAL'], ahead)
+                print(f"{table}: added {', '.join(added)}" if added else f"{table}: up to date")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the SaleDate partitions of orders and orderdetails (MySQL)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    commands.add_parser('status', help="list partitions with their bounds and estimated rows")
+    future_parser = commands.add_parser('add-future', help="create the partitions for the coming periods")
+    future_parser.add_argument('--ahead', type=int, default=Config.ORDER_PARTITIONS_AHEAD,
+                               help=f"periods to keep ready ahead of today (default: {Config.ORDER_PARTITIONS_AHEAD})")
+    args = parser.parse_args()
+    
+    if args.command == 'status':
+        status()
+    else:
+        add_future(args.ahead)
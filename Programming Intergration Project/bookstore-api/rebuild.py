@@ -0,0 +1,42 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.jobs import REBUILDERS
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+def rebuild(names):
+    """
+    Rebuild the given derived tables, e.g. after running import_data.py
+    """
+    with app.app_context():
+        for name in names:
+            def progress(done, total, name=name):
+                print(f"  {name}: {done}/{total}")
+            
+            print(f"Rebuilding '{name}'...")
+            rows = REBUILDERS[name](progress=progress)
+            print(f"Rebuilt '{name}' with {rows} rows.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild derived tables from the normalized data")
+    parser.add_argument('tables', nargs='*', help=f"tables to rebuild: {', '.join(sorted(REBUILDERS))} (default: all)")
+    args = parser.parse_args()
+    
+    unknown = [name for name in args.tables if name not in REBUILDERS]
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(unknown)}")
+    
+    rebuild(args.tables or sorted(REBUILDERS))
@@ -9,10 +9,22 @@ def register_routes(app):
     from .orders import orders_bp
     from .authors import authors_bp
     from .publishers import publishers_bp
+    from .suggest import suggest_bp
+    from .catalog import catalog_bp
+    from .analytics import analytics_bp
+    from .series import series_bp
+    from .awards import awards_bp
+    from .jobs import jobs_bp
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix=app.config['API_PREFIX'])
     app.register_blueprint(books_bp, url_prefix=app.config['API_PREFIX'])
     app.register_blueprint(orders_bp, url_prefix=app.config['API_PREFIX'])
     app.register_blueprint(authors_bp, url_prefix=app.config['API_PREFIX'])
-    app.register_blueprint(publishers_bp, url_prefix=app.config['API_PREFIX'])
\ No newline at end of file
+    app.register_blueprint(publishers_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(suggest_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(catalog_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(analytics_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(series_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(awards_bp, url_prefix=app.config['API_PREFIX'])
+    app.register_blueprint(jobs_bp, url_prefix=app.config['API_PREFIX'])
\ No newline at end of file
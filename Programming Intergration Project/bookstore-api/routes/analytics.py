@@ -0,0 +1,203 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from utils.checkout_analytics import checkout_analytics
+from utils.sales_cube import sales_cube, DIMENSIONS, METRICS
+from utils.revenue import month_expression
+from models import db, DailyRevenue, Edition, Book, Publisher
+from sqlalchemy import func, desc
+from datetime import datetime, timedelta
+
+REVENUE_GROUPS = ('day', 'month', 'book', 'publisher')
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/analytics/checkouts/trends', methods=['GET'])
+@jwt_required()
+def get_checkout_trends():
+    """
+    Monthly checkout totals with month-over-month growth,
+    for all books or a single book_id
+    Computed from the cached columnar snapshot of checkouts
+    """
+    book_id = request.args.get('book_id')
+    
+    snapshot = checkout_analytics.get()
+    
+    if book_id and book_id not in snapshot.book_index:
+        return jsonify({"message": "No checkouts found for this book ID"}), 404
+    
+    return jsonify({
+        "book_id": book_id,
+        "months": len(snapshot.months),
+        "trend": snapshot.trend(book_id)
+    }), 200
+
+@analytics_bp.route('/analytics/checkouts/movers', methods=['GET'])
+@jwt_required()
+def get_checkout_movers():
+    """
+    Books with the biggest checkout gains and losses between two months
+    Defaults to the last two months on record
+    """
+    limit = request.args.get('limit', 10, type=int)
+    
+    # Limit to reasonable values
+    limit = min(max(limit, 1), 100)
+    
+    snapshot = checkout_analytics.get()
+    
+    if len(snapshot.months) < 2:
+        return jsonify({"message": "At least two months of checkouts are required"}), 404
+    
+    from_month = request.args.get('from_month', int(snapshot.months[-2]), type=int)
+    to_month = request.args.get('to_month', int(snapshot.months[-1]), type=int)
+    
+    missing = [month for month in (from_month, to_month) if month not in snapshot.month_index]
+    if missing:
+        return jsonify({"message": f"No checkouts recorded for month(s): {', '.join(map(str, missing))}"}), 404
+    
+    gainers, losers = snapshot.movers(from_month, to_month, limit)
+    
+    return jsonify({
+        "from_month": from_month,
+        "to_month": to_month,
+        "gainers": gainers,
+        "losers": losers
+    }), 200
+
+@analytics_bp.route('/analytics/sales', methods=['GET'])
+@jwt_required()
+def get_sales_analytics():
+    """
+    Ad-hoc sales pivots over genre, publisher, format, author_country and month
+    e.g. ?group_by=genre,month&format=Hardcover&start_date=2024-01-01&sort=revenue
+    Served from the in-memory columnar sales cube, not from MySQL
+    Revenue uses the current edition price
+    """
+    group_by = [dimension for dimension in request.args.get('group_by', '').split(',') if dimension]
+    sort = request.args.get('sort', 'quantity')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    limit = request.args.get('limit', 100, type=int)
+    
+    # Limit to reasonable values
+    limit = min(max(limit, 1), 1000)
+    
+    invalid = [dimension for dimension in group_by if dimension not in DIMENSIONS]
+    if invalid or len(set(group_by)) != len(group_by):
+        return jsonify({"message": f"group_by must be distinct values from: {', '.join(DIMENSIONS)}"}), 400
+    
+    if sort not in METRICS:
+        return jsonify({"message": f"sort must be one of: {', '.join(METRICS)}"}), 400
+    
+    # Filters use the dimension names, comma-separated values
+    filters = {
+        dimension: request.args.get(dimension).split(',')
+        for dimension in DIMENSIONS if request.args.get(dimension)
+    }
+    
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        return jsonify({"message": "Invalid date format. Expected YYYY-MM-DD"}), 422
+    
+    total_groups, rows = sales_cube.aggregate(group_by, filters, start, end, sort, limit)
+    
+    return jsonify({
+        "group_by": group_by,
+        "filters": filters,
+        "sort": sort,
+        "count": total_groups,
+        "rows": rows
+    }), 200
+
+@analytics_bp.route('/analytics/revenue', methods=['GET'])
+@jwt_required()
+def get_revenue():
+    """
+    Revenue by day, month, book or publisher over an optional date range
+    Served from the daily_revenue rollup, OrderDetails are never scanned
+    """
+    group_by = request.args.get('group_by', 'day')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    book_id = request.args.get('book_id')
+    pub_id = request.args.get('pub_id')
+    limit = request.args.get('limit', 100, type=int)
+    
+    # Limit to reasonable values
+    limit = min(max(limit, 1), 1000)
+    
+    if group_by not in REVENUE_GROUPS:
+        return jsonify({"message": f"group_by must be one of: {', '.join(REVENUE_GROUPS)}"}), 400
+    
+    quantity = func.sum(DailyRevenue.Quantity).label('quantity')
+    order_lines = func.sum(DailyRevenue.OrderLines).label('order_lines')
+    revenue = func.sum(DailyRevenue.Revenue).label('revenue')
+    
+    if group_by == 'day':
+        keys = [DailyRevenue.SaleDate.label('date')]
+    elif group_by == 'month':
+        keys = [month_expression(DailyRevenue.SaleDate).label('month')]
+    elif group_by == 'book':
+        keys = [Edition.BookID.label('BookID'), Book.Title.label('Title')]
+    else:
+        keys = [Edition.PubID.label('PubID'), Publisher.PublishingHouse.label('PublishingHouse')]
+    
+    query = db.session.query(*keys, quantity, order_lines, revenue)
+    
+    # Book and publisher come from the edition, a primary key join per cell
+    if group_by in ('book', 'publisher') or book_id or pub_id:
+        query = query.join(Edition, DailyRevenue.ISBN == Edition.ISBN)
+    if group_by == 'book':
+        query = query.outerjoin(Book, Edition.BookID == Book.BookID)
+    if group_by == 'publisher':
+        query = query.outerjoin(Publisher, Edition.PubID == Publisher.PubID)
+    
+    if start_date:
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            query = query.filter(DailyRevenue.SaleDate >= start)
+        except ValueError:
+            return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
+
+    if end_date:
+        try:
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
+            query = query.filter(DailyRevenue.SaleDate < end)
+        except ValueError:
+            return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
+    
+    if book_id:
+        query = query.filter(Edition.BookID == book_id)
+    if pub_id:
+        query = query.filter(Edition.PubID == pub_id)
+    
+    query = query.group_by(*keys)
+    
+    # Time series in date order, books and publishers best first
+    if group_by in ('day', 'month'):
+        query = query.order_by(keys[0])
+    else:
+        query = query.order_by(desc('revenue'), keys[0])
+    
+    rows = query.limit(limit).all()
+    
+    def row_dict(row):
+        data = row._asdict()
+        if group_by == 'day':
+            data['date'] = data['date'].isoformat() if data['date'] else None
+        data['quantity'] = int(data['quantity'] or 0)
+        data['order_lines'] = int(data['order_lines'] or 0)
+        data['revenue'] = float(data['revenue'] or 0)
+        return data
+    
+    results = [row_dict(row) for row in rows]
+    
+    return jsonify({
+        "group_by": group_by,
+        "count": len(results),
+        "total_revenue": round(sum(row['revenue'] for row in results), 2),
+        "revenue": results
+    }), 200
@@ -1,14 +1,57 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import db, User
 from utils.auth import admin_required
+from utils.passwords import password_pool, needs_rehash, HasherBusy
+from utils.rate_limit import TokenBucketLimiter
 
 auth_bp = Blueprint('auth', __name__)
 
+# Created on first login from the LOGIN_* settings
+login_limiters = {}
+
+def _limiter(burst, per_minute):
+    # 0 for either setting turns the limit off
+    if burst <= 0 or per_minute <= 0:
+        return None
+    return TokenBucketLimiter(burst, per_minute)
+
+def login_retry_after(username):
+    """
+    Charge one attempt to the username and client IP buckets
+    Returns the seconds to wait when either is empty, else 0
+    """
+    if not login_limiters:
+        config = current_app.config
+        login_limiters['username'] = _limiter(config['LOGIN_USERNAME_BURST'], config['LOGIN_USERNAME_PER_MINUTE'])
+        login_limiters['ip'] = _limiter(config['LOGIN_IP_BURST'], config['LOGIN_IP_PER_MINUTE'])
+    
+    charges = (
+        (login_limiters['username'], username.lower()),
+        (login_limiters['ip'], request.remote_addr or 'unknown')
+    )
+    return max((limiter.consume(key) for limiter, key in charges if limiter), default=0)
+
+def login_succeeded(username):
+    """
+    Give the username its attempts back, so only failed logins count against
+    an account and a few bad guesses by someone else do not lock it out
+    """
+    if login_limiters.get('username'):
+        login_limiters['username'].reset(username.lower())
+
+def retry_later(retry_after, message, code):
+    response = jsonify({"message": message})
+    response.headers['Retry-After'] = str(max(int(retry_after + 0.999), 1))
+    return response, code
+
 @auth_bp.route('/auth/login', methods=['POST'])
 def login():
     """
     Login user and return access token
+    bcrypt runs in the password process pool, attempts are rate limited per
+    username and per client IP, and hashes made at another cost than
+    BCRYPT_ROUNDS are redone on the next successful login
     """
     data = request.get_json()
     
@@ -16,12 +59,33 @@ def login():
     if 'username' not in data or 'password' not in data:
         return jsonify({"message": "Username and password are required"}), 400
     
+    retry_after = login_retry_after(str(data['username']))
+    if retry_after:
+        return retry_later(retry_after, "Too many login attempts, try again later", 429)
+    
     # Find user by username
     user = User.query.filter_by(username=data['username']).first()
     
     # Check if user exists and password is correct
-    if not user or not user.check_password(data['password']):
-        return jsonify({"message": "Invalid credentials"}), 401
+    try:
+        if not user:
+            password_pool.verify_unknown_user(data['password'])
+            return jsonify({"message": "Invalid credentials"}), 401
+        
+        # End the read transaction while waiting on the pool
+        stored_hash = user.password_hash
+        db.session.commit()
+        
+        if not password_pool.verify(data['password'], stored_hash):
+            return jsonify({"message": "Invalid credentials"}), 401
+        
+        if needs_rehash(stored_hash):
+            user.password_hash = password_pool.hash(data['password'])
+            db.session.commit()
+    except HasherBusy:
+        return retry_later(1, "Login service is busy, try again shortly", 503)
+    
+    login_succeeded(str(data['username']))
     
     # Create access token with user.id converted to string
     access_token = create_access_token(identity=str(user.id))
@@ -2,10 +2,27 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db, Author, Book
 from utils.auth import admin_required
-from sqlalchemy import func, text, or_
+from utils.order_search import sync_author, sync_authors
+from utils.suggest import suggest_index
+from utils.catalog import catalog
+from utils.bulk import BulkRow, BulkResult, apply_bulk_rows, bulk_payload, existing_keys, parse_date, chunked, LOOKUP_CHUNK_SIZE
+from sqlalchemy import func, or_, desc
 
 authors_bp = Blueprint('authors', __name__)
 
+def book_counts_subquery():
+    """
+    Book count per author as a derived table, grouped over idx_book_authid
+    Joined in the same statement as the author filters instead of being
+    fetched into Python and sent back as an IN (...) list
+    """
+    return db.session.query(
+        Book.AuthID.label('AuthID'),
+        func.count(Book.BookID).label('book_count')
+    ).group_by(
+        Book.AuthID
+    ).subquery()
+
 @authors_bp.route('/authors', methods=['GET'])
 def get_all_authors():
     """
@@ -57,19 +74,19 @@ def get_all_authors():
 def get_prolific_authors():
     """
     Get authors with the most books published
+    Shares the per-author book counts with search_authors
     """
     limit = request.args.get('limit', 10, type=int)
     
-    # Use a subquery to count books per author
+    counts = book_counts_subquery()
+    
     query = db.session.query(
         Author,
-        func.count(Book.BookID).label('book_count')
+        counts.c.book_count
     ).join(
-        Book, Author.AuthID == Book.AuthID
-    ).group_by(
-        Author.AuthID
+        counts, Author.AuthID == counts.c.AuthID
     ).order_by(
-        text('book_count DESC')
+        desc(counts.c.book_count), Author.AuthID
     ).limit(limit)
     
     results = query.all()
@@ -130,12 +147,81 @@ def create_author():
     
     db.session.add(author)
     db.session.commit()
+    suggest_index.put_author(author.AuthID, author.FirstName, author.LastName)
     
     return jsonify({
         "message": "Author created successfully",
         "author": author.to_dict()
     }), 201
 
+@authors_bp.route('/authors/bulk', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_upsert_authors():
+    """
+    Insert or update many authors at once (admin only)
+    Body: a list of authors, or {"authors": [...]}; existing AuthIDs are updated
+    Rows are written in chunks and invalid rows are reported without aborting the batch
+    """
+    rows = bulk_payload(request.get_json(), 'authors')
+    
+    if rows is None:
+        return jsonify({"message": "Expected a list of authors"}), 400
+    
+    result = BulkResult(len(rows))
+    existing = existing_keys(Author.AuthID, [row.get('AuthID') for row in rows if isinstance(row, dict)])
+    
+    seen = set()
+    valid_rows = []
+    for index, row in enumerate(rows):
+        auth_id = row.get('AuthID') if isinstance(row, dict) else None
+        
+        if not auth_id:
+            result.error(index, auth_id, "AuthID is required")
+            continue
+        if auth_id in seen:
+            result.error(index, auth_id, "Duplicate AuthID in batch")
+            continue
+        seen.add(auth_id)
+        
+        is_update = auth_id in existing
+        if not is_update and ('FirstName' not in row or 'LastName' not in row):
+            result.error(index, auth_id, "FirstName and LastName are required for new authors")
+            continue
+        
+        mapping = {'AuthID': auth_id}
+        for field in ('FirstName', 'LastName', 'CountryOfResidence', 'HrsWritingPerDay'):
+            if field in row:
+                mapping[field] = row[field]
+        if 'Birthday' in row:
+            try:
+                mapping['Birthday'] = parse_date(row['Birthday'])
+            except ValueError:
+                result.error(index, auth_id, "Invalid Birthday format. Expected YYYY-MM-DD")
+                continue
+        
+        valid_rows.append(BulkRow(index, auth_id, [(Author, mapping, is_update)]))
+    
+    apply_bulk_rows(valid_rows, result)
+    
+    # Bulk writes skip the session events, refresh the derived structures here
+    if result.inserted or result.updated:
+        catalog.bump()
+        
+        updated = set(result.updated)
+        sync_authors([
+            row.key for row in valid_rows
+            if row.key in updated and 'LastName' in row.operations[0][1]
+        ])
+        db.session.commit()
+        
+        if suggest_index.is_loaded:
+            for chunk in chunked(result.inserted + result.updated, LOOKUP_CHUNK_SIZE):
+                for author in Author.query.filter(Author.AuthID.in_(chunk)):
+                    suggest_index.put_author(author.AuthID, author.FirstName, author.LastName)
+    
+    return jsonify(result.to_dict()), 200
+
 @authors_bp.route('/authors/<auth_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
@@ -162,7 +248,12 @@ def update_author(auth_id):
     if 'HrsWritingPerDay' in data:
         author.HrsWritingPerDay = data['HrsWritingPerDay']
     
+    # Author last names are denormalized into order_search
+    if 'LastName' in data:
+        sync_author(auth_id)
+    
     db.session.commit()
+    suggest_index.put_author(author.AuthID, author.FirstName, author.LastName)
     
     return jsonify({
         "message": "Author updated successfully",
@@ -187,6 +278,7 @@ def delete_author(auth_id):
     
     db.session.delete(author)
     db.session.commit()
+    suggest_index.remove_author(auth_id)
     
     return jsonify({"message": "Author deleted successfully"}), 200
 
@@ -194,16 +286,35 @@ def delete_author(auth_id):
 def search_authors():
     """
     Advanced search for authors optimized for indexes
+    The min_books filter is applied in a single joined query with pagination
     """
     query = request.args.get('q', '')
     country = request.args.get('country')
     min_books = request.args.get('min_books', type=int)
     
+    # Pagination parameters
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    # Limit per_page to reasonable values
+    per_page = min(max(per_page, 5), 100)  # Minimum 5, maximum 100
+    
     if not query and not country and min_books is None:
         return jsonify({"message": "At least one search parameter is required"}), 400
     
-    # Base query
-    base_query = Author.query
+    # Base query, joined to the book counts when min_books is requested
+    if min_books is not None:
+        counts = book_counts_subquery()
+        base_query = db.session.query(
+            Author,
+            counts.c.book_count
+        ).join(
+            counts, Author.AuthID == counts.c.AuthID
+        ).filter(
+            counts.c.book_count >= min_books
+        )
+    else:
+        base_query = Author.query
     
     # Apply name search using indexed fields
     if query:
@@ -216,53 +327,26 @@ def search_authors():
     if country:
         base_query = base_query.filter(Author.CountryOfResidence.ilike(f'%{country}%'))
     
-    # Apply minimum books filter if needed
-    if min_books is not None:
-        author_ids = db.session.query(
-            Book.AuthID,
-            func.count(Book.BookID).label('book_count')
-        ).group_by(
-            Book.AuthID
-        ).having(
-            func.count(Book.BookID) >= min_books
-        ).all()
-        
-        # Extract author IDs that meet the criteria
-        valid_auth_ids = [auth_id for auth_id, _ in author_ids]
-        
-        if valid_auth_ids:
-            base_query = base_query.filter(Author.AuthID.in_(valid_auth_ids))
-        else:
-            # No authors meet the min_books criteria
-            return jsonify({"count": 0, "authors": []}), 200
+    # Get total count for pagination
+    total_count = base_query.count()
     
-    # Execute query
-    authors = base_query.order_by(Author.LastName, Author.FirstName).all()
+    # Apply sorting and pagination
+    base_query = base_query.order_by(Author.LastName, Author.FirstName, Author.AuthID)
+    results = base_query.offset((page - 1) * per_page).limit(per_page).all()
     
     # If min_books was specified, include book count in response
     if min_books is not None:
-        # Get book count for each author
-        author_book_counts = {
-            auth_id: count for auth_id, count in 
-            db.session.query(
-                Book.AuthID,
-                func.count(Book.BookID).label('count')
-            ).filter(
-                Book.AuthID.in_([a.AuthID for a in authors])
-            ).group_by(
-                Book.AuthID
-            ).all()
-        }
-        
-        # Add book count to author data
         author_data = [
-            {**author.to_dict(), "book_count": author_book_counts.get(author.AuthID, 0)}
-            for author in authors
+            {**author.to_dict(), "book_count": book_count}
+            for author, book_count in results
         ]
     else:
-        author_data = [author.to_dict() for author in authors]
+        author_data = [author.to_dict() for author in results]
     
     return jsonify({
-        "count": len(authors),
+        "count": total_count,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
         "authors": author_data
-    }), 200
\ No newline at end of file
+    }), 200
@@ -0,0 +1,70 @@
+from flask import Blueprint, request, jsonify
+from models import db, Award, Book
+from sqlalchemy.orm import selectinload
+
+awards_bp = Blueprint('awards', __name__)
+
+@awards_bp.route('/awards', methods=['GET'])
+def get_all_awards():
+    """
+    Get awards with pagination, optionally filtered by award name or year
+    The awarded books are loaded in one batched query for the whole page
+    """
+    award_name = request.args.get('award_name')
+    year = request.args.get('year', type=int)
+    
+    # Pagination parameters
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    # Limit per_page to reasonable values
+    per_page = min(max(per_page, 5), 100)  # Minimum 5, maximum 100
+    
+    query = Award.query
+    
+    if award_name:
+        query = query.filter(Award.AwardName.ilike(f'%{award_name}%'))
+    if year is not None:
+        query = query.filter(Award.YearWon == year)
+    
+    total_count = query.count()
+    
+    awards = query.options(
+        selectinload(Award.book)
+    ).order_by(
+        Award.YearWon.desc(), Award.AwardName, Award.AwardID
+    ).offset((page - 1) * per_page).limit(per_page).all()
+    
+    return jsonify({
+        "count": total_count,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
+        "awards": [{
+            **award.to_dict(),
+            "Book": award.book.to_dict() if award.book else None
+        } for award in awards]
+    }), 200
+
+@awards_bp.route('/awards/years/<int:year>', methods=['GET'])
+def get_award_winners(year):
+    """
+    Get the award-winning books of a year with author, info and editions
+    Loaded in a fixed number of batched queries whatever the number of awards
+    """
+    awards = Award.query.options(
+        selectinload(Award.book).options(*Book.extended_load_options())
+    ).filter(
+        Award.YearWon == year
+    ).order_by(
+        Award.AwardName, Award.AwardID
+    ).all()
+    
+    return jsonify({
+        "year": year,
+        "count": len(awards),
+        "winners": [{
+            **award.to_dict(),
+            "Book": award.book.to_dict_extended() if award.book else None
+        } for award in awards]
+    }), 200
@@ -1,9 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from models import db, Book, Edition, Author, Info, OrderDetail, Order
+from models import db, Book, Edition, Author, Info, Series, Publisher, OrderDetail, Order, Rating, RatingSummary
 from utils.auth import admin_required
+from utils.order_search import sync_books
+from utils.suggest import suggest_index
+from utils.ratings import apply_rating
+from utils.catalog import catalog
+from utils.partitions import sale_date_filters
+from utils.single_flight import coalesce
+from utils.bulk import (
+    BulkRow, BulkResult, apply_bulk_rows, bulk_payload, chunked,
+    existing_keys, existing_pairs, parse_date, LOOKUP_CHUNK_SIZE
+)
 from sqlalchemy import or_, func, text, desc, distinct
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 books_bp = Blueprint('books', __name__)
 
@@ -57,6 +67,15 @@ def get_all_books():
             query = query.order_by(desc(Author.LastName), desc(Author.FirstName))
         else:
             query = query.order_by(Author.LastName, Author.FirstName)
+    elif sort_by == 'rating':
+        # Uses idx_book_rating_summary_bayesian, ratings are never scanned here
+        # Best rated first by default, unrated books always last
+        query = query.outerjoin(RatingSummary, Book.BookID == RatingSummary.BookID)
+        query = query.order_by(RatingSummary.BayesianAverage.is_(None))
+        if order.lower() == 'asc' and 'order' in request.args:
+            query = query.order_by(RatingSummary.BayesianAverage, Book.BookID)
+        else:
+            query = query.order_by(desc(RatingSummary.BayesianAverage), Book.BookID)
     
     # Execute query
     books = query.all()
@@ -67,17 +86,20 @@ def get_all_books():
     }), 200
 
 @books_bp.route('/books/bestsellers', methods=['GET'])
+@coalesce
 def get_bestselling_books():
     """
     Get books with the most orders
     Using joins and indexes for optimal performance
+    Identical concurrent requests share one computation, see utils.single_flight
     """
     limit = request.args.get('limit', 10, type=int)
     days = request.args.get('days', 30, type=int)
     
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    # Sales from the last `days` days up to today, as a [start, end) date range
+    # on both tables' SaleDate so partitioned Orders/OrderDetails are pruned
+    start_date = (datetime.now() - timedelta(days=days)).date() + timedelta(days=1)
+    end_date = date.today() + timedelta(days=1)
     
     # Query for bestsellers using OrderDetails and Edition to join to Book
     query = db.session.query(
@@ -90,7 +112,7 @@ def get_bestselling_books():
     ).join(
         Order, OrderDetail.OrderID == Order.OrderID
     ).filter(
-        Order.SaleDate.between(start_date, end_date)
+        *sale_date_filters(start_date, end_date, Order.SaleDate, OrderDetail.SaleDate)
     ).group_by(
         Book.BookID
     ).order_by(
@@ -123,8 +145,8 @@ def get_book(book_id):
     
     if include_sales:
         # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        start_date = (datetime.now() - timedelta(days=days)).date() + timedelta(days=1)
+        end_date = date.today() + timedelta(days=1)
         
         # Get sales data
         sales_data = db.session.query(
@@ -135,7 +157,7 @@ def get_book(book_id):
             Edition, OrderDetail.ISBN == Edition.ISBN
         ).filter(
             Edition.BookID == book_id,
-            Order.SaleDate.between(start_date, end_date)
+            *sale_date_filters(start_date, end_date, Order.SaleDate, OrderDetail.SaleDate)
         ).scalar() or 0
         
         return jsonify({
@@ -148,6 +170,51 @@ def get_book(book_id):
     else:
         return jsonify({"book": book.to_dict_extended()}), 200
 
+@books_bp.route('/books/<book_id>/ratings/summary', methods=['GET'])
+def get_book_rating_summary(book_id):
+    """
+    Get the rating summary of a book: count, average, Bayesian average and star histogram
+    Served from book_rating_summary, no scan over ratings
+    """
+    summary = db.session.get(RatingSummary, book_id)
+    
+    if summary is None:
+        if not db.session.get(Book, book_id):
+            return jsonify({"message": "Book not found"}), 404
+        summary = RatingSummary(BookID=book_id, RatingCount=0, RatingSum=0)
+    
+    return jsonify({"summary": summary.to_dict()}), 200
+
+@books_bp.route('/books/<book_id>/ratings', methods=['POST'])
+@jwt_required()
+def create_book_rating(book_id):
+    """
+    Add a rating to a book and update its rating summary in the same transaction
+    """
+    data = request.get_json()
+    
+    if not db.session.get(Book, book_id):
+        return jsonify({"message": "Book not found"}), 404
+    
+    stars = data.get('Rating')
+    if not isinstance(stars, int) or not 1 <= stars <= 5:
+        return jsonify({"message": "Rating must be an integer from 1 to 5"}), 400
+    
+    rating = Rating(
+        BookID=book_id,
+        Rating=stars,
+        ReviewerID=data.get('ReviewerID')
+    )
+    db.session.add(rating)
+    summary = apply_rating(book_id, stars)
+    db.session.commit()
+    
+    return jsonify({
+        "message": "Rating created successfully",
+        "rating": rating.to_dict(),
+        "summary": summary.to_dict()
+    }), 201
+
 @books_bp.route('/books', methods=['POST'])
 @jwt_required()
 @admin_required
@@ -203,12 +270,142 @@ def create_book():
                 db.session.add(edition)
     
     db.session.commit()
+    suggest_index.put_book(book.BookID, book.Title)
     
     return jsonify({
         "message": "Book created successfully",
         "book": book.to_dict_extended()
     }), 201
 
+@books_bp.route('/books/bulk', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_upsert_books():
+    """
+    Insert or update many books, with their info and editions, at once (admin only)
+    Body: a list of books, or {"books": [...]}, each shaped like the create_book payload
+    AuthID, SeriesID and PubID references are validated with one set lookup per table,
+    rows are written in chunks and invalid rows are reported without aborting the batch
+    """
+    rows = bulk_payload(request.get_json(), 'books')
+    
+    if rows is None:
+        return jsonify({"message": "Expected a list of books"}), 400
+    
+    result = BulkResult(len(rows))
+    dict_rows = [row for row in rows if isinstance(row, dict)]
+    info_rows = [row['info'] for row in dict_rows if isinstance(row.get('info'), dict)]
+    edition_rows = [
+        edition for row in dict_rows if isinstance(row.get('editions'), list)
+        for edition in row['editions'] if isinstance(edition, dict)
+    ]
+    
+    # One lookup per referenced table for the whole batch
+    book_ids = [row.get('BookID') for row in dict_rows]
+    existing_books = existing_keys(Book.BookID, book_ids)
+    existing_info = existing_keys(Info.BookID, book_ids)
+    known_authors = existing_keys(Author.AuthID, [row.get('AuthID') for row in dict_rows])
+    known_series = existing_keys(Series.SeriesID, [info.get('SeriesID') for info in info_rows])
+    known_publishers = existing_keys(Publisher.PubID, [edition.get('PubID') for edition in edition_rows])
+    edition_books = existing_pairs(Edition.ISBN, Edition.BookID, [edition.get('ISBN') for edition in edition_rows])
+    
+    seen_books = set()
+    seen_isbns = set()
+    valid_rows = []
+    for index, row in enumerate(rows):
+        book_id = row.get('BookID') if isinstance(row, dict) else None
+        
+        if not book_id:
+            result.error(index, book_id, "BookID is required")
+            continue
+        if book_id in seen_books:
+            result.error(index, book_id, "Duplicate BookID in batch")
+            continue
+        seen_books.add(book_id)
+        
+        is_update = book_id in existing_books
+        if not is_update and 'Title' not in row:
+            result.error(index, book_id, "Title is required for new books")
+            continue
+        if row.get('AuthID') is not None and row['AuthID'] not in known_authors:
+            result.error(index, book_id, f"Unknown AuthID {row['AuthID']}")
+            continue
+        
+        book_mapping = {'BookID': book_id}
+        for field in ('Title', 'AuthID'):
+            if field in row:
+                book_mapping[field] = row[field]
+        operations = [(Book, book_mapping, is_update)]
+        
+        error = None
+        
+        info_data = row.get('info')
+        if isinstance(info_data, dict):
+            if info_data.get('SeriesID') is not None and info_data['SeriesID'] not in known_series:
+                error = f"Unknown SeriesID {info_data['SeriesID']}"
+            info_mapping = {'BookID': book_id}
+            for field in ('Genre', 'SeriesID', 'VolumeNumber', 'StaffComment'):
+                if field in info_data:
+                    info_mapping[field] = info_data[field]
+            operations.append((Info, info_mapping, book_id in existing_info))
+        
+        row_isbns = set()
+        for edition_data in row.get('editions') or []:
+            if error:
+                break
+            isbn = edition_data.get('ISBN') if isinstance(edition_data, dict) else None
+            if not isbn:
+                error = "Every edition needs an ISBN"
+            elif isbn in seen_isbns or isbn in row_isbns:
+                error = f"Duplicate ISBN {isbn} in batch"
+            elif isbn in edition_books and edition_books[isbn] != book_id:
+                error = f"ISBN {isbn} belongs to book {edition_books[isbn]}"
+            elif edition_data.get('PubID') is not None and edition_data['PubID'] not in known_publishers:
+                error = f"Unknown PubID {edition_data['PubID']}"
+            if error:
+                break
+            
+            edition_mapping = {'ISBN': isbn, 'BookID': book_id}
+            for field, column in (('Format', 'Formatt'), ('PubID', 'PubID'), ('Pages', 'Pages'),
+                                  ('PrintRunSizeK', 'PrintRunSizeK'), ('Price', 'Price')):
+                if field in edition_data:
+                    edition_mapping[column] = edition_data[field]
+            if 'PublicationDate' in edition_data:
+                try:
+                    edition_mapping['PublicationDate'] = parse_date(edition_data['PublicationDate'])
+                except ValueError:
+                    error = f"Invalid PublicationDate for ISBN {isbn}. Expected YYYY-MM-DD"
+                    break
+            row_isbns.add(isbn)
+            operations.append((Edition, edition_mapping, isbn in edition_books))
+        
+        if error:
+            result.error(index, book_id, error)
+            continue
+        
+        seen_isbns.update(row_isbns)
+        valid_rows.append(BulkRow(index, book_id, operations))
+    
+    apply_bulk_rows(valid_rows, result)
+    
+    # Bulk writes skip the session events, refresh the derived structures here
+    if result.inserted or result.updated:
+        catalog.bump()
+        
+        updated = set(result.updated)
+        sync_books([
+            row.key for row in valid_rows
+            if row.key in updated and ('Title' in row.operations[0][1] or 'AuthID' in row.operations[0][1])
+        ])
+        db.session.commit()
+        
+        if suggest_index.is_loaded:
+            for chunk in chunked(result.inserted + result.updated, LOOKUP_CHUNK_SIZE):
+                for book_id, title in db.session.query(Book.BookID, Book.Title).filter(Book.BookID.in_(chunk)):
+                    suggest_index.put_book(book_id, title)
+    
+    return jsonify(result.to_dict()), 200
+
 @books_bp.route('/books/<book_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
@@ -254,7 +451,12 @@ def update_book(book_id):
             )
             db.session.add(info)
     
+    # Keep the order search read model in step with title/author changes
+    if 'Title' in data or 'AuthID' in data:
+        sync_books([book_id])
+    
     db.session.commit()
+    suggest_index.put_book(book.BookID, book.Title)
     
     return jsonify({
         "message": "Book updated successfully",
@@ -274,7 +476,9 @@ def delete_book(book_id):
         return jsonify({"message": "Book not found"}), 404
     
     db.session.delete(book)
+    sync_books([book_id])
     db.session.commit()
+    suggest_index.remove_book(book_id)
     
     return jsonify({"message": "Book deleted successfully"}), 200
 
@@ -344,7 +548,9 @@ def get_series_books(series_id):
     Get all books in a series, sorted by volume number
     Uses the idx_info_seriesid index
     """
-    books = Book.query.join(Info).filter(
+    books = Book.query.join(Info).options(
+        *Book.extended_load_options()
+    ).filter(
         Info.SeriesID == series_id
     ).order_by(
         Info.VolumeNumber
@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from utils.auth import admin_required
+from utils.catalog import catalog
+
+catalog_bp = Blueprint('catalog', __name__)
+
+@catalog_bp.route('/catalog/snapshot', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_catalog_snapshot():
+    """
+    Report the in-process catalog snapshot: version, row counts and memory footprint (admin only)
+    """
+    snapshot = catalog.peek()
+    
+    if snapshot is None:
+        return jsonify({"message": "Catalog snapshot is not loaded", "version": catalog.version}), 404
+    
+    return jsonify({
+        "current_version": catalog.version,
+        "is_current": catalog.is_current(snapshot),
+        "snapshot": snapshot.footprint()
+    }), 200
+
+@catalog_bp.route('/catalog/snapshot/refresh', methods=['POST'])
+@jwt_required()
+@admin_required
+def refresh_catalog_snapshot():
+    """
+    Reload the catalog snapshot now, e.g. after running import_data.py (admin only)
+    """
+    snapshot = catalog.load()
+    
+    return jsonify({
+        "message": "Catalog snapshot refreshed",
+        "snapshot": snapshot.footprint()
+    }), 200
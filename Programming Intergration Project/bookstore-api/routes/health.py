@@ -0,0 +1,52 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from models import db, User
+from utils.health import readiness, diagnostics
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/health/live', methods=['GET'])
+def get_liveness():
+    """
+    Liveness: the process answers requests, no database or cache access
+    """
+    return jsonify({"status": "alive"}), 200
+
+@health_bp.route('/health/ready', methods=['GET'])
+def get_readiness():
+    """
+    Readiness for the load balancer: 503 until the startup warm-up has
+    finished, while the connection pool is exhausted or the database does not
+    answer; costs one SELECT 1. Failed warm-up steps are listed in warmup_failed
+    """
+    ready, report = readiness()
+    return jsonify(report), 200 if ready else 503
+
+@health_bp.route('/health/deep', methods=['GET'])
+def get_diagnostics():
+    """
+    Deep diagnostics: database latency, pool saturation, caches, job backlog
+    and replica lag; 503 when the database is down, "degraded" with the
+    reasons when a limit is exceeded. Cached for HEALTH_DEEP_CACHE_SECONDS
+    Only admins get the checks; anyone else gets the status and problems
+    """
+    report = diagnostics()
+    code = 503 if report['status'] == 'down' else 200
+    
+    if not _is_admin():
+        return jsonify({"status": report['status'], "problems": report['problems']}), code
+    return jsonify(report), code
+
+def _is_admin():
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    if not identity:
+        return False
+    
+    # With the database down the role cannot be checked
+    try:
+        user = User.query.get(identity)
+    except Exception:
+        db.session.rollback()
+        return False
+    return user is not None and user.role == 'admin'
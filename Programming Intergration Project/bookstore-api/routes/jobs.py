@@ -0,0 +1,124 @@
+import os
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, Job
+from utils.auth import admin_required
+from utils.jobs import JOB_KINDS, JOB_STATUSES, enqueue_job, cancel_job, export_path
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/jobs', methods=['POST'])
+@jwt_required()
+@admin_required
+def create_job():
+    """
+    Queue a background job (admin only)
+    Body: {"kind": "rebuild", "params": {"tables": ["order_search"]}}
+    or {"kind": "export_orders", "params": {"start_date": "2024-01-01", "end_date": "2024-12-31"}}
+    """
+    data = request.get_json() or {}
+    
+    if 'kind' not in data:
+        return jsonify({"message": f"kind is required. Choose from: {', '.join(sorted(JOB_KINDS))}"}), 400
+    
+    try:
+        job = enqueue_job(data['kind'], data.get('params'), created_by=get_jwt_identity())
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    
+    return jsonify({
+        "message": "Job queued",
+        "job": job.to_dict()
+    }), 202
+
+@jobs_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_jobs():
+    """
+    List jobs, newest first, optionally filtered by status and kind (admin only)
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    status = request.args.get('status')
+    kind = request.args.get('kind')
+    
+    # Limit per_page to reasonable values
+    per_page = min(max(per_page, 5), 100)  # Minimum 5, maximum 100
+    
+    if status and status not in JOB_STATUSES:
+        return jsonify({"message": f"Invalid status. Choose from: {', '.join(JOB_STATUSES)}"}), 400
+    
+    query = Job.query
+    if status:
+        query = query.filter(Job.Status == status)
+    if kind:
+        query = query.filter(Job.Kind == kind)
+    
+    total_count = query.count()
+    jobs = query.order_by(Job.JobID.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    
+    return jsonify({
+        "count": total_count,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
+        "jobs": [job.to_dict() for job in jobs]
+    }), 200
+
+@jobs_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_job(job_id):
+    """
+    Status, progress and result of one job (admin only)
+    """
+    job = db.session.get(Job, job_id)
+    
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    
+    return jsonify({"job": job.to_dict()}), 200
+
+@jobs_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+@admin_required
+def cancel_job_route(job_id):
+    """
+    Cancel a job (admin only)
+    Queued jobs are cancelled at once, running jobs stop at their next progress report
+    """
+    job = cancel_job(job_id)
+    
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    
+    if job.Status not in ('queued', 'running', 'cancelled'):
+        return jsonify({"message": f"Job already {job.Status}", "job": job.to_dict()}), 409
+    
+    return jsonify({
+        "message": "Cancellation requested" if job.Status == 'running' else "Job cancelled",
+        "job": job.to_dict()
+    }), 200
+
+@jobs_bp.route('/jobs/<int:job_id>/download', methods=['GET'])
+@jwt_required()
+@admin_required
+def download_job_file(job_id):
+    """
+    Download the file written by a finished export job (admin only)
+    """
+    job = db.session.get(Job, job_id)
+    
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    
+    result = job.to_dict()['Result'] or {}
+    if job.Status != 'succeeded' or 'file' not in result:
+        return jsonify({"message": "Job has no file to download"}), 404
+    
+    path = export_path(result['file'])
+    if not os.path.exists(path):
+        return jsonify({"message": "Export file no longer exists"}), 410
+    
+    return send_file(path, mimetype='text/csv', as_attachment=True, download_name=result['file'])
@@ -1,16 +1,43 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Order, OrderDetail, Edition, Book
+from models import db, Order, OrderDetail, Edition, Book, OrderSearch, OrderArchive, OrderDetailArchive, OrderKey
 from utils.auth import admin_required
+from utils.order_search import sync_orders
+from utils.order_lookup import order_id_filter
+from utils.suggest import suggest_index
+from utils.sales_cube import sales_cube
+from utils.revenue import revenue_cells, sync_daily_revenue, month_expression
+from utils.order_buffer import order_buffer
+from utils.order_format import OrderSerializer
+from utils.partitions import sale_date_filters
+from utils.archive import reads_archive, archive_query, merged_page
+from utils.single_flight import coalesce
 from datetime import datetime, timedelta
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, text
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy import func, insert, text
 
 orders_bp = Blueprint('orders', __name__)
 
+# Length of the OrderID and ItemID columns
+KEY_MAX_LENGTH = 30
+
 @orders_bp.route('/orders', methods=['GET'])
 @jwt_required()
 def get_all_orders():
+    """
+    List orders with optional filters
+    format=compact side-loads books, authors and editions once per page,
+    fields[<type>]=... narrows each object, see utils.order_format
+    """
+    # ?ids=A,B,C is a batch lookup by primary key
+    if request.args.get('ids'):
+        return batch_get_orders(request.args.get('ids').split(','))
+
+    try:
+        serializer = OrderSerializer.from_request(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     order_id = request.args.get('order_id')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -28,19 +55,21 @@ def get_all_orders():
 
     query = Order.query
 
-    # Using fulltext index for OrderID search
+    # OrderID search: exact PK lookup, prefix range scan or ngram search
+    # depending on the term, see utils.order_lookup
+    order_id_clause = None
     if order_id:
-        # Use MySQL's MATCH AGAINST for fulltext search on OrderID
-        # This will utilize the idx_orders_orderid_fulltext index
-        query = query.filter(text("MATCH(OrderID) AGAINST(:order_id IN BOOLEAN MODE)").bindparams(order_id=f'*{order_id}*'))
+        _, order_id_clause = order_id_filter(Order.OrderID, order_id)
+        if order_id_clause is not None:
+            query = query.filter(order_id_clause)
 
-    # Date range search using idx_orders_saledate or idx_orders_date_id
+    # Date range search using idx_orders_date_id; [start, end) on the
+    # partition key so partitioned Orders/OrderDetails are pruned
+    start = end = None
     if start_date and end_date and date_range_only:
-        # When only filtering by date range, use idx_orders_saledate
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Order.SaleDate.between(start, end))
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
         except ValueError:
             return jsonify({"message": "Invalid date format. Expected YYYY-MM-DD"}), 422
     else:
@@ -48,50 +77,60 @@ def get_all_orders():
         if start_date:
             try:
                 if start_date.strip():
-                    start = datetime.strptime(start_date, '%Y-%m-%d')
-                    query = query.filter(Order.SaleDate >= start)
+                    start = datetime.strptime(start_date, '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
 
         if end_date:
             try:
                 if end_date.strip():
-                    end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-                    query = query.filter(Order.SaleDate <= end)
+                    end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
             except ValueError:
                 return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
 
+    query = query.filter(*sale_date_filters(start, end, Order.SaleDate))
+
     # ISBN filter using join and idx_orderdetails_isbn
     if isbn:
-        query = query.join(OrderDetail, Order.OrderID == OrderDetail.OrderID).filter(OrderDetail.ISBN == isbn)
+        query = query.join(OrderDetail, Order.OrderID == OrderDetail.OrderID) \
+                    .filter(OrderDetail.ISBN == isbn, *sale_date_filters(start, end, OrderDetail.SaleDate))
 
     # Book ID filter requiring joins through Edition table
     if book_id:
         query = query.join(OrderDetail, Order.OrderID == OrderDetail.OrderID) \
                     .join(Edition, OrderDetail.ISBN == Edition.ISBN) \
-                    .filter(Edition.BookID == book_id)
+                    .filter(Edition.BookID == book_id, *sale_date_filters(start, end, OrderDetail.SaleDate))
 
     # Ensure results are distinct when using joins
     if isbn or book_id:
         query = query.distinct()
 
-    # Apply sorting to utilize composite index
-    query = query.order_by(Order.SaleDate, Order.OrderID)
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination - important to do this AFTER the counting
-    query = query.offset((page - 1) * per_page).limit(per_page)
-
-    orders = query.all()
+    # A start date before the archive boundary pages through archived orders too
+    if reads_archive(start):
+        archived = archive_query(
+            start, end, isbn, book_id,
+            order_id_filter(OrderArchive.OrderID, order_id, use_fulltext=False)[1] if order_id_clause is not None else None
+        )
+        total_count, orders = merged_page(query, archived, page, per_page, serializer.needs_catalog_rows)
+    else:
+        # Apply sorting to utilize composite index
+        query = query.order_by(Order.SaleDate, Order.OrderID)
+        
+        # Get total count for pagination
+        total_count = query.count()
+        
+        # Apply pagination - important to do this AFTER the counting
+        query = query.offset((page - 1) * per_page).limit(per_page)
+        
+        orders = query.options(*Order.detail_load_options(with_catalog=serializer.needs_catalog_rows)).all()
 
     return jsonify({
         "count": total_count,
         "page": page,
         "per_page": per_page,
         "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
-        "orders": [order.to_dict() for order in orders]
+        "orders": [serializer.order(order) for order in orders],
+        **serializer.included()
     }), 200
 
 @orders_bp.route('/orders/search', methods=['GET'])
@@ -99,8 +138,15 @@ def get_all_orders():
 def search_orders():
     """
     Advanced search endpoint that combines multiple filters
-    and makes optimal use of database indexes with pagination
+    Line-level filters run against the denormalized order_search table,
+    so title + author + date searches are single-table indexed queries
+    Accepts format=compact and fields[<type>]=... like GET /orders
     """
+    try:
+        serializer = OrderSerializer.from_request(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    
     search_term = request.args.get('search', '')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -116,118 +162,297 @@ def search_orders():
     # Limit per_page to reasonable values
     per_page = min(max(per_page, 5), 100)  # Minimum 5, maximum 100
     
-    # Start with a base query joining orders and order details
-    query = db.session.query(Order).distinct()
+    # Line-level filters are answered from order_search, grouped per order;
+    # otherwise the Orders table alone is enough
+    if isbn or min_quantity or book_title or author_last_name:
+        source = OrderSearch
+        query = db.session.query(
+            OrderSearch.OrderID, OrderSearch.SaleDate
+        ).group_by(
+            OrderSearch.OrderID, OrderSearch.SaleDate
+        )
+        
+        if isbn:
+            # Uses idx_order_search_isbn_date
+            query = query.filter(OrderSearch.ISBN == isbn)
+            
+        if min_quantity:
+            query = query.filter(OrderSearch.Quantity >= min_quantity)
+            
+        if book_title:
+            # Title is stored lowercased, no LOWER() needed at query time
+            query = query.filter(OrderSearch.TitleLower.like(f'%{book_title.lower()}%'))
+            
+        if author_last_name:
+            query = query.filter(OrderSearch.LastNameLower.like(f'%{author_last_name.lower()}%'))
+    else:
+        source = Order
+        query = db.session.query(Order.OrderID, Order.SaleDate)
     
-    # Apply search term to OrderID using fulltext index
+    # Apply search term to OrderID, prefix lookups use the leading OrderID
+    # column of either table's primary key
     if search_term:
-        query = query.filter(text("MATCH(Orders.OrderID) AGAINST(:term IN BOOLEAN MODE)").bindparams(term=f'*{search_term}*'))
+        _, order_id_clause = order_id_filter(source.OrderID, search_term)
+        if order_id_clause is not None:
+            query = query.filter(order_id_clause)
     
-    # Apply date range filters using date index
+    # Apply date range filters using date index, [start, end) on constant dates
+    start = end = None
     if start_date:
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(Order.SaleDate >= start)
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
 
     if end_date:
         try:
-            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Order.SaleDate <= end)
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
     
-    # Join tables and apply additional filters
-    if isbn or min_quantity or book_title or author_last_name:
-        query = query.join(OrderDetail, Order.OrderID == OrderDetail.OrderID)
-        
-        if isbn:
-            query = query.filter(OrderDetail.ISBN == isbn)
-            
-        if min_quantity:
-            query = query.filter(OrderDetail.Quantity >= min_quantity)
-            
-        if book_title or author_last_name:
-            query = query.join(Edition, OrderDetail.ISBN == Edition.ISBN)
-            query = query.join(Book, Edition.BookID == Book.BookID)
-            
-            if book_title:
-                # Use the idx_book_title_ci index for case-insensitive title search
-                query = query.filter(func.lower(Book.Title).like(f'%{book_title.lower()}%'))
-                
-            if author_last_name:
-                # Use the idx_book_authid index to join to Author and then use idx_author_lastname_ci
-                from models import Author
-                query = query.join(Author, Book.AuthID == Author.AuthID)
-                query = query.filter(func.lower(Author.LastName).like(f'%{author_last_name.lower()}%'))
-    
-    # Get total count for pagination before applying limits
-    total_count = query.count()
+    query = query.filter(*sale_date_filters(start, end, source.SaleDate))
     
-    # Apply sorting to utilize composite index
-    query = query.order_by(Order.SaleDate, Order.OrderID)
+    # Fetch the page and the total in one statement with a window count
+    rows = query.add_columns(
+        func.count().over().label('total_count')
+    ).order_by(
+        source.SaleDate, source.OrderID
+    ).offset((page - 1) * per_page).limit(per_page).all()
     
-    # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    orders = query.all()
+    if rows:
+        total_count = rows[0].total_count
+    else:
+        # Past the last page the window has no row to report on
+        total_count = query.count() if page > 1 else 0
+    
+    # Load the page of orders by primary key, keeping the search order
+    order_ids = [row.OrderID for row in rows]
+    orders_by_id = {
+        order.OrderID: order
+        for order in Order.query.options(
+            *Order.detail_load_options(with_catalog=serializer.needs_catalog_rows)
+        ).filter(Order.OrderID.in_(order_ids))
+    }
+    orders = [orders_by_id[order_id] for order_id in order_ids if order_id in orders_by_id]
     
     return jsonify({
         "count": total_count,
         "page": page,
         "per_page": per_page,
         "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
-        "orders": [order.to_dict() for order in orders]
+        "orders": [serializer.order(order) for order in orders],
+        **serializer.included()
     }), 200
 
 # Keep the rest of the original methods
 @orders_bp.route('/orders/summary', methods=['GET'])
 @jwt_required()
+@coalesce
 def get_orders_summary():
     """
     Get summary statistics for orders with optional date range filter
     Utilizes the idx_orders_saledate index
+    Identical concurrent requests share one computation, see utils.single_flight
     """
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
+    sale_month = month_expression(Order.SaleDate)
     query = db.session.query(
-        func.date_format(Order.SaleDate, '%Y-%m').label('month'),
+        sale_month.label('month'),
         func.count().label('order_count'),
         func.sum(OrderDetail.Quantity).label('total_items')
     ).join(OrderDetail, Order.OrderID == OrderDetail.OrderID)
     
+    start = end = None
     if start_date:
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(Order.SaleDate >= start)
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
 
     if end_date:
         try:
-            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Order.SaleDate <= end)
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
     
-    result = query.group_by(func.date_format(Order.SaleDate, '%Y-%m')).order_by(text('month')).all()
+    query = query.filter(*sale_date_filters(start, end, Order.SaleDate, OrderDetail.SaleDate))
+    
+    result = query.group_by(sale_month).order_by(text('month')).all()
+    summary = {item.month: {"month": item.month, "order_count": item.order_count, "total_items": item.total_items} for item in result}
+    
+    # Months before the archive boundary are added up from the archived lines
+    if reads_archive(start):
+        archived_month = month_expression(OrderDetailArchive.SaleDate)
+        archived = db.session.query(
+            archived_month.label('month'),
+            func.count().label('order_count'),
+            func.sum(OrderDetailArchive.Quantity).label('total_items')
+        ).filter(
+            *sale_date_filters(start, end, OrderDetailArchive.SaleDate)
+        ).group_by(archived_month).all()
+        
+        for item in archived:
+            month = summary.setdefault(item.month, {"month": item.month, "order_count": 0, "total_items": 0})
+            month["order_count"] += item.order_count
+            month["total_items"] = (month["total_items"] or 0) + (item.total_items or 0)
     
     return jsonify({
-        "summary": [{"month": item.month, "order_count": item.order_count, "total_items": item.total_items} for item in result]
+        "summary": [summary[month] for month in sorted(summary)]
     }), 200
 
+def batch_get_orders(order_ids):
+    """
+    Fetch up to ORDER_BATCH_MAX orders by primary key with one IN query,
+    their lines (and catalog rows when no snapshot is loaded) eager-loaded
+    Returns orders keyed by OrderID, in request order, plus the IDs that were not found
+    """
+    order_ids = list(dict.fromkeys(str(order_id).strip() for order_id in order_ids if str(order_id).strip()))
+    batch_max = current_app.config.get('ORDER_BATCH_MAX', 100)
+
+    if not order_ids:
+        return jsonify({"message": "At least one order ID is required"}), 400
+
+    if len(order_ids) > batch_max:
+        return jsonify({"message": f"At most {batch_max} order IDs can be fetched at once"}), 400
+
+    try:
+        serializer = OrderSerializer.from_request(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    orders = Order.query.options(
+        *Order.detail_load_options(with_catalog=serializer.needs_catalog_rows)
+    ).filter(
+        Order.OrderID.in_(order_ids)
+    ).all()
+    orders_by_id = {order.OrderID: order for order in orders}
+
+    # IDs missing from the hot tables are looked up by the archive's primary key
+    missing = [order_id for order_id in order_ids if order_id not in orders_by_id]
+    if missing:
+        orders_by_id.update({
+            order.OrderID: order
+            for order in OrderArchive.query.options(
+                *OrderArchive.detail_load_options(with_catalog=serializer.needs_catalog_rows)
+            ).filter(OrderArchive.OrderID.in_(missing))
+        })
+
+    response = {
+        "count": len(orders_by_id),
+        "orders": {order_id: serializer.order(orders_by_id[order_id]) for order_id in order_ids if order_id in orders_by_id},
+        "not_found": [order_id for order_id in order_ids if order_id not in orders_by_id],
+        **serializer.included()
+    }
+
+    # jsonify sorts keys, which would put the orders in OrderID order
+    return current_app.response_class(
+        current_app.json.dumps(response, sort_keys=False) + "\n",
+        mimetype=current_app.json.mimetype
+    ), 200
+
+@orders_bp.route('/orders/batch-get', methods=['POST'])
+@jwt_required()
+def batch_get_orders_route():
+    """
+    Batch order lookup, body: {"ids": ["ORD-1", "ORD-2", ...]}
+    """
+    data = request.get_json()
+    order_ids = data.get('ids') if isinstance(data, dict) else None
+
+    if not isinstance(order_ids, list):
+        return jsonify({"message": "ids must be a list of order IDs"}), 400
+
+    return batch_get_orders(order_ids)
+
 @orders_bp.route('/orders/<order_id>', methods=['GET'])
 @jwt_required()
 def get_order(order_id):
     order = Order.query.get(order_id)
 
     if not order:
+        # Archived orders are read-only, point lookups go through the archive's primary key
+        archived = OrderArchive.query.get(order_id)
+        if archived:
+            return jsonify({"order": archived.to_dict(), "archived": True}), 200
+
+        # Accepted in write-behind mode but not flushed yet, or rejected by the flush
+        status, detail = order_buffer.status(order_id)
+        if status == 'pending':
+            return jsonify({"status": "pending", "order": detail}), 202
+        if status == 'rejected':
+            return jsonify({"status": "rejected", "message": detail}), 409
         return jsonify({"message": "Order not found"}), 404
 
     return jsonify({"order": order.to_dict()}), 200
 
+@orders_bp.route('/orders/write-behind', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_write_behind_stats():
+    """
+    Queue depth, flush timings and rejections of the write-behind buffer (admin only)
+    """
+    return jsonify({
+        "enabled": current_app.config['ORDER_WRITE_BEHIND'],
+        "stats": order_buffer.stats()
+    }), 200
+
+def accept_order(data):
+    """
+    Write-behind create_order: validate against the in-memory ISBN set, spool
+    the order and answer 202 with a pending status; the flusher thread writes
+    it to the database with the next batch
+    Everything the flush would refuse is rejected here, since the client has
+    been answered by the time the flush runs
+    """
+    order_id = data.get('OrderID')
+    if not isinstance(order_id, str) or not order_id.strip() or len(order_id) > KEY_MAX_LENGTH:
+        return jsonify({"message": f"OrderID must be a non-empty string of at most {KEY_MAX_LENGTH} characters"}), 400
+
+    try:
+        sale_date = datetime.strptime(data.get('SaleDate') or datetime.now().strftime('%Y-%m-%d'), '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid SaleDate format. Expected YYYY-MM-DD"}), 400
+
+    isbns = order_buffer.known_isbns()
+    items = []
+    for i, item_data in enumerate(data.get('items') if isinstance(data.get('items'), list) else []):
+        if not isinstance(item_data, dict) or 'ISBN' not in item_data:
+            continue
+        if not isinstance(item_data['ISBN'], str) or item_data['ISBN'] not in isbns:
+            return jsonify({"message": f"Error creating order: ISBN {item_data['ISBN']} not found"}), 400
+
+        item_id = item_data.get('ItemID', f"{i+1}")
+        if not isinstance(item_id, (str, int)) or isinstance(item_id, bool) or not str(item_id).strip() \
+                or len(str(item_id)) > KEY_MAX_LENGTH:
+            return jsonify({"message": f"Error creating order: ItemID must be a string of at most {KEY_MAX_LENGTH} characters"}), 400
+        item_id = str(item_id)
+        if any(item['ItemID'] == item_id for item in items):
+            return jsonify({"message": f"Error creating order: duplicate ItemID {item_id}"}), 400
+
+        quantity = item_data.get('Quantity', 1)
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+            return jsonify({"message": f"Error creating order: Quantity of item {item_id} must be a positive integer"}), 400
+
+        items.append({
+            "ItemID": item_id,
+            "ISBN": item_data['ISBN'],
+            "Quantity": quantity
+        })
+
+    try:
+        order = order_buffer.submit({
+            "OrderID": order_id,
+            "SaleDate": sale_date.strftime('%Y-%m-%d'),
+            "items": items
+        })
+    except ValueError as e:
+        return jsonify({"message": f"Error creating order: {str(e)}"}), 409
+
+    return jsonify({"message": "Order accepted", "status": "pending", "order": order}), 202
+
 @orders_bp.route('/orders', methods=['POST'])
 @jwt_required()
 def create_order():
@@ -236,11 +461,24 @@ def create_order():
     if 'OrderID' not in data:
         return jsonify({"message": "OrderID is required"}), 400
 
+    if order_buffer.is_running:
+        return accept_order(data)
+
+    # A partitioned Orders table no longer enforces OrderID uniqueness on its own:
+    # claim the OrderID in order_ids, which holds hot and archived IDs; a
+    # concurrent create of the same ID waits on the row and then fails here
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(OrderKey).values(OrderID=data['OrderID']))
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"message": f"Error creating order: OrderID {data['OrderID']} already exists"}), 400
+
     try:
         with db.session.begin_nested():
             order = Order(
                 OrderID=data['OrderID'],
-                SaleDate=data.get('SaleDate', datetime.now().strftime('%Y-%m-%d'))
+                SaleDate=datetime.strptime(data.get('SaleDate', datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d').date()
             )
             db.session.add(order)
 
@@ -259,61 +497,254 @@ def create_order():
                             "OrderID": order.OrderID,
                             "ItemID": item_id,
                             "ISBN": item_data['ISBN'],
-                            "Quantity": quantity
+                            "Quantity": quantity,
+                            "SaleDate": order.SaleDate
                         })
 
                 if order_details:
                     db.session.bulk_insert_mappings(OrderDetail, order_details)
 
+            sync_orders([order.OrderID])
+            sync_daily_revenue([order.OrderID])
+
         db.session.commit()
+        suggest_index.put_order(order.OrderID, order.SaleDate)
+        sales_cube.append_order(order.OrderID)
         return jsonify({"message": "Order created successfully", "order": order.to_dict()}), 201
 
     except (SQLAlchemyError, ValueError) as e:
         db.session.rollback()
         return jsonify({"message": f"Error creating order: {str(e)}"}), 400
 
+def apply_line_changes(order_id, sale_date, upserts, deletes=(), replace=False):
+    """
+    Diff the wanted order lines against the stored ones and apply the
+    difference with at most one batched statement per kind
+    upserts maps ItemID -> {"ISBN": ..., "Quantity": ...} (either key optional
+    for existing lines), deletes lists ItemIDs to remove; with replace every
+    line missing from upserts is removed
+    Unchanged lines are not touched, so the order's index entries and undo
+    log only churn for lines that really changed
+    New lines get sale_date, the copy of the order's SaleDate that
+    OrderDetails is partitioned by
+    Returns the inserted/updated/deleted ItemIDs
+    """
+    existing = {
+        detail.ItemID: detail
+        for detail in OrderDetail.query.filter(OrderDetail.OrderID == order_id)
+    }
+
+    inserts, updates = [], []
+    for item_id, values in upserts.items():
+        current = existing.get(item_id)
+        if current is None:
+            inserts.append({
+                "OrderID": order_id,
+                "ItemID": item_id,
+                "ISBN": values['ISBN'],
+                "Quantity": values.get('Quantity', 1),
+                "SaleDate": sale_date
+            })
+            continue
+
+        changes = {
+            key: value for key, value in values.items()
+            if key in ('ISBN', 'Quantity') and getattr(current, key) != value
+        }
+        if changes:
+            updates.append({"OrderID": order_id, "ItemID": item_id, **changes})
+
+    if replace:
+        deletes = [item_id for item_id in existing if item_id not in upserts]
+    removed = [item_id for item_id in deletes if item_id in existing]
+
+    # Plain statements below bypass the identity map, drop the loaded lines
+    for detail in existing.values():
+        db.session.expunge(detail)
+
+    if inserts:
+        db.session.bulk_insert_mappings(OrderDetail, inserts)
+    if updates:
+        db.session.bulk_update_mappings(OrderDetail, updates)
+    if removed:
+        OrderDetail.query.filter(
+            OrderDetail.OrderID == order_id,
+            OrderDetail.ItemID.in_(removed)
+        ).delete(synchronize_session=False)
+
+    return {
+        "inserted": [row['ItemID'] for row in inserts],
+        "updated": [row['ItemID'] for row in updates],
+        "deleted": removed
+    }
+
+def invalid_isbns(isbns):
+    """
+    ISBNs from the list that do not exist, checked with one IN query
+    """
+    isbns = {isbn for isbn in isbns if isbn is not None}
+    if not isbns:
+        return []
+    valid_isbn_set = {isbn for (isbn,) in db.session.query(Edition.ISBN).filter(Edition.ISBN.in_(isbns))}
+    return sorted(isbns - valid_isbn_set)
+
+def save_line_changes(order, upserts, deletes=(), replace=False, sale_date=None):
+    """
+    Apply line changes, and a new sale_date if given, to an order and keep
+    the derived tables in step
+    """
+    order_id = order.OrderID
+
+    # Revenue cells the order contributes to before the change, so under its old date
+    previous_cells = revenue_cells([order_id])
+
+    date_changed = sale_date is not None and sale_date != order.SaleDate
+    if date_changed:
+        order.SaleDate = sale_date
+
+    changes = apply_line_changes(order_id, order.SaleDate, upserts, deletes, replace)
+
+    # Existing lines follow the order to its new date (and partition)
+    if date_changed:
+        OrderDetail.query.filter(OrderDetail.OrderID == order_id).update(
+            {OrderDetail.SaleDate: order.SaleDate}, synchronize_session=False
+        )
+
+    sync_orders([order_id])
+    sync_daily_revenue([order_id], previous_cells)
+    db.session.commit()
+    sales_cube.invalidate()
+
+    return changes
+
 @orders_bp.route('/orders/<order_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
 def update_order(order_id):
+    """
+    Replace an order's lines with the given items (admin only)
+    Only the lines that differ are inserted, updated or deleted
+    Omitting items leaves the lines as they are
+    """
     data = request.get_json()
     order = Order.query.get(order_id)
 
     if not order:
         return jsonify({"message": "Order not found"}), 404
 
+    items = [item for item in data.get('items', []) if 'ISBN' in item]
+
+    bad_isbns = invalid_isbns(item['ISBN'] for item in items)
+    if bad_isbns:
+        return jsonify({"message": f"Invalid ISBNs: {', '.join(bad_isbns)}"}), 400
+
+    sale_date = None
     if 'SaleDate' in data:
-        order.SaleDate = data['SaleDate']
+        try:
+            sale_date = datetime.strptime(data['SaleDate'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({"message": "Invalid SaleDate format. Expected YYYY-MM-DD"}), 422
+
+    upserts = {
+        str(item.get('ItemID', index + 1)): {
+            "ISBN": item['ISBN'],
+            "Quantity": item.get('Quantity', 1)
+        }
+        for index, item in enumerate(items)
+    }
+
+    changes = save_line_changes(order, upserts, replace='items' in data, sale_date=sale_date)
+
+    return jsonify({
+        "message": "Order updated successfully",
+        "changes": changes,
+        "order": order.to_dict()
+    }), 200
+
+@orders_bp.route('/orders/<order_id>', methods=['PATCH'])
+@jwt_required()
+@admin_required
+def patch_order(order_id):
+    """
+    Partially update an order (admin only)
+    Listed items are inserted or updated, a Quantity of 0 removes the line,
+    lines that are not listed are left untouched
+    """
+    data = request.get_json()
+    order = Order.query.get(order_id)
+
+    if not order:
+        return jsonify({"message": "Order not found"}), 404
 
     items = data.get('items', [])
-    isbns = [item.get('ISBN') for item in items if 'ISBN' in item]
-    valid_editions = Edition.query.filter(Edition.ISBN.in_(isbns)).all()
-    valid_isbn_set = {edition.ISBN for edition in valid_editions}
-
-    invalid_isbns = [isbn for isbn in isbns if isbn not in valid_isbn_set]
-    if invalid_isbns:
-        return jsonify({"message": f"Invalid ISBNs: {', '.join(invalid_isbns)}"}), 400
-
-    OrderDetail.query.filter_by(OrderID=order_id).delete()
-
-    new_order_details = [
-        OrderDetail(
-            OrderID=order_id,
-            ItemID=item.get('ItemID', str(index + 1)),
-            ISBN=item['ISBN'],
-            Quantity=item.get('Quantity', 1)
-        )
-        for index, item in enumerate(items) if item['ISBN'] in valid_isbn_set
+    if any('ItemID' not in item for item in items):
+        return jsonify({"message": "Every item needs an ItemID"}), 400
+
+    bad_isbns = invalid_isbns(item.get('ISBN') for item in items)
+    if bad_isbns:
+        return jsonify({"message": f"Invalid ISBNs: {', '.join(bad_isbns)}"}), 400
+
+    existing_ids = {item_id for (item_id,) in db.session.query(OrderDetail.ItemID).filter(OrderDetail.OrderID == order_id)}
+    new_without_isbn = [
+        str(item['ItemID']) for item in items
+        if str(item['ItemID']) not in existing_ids and 'ISBN' not in item and item.get('Quantity') != 0
     ]
+    if new_without_isbn:
+        return jsonify({"message": f"ISBN is required for new items: {', '.join(new_without_isbn)}"}), 400
 
-    db.session.bulk_save_objects(new_order_details)
-    db.session.commit()
+    sale_date = None
+    if 'SaleDate' in data:
+        try:
+            sale_date = datetime.strptime(data['SaleDate'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({"message": "Invalid SaleDate format. Expected YYYY-MM-DD"}), 422
+
+    upserts = {
+        str(item['ItemID']): {key: item[key] for key in ('ISBN', 'Quantity') if key in item}
+        for item in items if item.get('Quantity') != 0
+    }
+    deletes = [str(item['ItemID']) for item in items if item.get('Quantity') == 0]
+
+    changes = save_line_changes(order, upserts, deletes, sale_date=sale_date)
 
     return jsonify({
         "message": "Order updated successfully",
+        "changes": changes,
         "order": order.to_dict()
     }), 200
 
+@orders_bp.route('/orders/<order_id>/items/<item_id>', methods=['PATCH'])
+@jwt_required()
+@admin_required
+def patch_order_item(order_id, item_id):
+    """
+    Change a single line item's Quantity and/or ISBN (admin only)
+    """
+    data = request.get_json()
+    detail = db.session.get(OrderDetail, (order_id, item_id))
+
+    if not detail:
+        return jsonify({"message": "Order item not found"}), 404
+
+    values = {key: data[key] for key in ('ISBN', 'Quantity') if key in data}
+    if not values:
+        return jsonify({"message": "ISBN or Quantity is required"}), 400
+
+    if 'Quantity' in values and (not isinstance(values['Quantity'], int) or values['Quantity'] < 1):
+        return jsonify({"message": "Quantity must be a positive integer"}), 400
+
+    bad_isbns = invalid_isbns([values.get('ISBN')])
+    if bad_isbns:
+        return jsonify({"message": f"Invalid ISBNs: {', '.join(bad_isbns)}"}), 400
+
+    changes = save_line_changes(detail.order, {item_id: values})
+
+    return jsonify({
+        "message": "Order item updated successfully",
+        "changes": changes,
+        "order": Order.query.get(order_id).to_dict()
+    }), 200
+
 @orders_bp.route('/orders/<order_id>', methods=['DELETE'])
 @jwt_required()
 @admin_required
@@ -324,12 +755,19 @@ def delete_order(order_id):
         return jsonify({"message": "Order not found"}), 404
 
     try:
+        previous_cells = revenue_cells([order_id])
+
         # Delete associated OrderDetails first
         OrderDetail.query.filter_by(OrderID=order_id).delete()
 
-        # Delete the Order
+        # Delete the Order and free its OrderID
         db.session.delete(order)
+        OrderKey.query.filter_by(OrderID=order_id).delete()
+        sync_orders([order_id])
+        sync_daily_revenue([order_id], previous_cells)
         db.session.commit()
+        suggest_index.remove_order(order_id)
+        sales_cube.invalidate()
         
         return jsonify({"message": "Order deleted successfully"}), 200
     except SQLAlchemyError as e:
@@ -342,7 +780,13 @@ def get_orders_by_isbn(isbn):
     """
     Get all orders containing a specific ISBN
     Utilizes the idx_orderdetails_isbn index
+    Accepts format=compact and fields[<type>]=... like GET /orders
     """
+    try:
+        serializer = OrderSerializer.from_request(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
@@ -356,31 +800,38 @@ def get_orders_by_isbn(isbn):
     # Build query using the ISBN index
     query = Order.query.join(OrderDetail).filter(OrderDetail.ISBN == isbn)
     
-    # Apply date filtering if provided
+    # Apply date filtering if provided, on both tables so both are pruned
+    start = end = None
     if start_date:
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(Order.SaleDate >= start)
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
 
     if end_date:
         try:
-            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Order.SaleDate <= end)
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
     
-    # Get total count for pagination
-    total_count = query.count()
+    query = query.filter(*sale_date_filters(start, end, Order.SaleDate, OrderDetail.SaleDate))
     
-    # Sort by date to use composite index
-    query = query.order_by(Order.SaleDate)
-    
-    # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    orders = query.all()
+    # A start date before the archive boundary pages through archived orders too
+    if reads_archive(start):
+        total_count, orders = merged_page(
+            query, archive_query(start, end, isbn=isbn), page, per_page, serializer.needs_catalog_rows
+        )
+    else:
+        # Get total count for pagination
+        total_count = query.count()
+        
+        # Sort by date to use composite index
+        query = query.order_by(Order.SaleDate)
+        
+        # Apply pagination
+        query = query.offset((page - 1) * per_page).limit(per_page)
+        
+        orders = query.options(*Order.detail_load_options(with_catalog=serializer.needs_catalog_rows)).all()
     
     return jsonify({
         "isbn": isbn,
@@ -388,7 +839,8 @@ def get_orders_by_isbn(isbn):
         "page": page,
         "per_page": per_page,
         "total_pages": (total_count + per_page - 1) // per_page,
-        "orders": [order.to_dict() for order in orders]
+        "orders": [serializer.order(order) for order in orders],
+        **serializer.included()
     }), 200
 
 @orders_bp.route('/orders/books-sold/<book_id>', methods=['GET'])
@@ -425,24 +877,35 @@ def get_books_sold(book_id):
         OrderDetail.ISBN.in_(isbn_list)
     )
     
-    # Apply date filtering if provided
+    # Apply date filtering if provided, on both tables so both are pruned
+    start = end = None
     if start_date:
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(Order.SaleDate >= start)
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({"message": "Invalid start_date format. Expected YYYY-MM-DD"}), 422
 
     if end_date:
         try:
-            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Order.SaleDate <= end)
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Expected YYYY-MM-DD"}), 422
     
+    query = query.filter(*sale_date_filters(start, end, Order.SaleDate, OrderDetail.SaleDate))
+    
     # Group and get results
     results = query.group_by(OrderDetail.ISBN).all()
     
+    # Archived lines count too when the range reaches before the archive boundary
+    if reads_archive(start):
+        results += db.session.query(
+            OrderDetailArchive.ISBN,
+            func.count(OrderDetailArchive.OrderID).label('order_count'),
+            func.sum(OrderDetailArchive.Quantity).label('total_quantity')
+        ).filter(
+            OrderDetailArchive.ISBN.in_(isbn_list), *sale_date_filters(start, end, OrderDetailArchive.SaleDate)
+        ).group_by(OrderDetailArchive.ISBN).all()
+    
     # Format the results
     editions_data = {
         edition.ISBN: {
@@ -454,6 +917,10 @@ def get_books_sold(book_id):
     
     sales_data = {}
     for isbn, order_count, total_quantity in results:
+        if isbn in sales_data:
+            sales_data[isbn]["order_count"] += order_count
+            sales_data[isbn]["total_quantity"] += total_quantity
+            continue
         sales_data[isbn] = {
             "order_count": order_count,
             "total_quantity": total_quantity,
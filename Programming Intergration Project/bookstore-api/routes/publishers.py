@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db, Publisher
 from utils.auth import admin_required
+from utils.catalog import catalog
+from utils.bulk import BulkRow, BulkResult, apply_bulk_rows, bulk_payload, existing_keys
 
 publishers_bp = Blueprint('publishers', __name__)
 
@@ -79,6 +81,56 @@ def create_publisher():
         "publisher": publisher.to_dict()
     }), 201
 
+@publishers_bp.route('/publishers/bulk', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_upsert_publishers():
+    """
+    Insert or update many publishers at once (admin only)
+    Body: a list of publishers, or {"publishers": [...]}; existing PubIDs are updated
+    Rows are written in chunks and invalid rows are reported without aborting the batch
+    """
+    rows = bulk_payload(request.get_json(), 'publishers')
+    
+    if rows is None:
+        return jsonify({"message": "Expected a list of publishers"}), 400
+    
+    result = BulkResult(len(rows))
+    existing = existing_keys(Publisher.PubID, [row.get('PubID') for row in rows if isinstance(row, dict)])
+    
+    seen = set()
+    valid_rows = []
+    for index, row in enumerate(rows):
+        pub_id = row.get('PubID') if isinstance(row, dict) else None
+        
+        if not pub_id:
+            result.error(index, pub_id, "PubID is required")
+            continue
+        if pub_id in seen:
+            result.error(index, pub_id, "Duplicate PubID in batch")
+            continue
+        seen.add(pub_id)
+        
+        is_update = pub_id in existing
+        if not is_update and 'PublishingHouse' not in row:
+            result.error(index, pub_id, "PublishingHouse is required for new publishers")
+            continue
+        
+        mapping = {'PubID': pub_id}
+        for field in ('PublishingHouse', 'City', 'State', 'Country', 'YearEstablished', 'MarketingSpend'):
+            if field in row:
+                mapping[field] = row[field]
+        
+        valid_rows.append(BulkRow(index, pub_id, [(Publisher, mapping, is_update)]))
+    
+    apply_bulk_rows(valid_rows, result)
+    
+    # Bulk writes skip the session events
+    if result.inserted or result.updated:
+        catalog.bump()
+    
+    return jsonify(result.to_dict()), 200
+
 @publishers_bp.route('/publishers/<pub_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
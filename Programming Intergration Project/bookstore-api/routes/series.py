@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify
+from models import db, Series, Book, Info
+from sqlalchemy import func
+
+series_bp = Blueprint('series', __name__)
+
+@series_bp.route('/series', methods=['GET'])
+def get_all_series():
+    """
+    Get series with pagination and their number of volumes
+    Volume counts for the whole page come from one grouped query on idx_info_seriesid
+    """
+    name = request.args.get('name')
+    
+    # Pagination parameters
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    # Limit per_page to reasonable values
+    per_page = min(max(per_page, 5), 100)  # Minimum 5, maximum 100
+    
+    query = Series.query
+    
+    if name:
+        query = query.filter(Series.SeriesName.ilike(f'%{name}%'))
+    
+    total_count = query.count()
+    
+    series_page = query.order_by(Series.SeriesName, Series.SeriesID).offset((page - 1) * per_page).limit(per_page).all()
+    
+    # Volume counts for every series on the page in a single query
+    volume_counts = dict(db.session.query(
+        Info.SeriesID,
+        func.count(Info.BookID)
+    ).filter(
+        Info.SeriesID.in_([series.SeriesID for series in series_page])
+    ).group_by(
+        Info.SeriesID
+    ).all())
+    
+    return jsonify({
+        "count": total_count,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
+        "series": [{
+            **series.to_dict(),
+            "volume_count": volume_counts.get(series.SeriesID, 0)
+        } for series in series_page]
+    }), 200
+
+@series_bp.route('/series/<series_id>', methods=['GET'])
+def get_series(series_id):
+    """
+    Get a series with its volumes sorted by volume number
+    Volumes, authors, info and editions are loaded in a fixed number of batched queries
+    """
+    series = db.session.get(Series, series_id)
+    
+    if not series:
+        return jsonify({"message": "Series not found"}), 404
+    
+    volumes = Book.query.join(Info).options(
+        *Book.extended_load_options()
+    ).filter(
+        Info.SeriesID == series_id
+    ).order_by(
+        Info.VolumeNumber, Book.BookID
+    ).all()
+    
+    return jsonify({
+        "series": series.to_dict(),
+        "volume_count": len(volumes),
+        "volumes": [book.to_dict_extended() for book in volumes]
+    }), 200
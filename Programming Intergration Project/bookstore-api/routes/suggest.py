@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from utils.suggest import suggest_index
+
+suggest_bp = Blueprint('suggest', __name__)
+
+SUGGEST_KINDS = ('titles', 'authors', 'orders')
+
+@suggest_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """
+    Typeahead suggestions for the search box
+    Served from the in-memory prefix index, no table scans per keystroke
+    OrderIDs are only suggested to authenticated users
+    """
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    kinds = request.args.get('types', ','.join(SUGGEST_KINDS)).split(',')
+    
+    # Limit to reasonable values
+    limit = min(max(limit, 1), 50)
+    
+    if not query.strip():
+        return jsonify({"message": "Query parameter q is required"}), 400
+    
+    invalid_kinds = [kind for kind in kinds if kind not in SUGGEST_KINDS]
+    if invalid_kinds:
+        return jsonify({"message": f"Invalid types: {', '.join(invalid_kinds)}"}), 400
+    
+    # Orders are staff data, same as the /orders endpoints
+    verify_jwt_in_request(optional=True)
+    if not get_jwt_identity():
+        kinds = [kind for kind in kinds if kind != 'orders']
+    
+    suggest_index.ensure_loaded()
+    results = suggest_index.suggest(query, limit, kinds)
+    
+    response = {"query": query}
+    if 'titles' in results:
+        response["titles"] = [{"BookID": book_id, "Title": title} for book_id, title in results['titles']]
+    if 'authors' in results:
+        response["authors"] = [{"AuthID": auth_id, "FullName": name} for auth_id, name in results['authors']]
+    if 'orders' in results:
+        response["orders"] = [{
+            "OrderID": order_id,
+            "SaleDate": sale_date.isoformat() if hasattr(sale_date, 'isoformat') else sale_date
+        } for order_id, sale_date in results['orders']]
+    
+    return jsonify(response), 200
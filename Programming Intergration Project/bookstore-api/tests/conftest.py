@@ -0,0 +1,102 @@
+"""
+Shared fixtures: the full API on a temporary SQLite database with a small catalog
+"""
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models import db, User, Author, Publisher, Book, Edition, Order, OrderDetail, OrderKey
+
+# Sale date of ORD-0001; ORD-n is n - 1 weeks older
+FIRST_SALE_DATE = date(2024, 6, 3)
+
+def _reset_process_state():
+    """
+    Forget the per-process caches, which outlive one app
+    """
+    from routes.auth import login_limiters
+    from utils import health
+    from utils.catalog import catalog
+    from utils.checkout_analytics import checkout_analytics
+    from utils.order_buffer import order_buffer
+    from utils.sales_cube import sales_cube
+    from utils.suggest import suggest_index
+
+    order_buffer.stop()
+    order_buffer.__init__()
+    catalog._snapshot = None
+    catalog.version = 0
+    checkout_analytics.invalidate()
+    sales_cube.invalidate()
+    suggest_index.loaded_at = None
+    login_limiters.clear()
+    health._diagnostics.update(report=None, built_at=0)
+
+def seed():
+    db.session.add(User(username='admin', email='admin@example.com', password='admin123', role='admin'))
+    db.session.add(User(username='user', email='user@example.com', password='user123'))
+    db.session.add(Author(AuthID='A1', FirstName='Ada', LastName='Lovelace'))
+    db.session.add(Publisher(PubID='P1', PublishingHouse='House', Country='UK'))
+    for number in range(1, 4):
+        db.session.add(Book(BookID=f'B{number}', Title=f'Book {number}', AuthID='A1'))
+        db.session.add(Edition(ISBN=f'I{number}', BookID=f'B{number}', PubID='P1', Price=10 * number))
+
+    for number in range(1, 4):
+        order_id = f'ORD-{number:04d}'
+        sale_date = FIRST_SALE_DATE - timedelta(weeks=number - 1)
+        db.session.add(Order(OrderID=order_id, SaleDate=sale_date))
+        db.session.add(OrderKey(OrderID=order_id))
+        for item in range(1, 3):
+            db.session.add(OrderDetail(OrderID=order_id, ItemID=str(item), ISBN=f'I{item}', Quantity=item, SaleDate=sale_date))
+    db.session.commit()
+
+@pytest.fixture
+def settings(tmp_path):
+    """
+    Config overrides of the test app, test modules override this fixture to change them
+    """
+    return {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'bookstore.db'}",
+        'JOBS_IN_PROCESS': False,
+        'WARMUP_ENABLED': False,
+        'ORDER_WRITE_BEHIND': False,
+        'ORDER_SPOOL_DIR': str(tmp_path / 'spool'),
+        'JOB_EXPORT_DIR': str(tmp_path / 'exports'),
+        'BCRYPT_ROUNDS': 4
+    }
+
+@pytest.fixture
+def app(settings):
+    _reset_process_state()
+
+    from app import create_app
+    app = create_app(type('TestConfig', (Config,), settings))
+    with app.app_context():
+        db.create_all()
+        seed()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    _reset_process_state()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def token_headers(username):
+    user = User.query.filter_by(username=username).one()
+    return {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+@pytest.fixture
+def admin_headers(app):
+    return token_headers('admin')
+
+@pytest.fixture
+def user_headers(app):
+    return token_headers('user')
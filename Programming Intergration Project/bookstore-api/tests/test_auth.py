@@ -0,0 +1,36 @@
+"""
+Login rate limiting (routes/auth.py, utils.rate_limit)
+"""
+import pytest
+
+from utils.rate_limit import TokenBucketLimiter
+
+def login(client, password):
+    return client.post('/api/v1/auth/login', json={'username': 'admin', 'password': password})
+
+def test_successful_logins_are_not_limited(app, client):
+    app.config.update(LOGIN_USERNAME_BURST=2, LOGIN_USERNAME_PER_MINUTE=1)
+
+    for _ in range(4):
+        assert login(client, 'admin123').status_code == 200
+
+def test_failed_logins_are_limited_per_username(app, client):
+    app.config.update(LOGIN_USERNAME_BURST=2, LOGIN_USERNAME_PER_MINUTE=1)
+
+    assert login(client, 'wrong').status_code == 401
+    assert login(client, 'wrong').status_code == 401
+    response = login(client, 'admin123')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+def test_zero_rate_turns_the_limit_off(app, client):
+    app.config.update(LOGIN_USERNAME_BURST=1, LOGIN_USERNAME_PER_MINUTE=0, LOGIN_IP_PER_MINUTE=0)
+
+    for _ in range(3):
+        assert login(client, 'wrong').status_code == 401
+
+def test_limiter_rejects_non_positive_settings():
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(5, 0)
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(0, 5)
@@ -0,0 +1,31 @@
+"""
+Startup warm-up and health probes (utils.warmup, utils.health, routes/health.py)
+"""
+import pytest
+
+from utils.warmup import warmup
+
+@pytest.fixture
+def fresh_warmup():
+    warmup.state = 'pending'
+    warmup.steps = {}
+    yield warmup
+    warmup.skip()
+
+def test_default_warmup_paths_succeed(app, fresh_warmup):
+    fresh_warmup.start(app, background=False)
+
+    report = fresh_warmup.report()
+    assert report['state'] == 'finished'
+    assert fresh_warmup.failed_steps() == []
+    assert all(path['status'] < 500 for path in report['steps']['requests']['paths'].values())
+
+def test_server_error_fails_the_requests_step(app, client, fresh_warmup):
+    app.add_url_rule('/api/v1/broken', 'broken', lambda: 1 / 0)
+    app.config['WARMUP_PATHS'] = ['/api/v1/books?page=1', '/api/v1/broken']
+
+    fresh_warmup.start(app, background=False)
+
+    assert fresh_warmup.failed_steps() == ['requests']
+    assert fresh_warmup.report()['steps']['requests']['failed'] == ['/api/v1/broken']
+    assert client.get('/health/ready').get_json()['warmup_failed'] == ['requests']
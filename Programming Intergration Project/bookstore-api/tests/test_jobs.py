@@ -0,0 +1,106 @@
+"""
+Background job queue (utils.jobs) run to completion in the test process
+"""
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+import utils.jobs
+import utils.order_search
+from models import db, Job, OrderSearch
+from utils.jobs import enqueue_job, cancel_job, job_runner
+
+def run_queue(app):
+    job_runner.run_forever(app, 1, once=True)
+    db.session.expire_all()
+
+@pytest.fixture
+def every_progress(monkeypatch):
+    # Write every progress report instead of one per second
+    monkeypatch.setattr(utils.jobs, 'PROGRESS_INTERVAL_SECONDS', 0)
+
+def test_rebuild_order_search_job(app, every_progress, monkeypatch):
+    monkeypatch.setattr(utils.order_search, 'REBUILD_BATCH_SIZE', 1)
+    job_id = enqueue_job('rebuild', {'tables': ['order_search']}).JobID
+
+    run_queue(app)
+
+    job = db.session.get(Job, job_id)
+    assert job.Status == 'succeeded', job.Error
+    assert json.loads(job.Result) == {'rows': {'order_search': 6}}
+    assert (job.Progress, job.Total) == (3, 3)
+    assert db.session.query(OrderSearch).count() == 6
+
+def test_export_job_reports_progress_and_serves_the_file(app, client, admin_headers, every_progress, monkeypatch):
+    monkeypatch.setattr(utils.jobs, 'EXPORT_BATCH_SIZE', 2)
+    response = client.post('/api/v1/jobs', json={'kind': 'export_orders', 'params': {'start_date': '2024-05-21'}}, headers=admin_headers)
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['JobID']
+
+    run_queue(app)
+
+    job = client.get(f'/api/v1/jobs/{job_id}', headers=admin_headers).get_json()['job']
+    assert job['Status'] == 'succeeded', job['Error']
+    assert (job['Progress'], job['Total']) == (2, 2)
+    assert job['Result'] == {'file': f'job-{job_id}-orders.csv', 'rows': 4, 'orders': 2}
+
+    response = client.get(f'/api/v1/jobs/{job_id}/download', headers=admin_headers)
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    response.close()
+    assert lines[0] == 'OrderID,SaleDate,ItemID,ISBN,Quantity'
+    assert lines[1:] == [
+        'ORD-0001,2024-06-03,1,I1,1', 'ORD-0001,2024-06-03,2,I2,2',
+        'ORD-0002,2024-05-27,1,I1,1', 'ORD-0002,2024-05-27,2,I2,2'
+    ]
+
+    # Finished jobs cannot be cancelled any more
+    assert client.post(f'/api/v1/jobs/{job_id}/cancel', headers=admin_headers).status_code == 409
+
+def test_job_claimed_by_another_worker_is_left_alone(app):
+    job_id = enqueue_job('rebuild', {'tables': ['order_search']}).JobID
+    # Claimed between this worker's SELECT and its conditional UPDATE
+    db.session.execute(update(Job).where(Job.JobID == job_id).values(
+        Status='running', WorkerID='other:1', HeartbeatAt=datetime.now()
+    ))
+    db.session.commit()
+
+    run_queue(app)
+
+    job = db.session.get(Job, job_id)
+    assert (job.Status, job.WorkerID) == ('running', 'other:1')
+    assert db.session.query(OrderSearch).count() == 0
+
+def test_cancel_queued_job(app, client, admin_headers):
+    job_id = enqueue_job('rebuild', {'tables': ['order_search']}).JobID
+
+    response = client.post(f'/api/v1/jobs/{job_id}/cancel', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['message'] == 'Job cancelled'
+    run_queue(app)
+    assert db.session.get(Job, job_id).Status == 'cancelled'
+    assert db.session.query(OrderSearch).count() == 0
+
+def test_cancel_running_job_at_next_progress_report(app, every_progress, monkeypatch):
+    reports = []
+
+    def slow_rebuild(progress=None):
+        progress(1, 3)
+        job_id = db.session.query(Job.JobID).filter(Job.Status == 'running').scalar()
+        cancel_job(job_id)
+        reports.append('cancel requested')
+        progress(2, 3)
+        reports.append('kept going')
+
+    monkeypatch.setitem(utils.jobs.REBUILDERS, 'slow', slow_rebuild)
+    job_id = enqueue_job('rebuild', {'tables': ['slow']}).JobID
+
+    run_queue(app)
+
+    job = db.session.get(Job, job_id)
+    assert reports == ['cancel requested']
+    assert (job.Status, job.Stage, job.Progress, job.Total) == ('cancelled', 'slow', 2, 3)
+    assert job.CancelRequested and job.Result is None
@@ -0,0 +1,123 @@
+"""
+Schema migrations (utils.migrations) against a temporary SQLite database
+"""
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models import db, Order, OrderDetail, SchemaMigration
+from utils.migrations import MigrationRunner, MigrationError, discover
+
+LATEST = discover()[-1].version
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['MIGRATION_BATCH_SIZE'] = 3
+    db.init_app(app)
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def seed_orders(count):
+    base = date(2024, 1, 1)
+    for number in range(1, count + 1):
+        order_id = f"ORD-{number:04d}"
+        db.session.add(Order(OrderID=order_id, SaleDate=base + timedelta(days=number)))
+        db.session.add(OrderDetail(OrderID=order_id, ItemID='1', ISBN='I1', Quantity=1))
+    db.session.commit()
+
+def applied_versions():
+    return sorted(row.Version for row in SchemaMigration.query.all())
+
+def columns(table):
+    return {column['name'] for column in inspect(db.engine).get_columns(table)}
+
+def indexes(table):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table)}
+
+def test_upgrade_records_every_migration(app):
+    done = MigrationRunner(app).upgrade()
+
+    assert [migration.version for migration in done] == list(range(1, LATEST + 1))
+    assert applied_versions() == list(range(1, LATEST + 1))
+    rows = {row.Version: row for row in SchemaMigration.query.all()}
+    assert all(rows[migration.version].Name == migration.name and rows[migration.version].DurationMs >= 0 for migration in done)
+    assert 'idx_orders_date_id' in indexes('orders')
+    assert inspect(db.engine).has_table('order_ids')
+
+    # Nothing left to apply
+    assert MigrationRunner(app).upgrade() == []
+    assert all(applied for migration, applied in MigrationRunner(app).status())
+
+def test_upgrade_to_target(app):
+    done = MigrationRunner(app).upgrade(2)
+
+    assert [migration.version for migration in done] == [1, 2]
+    assert [migration.version for migration in MigrationRunner(app).pending()] == list(range(3, LATEST + 1))
+
+def test_downgrade_to_zero_refuses_irreversible_baseline(app):
+    MigrationRunner(app).upgrade()
+
+    with pytest.raises(MigrationError, match='0001_baseline'):
+        MigrationRunner(app).downgrade(0)
+    # Checked before anything is reverted
+    assert applied_versions() == list(range(1, LATEST + 1))
+
+def test_downgrade_and_upgrade_again(app):
+    MigrationRunner(app).upgrade()
+    seed_orders(5)
+
+    done = MigrationRunner(app).downgrade(1)
+
+    assert [migration.version for migration in done] == list(range(LATEST, 1, -1))
+    assert applied_versions() == [1]
+    assert 'SaleDate' not in columns('orderdetails')
+    assert 'idx_orders_date_id' not in indexes('orders')
+    assert not inspect(db.engine).has_table('order_ids')
+    assert not inspect(db.engine).has_table('orders_archive')
+
+    done = MigrationRunner(app).upgrade()
+
+    assert [migration.version for migration in done] == list(range(2, LATEST + 1))
+    assert applied_versions() == list(range(1, LATEST + 1))
+    assert 'SaleDate' in columns('orderdetails')
+    assert 'idx_orders_date_id' in indexes('orders')
+    order_ids = db.session.execute(text("SELECT OrderID FROM order_ids ORDER BY OrderID")).scalars().all()
+    assert order_ids == [f"ORD-{number:04d}" for number in range(1, 6)]
+
+def test_add_column_and_backfill_in_batches(app):
+    MigrationRunner(app).upgrade(3)
+    seed_orders(7)
+    MigrationRunner(app).downgrade(2)
+    assert 'SaleDate' not in columns('orderdetails')
+
+    reports = []
+    MigrationRunner(app, progress=lambda stage, done, total: reports.append((stage, done, total))).upgrade(3)
+
+    assert 'SaleDate' in columns('orderdetails')
+    assert ('add column orderdetails.SaleDate', None, None) in reports
+    # 7 rows in batches of MIGRATION_BATCH_SIZE = 3: reports at 0, 3, 6, 7
+    backfill = [(done, total) for stage, done, total in reports if stage == 'backfill orderdetails']
+    assert backfill == [(0, 7), (3, 7), (6, 7), (7, 7)]
+
+    copied = db.session.execute(text(
+        "SELECT COUNT(*) FROM orderdetails JOIN orders ON orders.OrderID = orderdetails.OrderID "
+        "WHERE orderdetails.SaleDate = orders.SaleDate"
+    )).scalar()
+    assert copied == 7
+    assert applied_versions() == [1, 2, 3]
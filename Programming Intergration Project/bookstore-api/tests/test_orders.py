@@ -0,0 +1,98 @@
+"""
+Order read endpoints (routes/orders.py)
+"""
+from datetime import date
+
+import pytest
+
+from utils.archive import archive_orders
+from utils.order_search import rebuild_order_search
+
+def order_ids(response):
+    assert response.status_code == 200, response.get_json()
+    return [order['OrderID'] for order in response.get_json()['orders']]
+
+@pytest.mark.parametrize('filters', ['', '&book_title=book'])
+def test_search_end_date_is_inclusive_and_stops_there(client, user_headers, filters):
+    rebuild_order_search()
+
+    # ORD-0003 sold 2024-05-20, ORD-0002 2024-05-27, ORD-0001 2024-06-03
+    response = client.get(f'/api/v1/orders/search?start_date=2024-05-20&end_date=2024-05-26{filters}', headers=user_headers)
+    assert order_ids(response) == ['ORD-0003']
+
+    response = client.get(f'/api/v1/orders/search?start_date=2024-05-21&end_date=2024-05-27{filters}', headers=user_headers)
+    assert order_ids(response) == ['ORD-0002']
+
+def test_search_rejects_bad_dates(client, user_headers):
+    assert client.get('/api/v1/orders/search?end_date=26-05-2024', headers=user_headers).status_code == 422
+
+def test_summary_adds_up_hot_and_archived_months(client, user_headers):
+    assert archive_orders(date(2024, 5, 21)) == 1
+
+    response = client.get('/api/v1/orders/summary?start_date=2024-05-01', headers=user_headers)
+
+    assert response.status_code == 200
+    # order_count counts order lines, hot and archived alike
+    assert response.get_json()['summary'] == [
+        {"month": "2024-05", "order_count": 4, "total_items": 6},
+        {"month": "2024-06", "order_count": 2, "total_items": 3}
+    ]
+
+def test_archived_order_stays_readable(client, user_headers):
+    assert archive_orders(date(2024, 5, 21)) == 1
+
+    response = client.get('/api/v1/orders/ORD-0003', headers=user_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['archived'] is True
+    assert [(item['ISBN'], item['Quantity']) for item in body['order']['OrderDetails']] == [('I1', 1), ('I2', 2)]
+
+    response = client.get('/api/v1/orders?ids=ORD-0003,ORD-0001,ORD-0009', headers=user_headers)
+    assert list(response.get_json()['orders']) == ['ORD-0003', 'ORD-0001']
+    assert response.get_json()['not_found'] == ['ORD-0009']
+
+def test_list_pages_through_hot_and_archived_orders(client, user_headers):
+    assert archive_orders(date(2024, 5, 28)) == 2
+
+    pages = [
+        client.get(f'/api/v1/orders?start_date=2024-05-01&per_page=5&page={page}', headers=user_headers)
+        for page in (1, 2)
+    ]
+    assert pages[0].get_json()['count'] == 3
+    assert order_ids(pages[0]) == ['ORD-0003', 'ORD-0002', 'ORD-0001']
+    assert order_ids(pages[1]) == []
+
+    # Without a start date only the hot tables are read
+    assert order_ids(client.get('/api/v1/orders', headers=user_headers)) == ['ORD-0001']
+
+def test_archived_order_ids_stay_taken(client, admin_headers):
+    assert archive_orders(date(2024, 5, 21)) == 1
+
+    response = client.post('/api/v1/orders', json={'OrderID': 'ORD-0003', 'items': []}, headers=admin_headers)
+
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('snapshot', [True, False])
+def test_compact_format_side_loads_each_book_once(app, client, user_headers, snapshot):
+    app.config['CATALOG_SNAPSHOT_ENABLED'] = snapshot
+
+    response = client.get('/api/v1/orders?format=compact', headers=user_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['orders'][0]['OrderDetails'] == [
+        {'ItemID': '1', 'ISBN': 'I1', 'Quantity': 1, 'Price': 10.0, 'BookID': 'B1'},
+        {'ItemID': '2', 'ISBN': 'I2', 'Quantity': 2, 'Price': 20.0, 'BookID': 'B2'}
+    ]
+    assert sorted(body['included']['books']) == ['B1', 'B2']
+    assert list(body['included']['authors']) == ['A1']
+    assert sorted(body['included']['editions']) == ['I1', 'I2']
+
+def test_fields_narrow_each_object(client, user_headers):
+    response = client.get('/api/v1/orders?format=compact&fields[lines]=ISBN&include=books&fields[books]=Title', headers=user_headers)
+
+    body = response.get_json()
+    assert body['orders'][0]['OrderDetails'] == [{'ISBN': 'I1'}, {'ISBN': 'I2'}]
+    assert body['included'] == {'books': {'B1': {'Title': 'Book 1'}, 'B2': {'Title': 'Book 2'}}}
+
+    assert client.get('/api/v1/orders?format=tiny', headers=user_headers).status_code == 400
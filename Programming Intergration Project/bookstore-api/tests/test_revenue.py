@@ -0,0 +1,74 @@
+"""
+daily_revenue kept in step by the order write endpoints (utils.revenue)
+"""
+from models import db, DailyRevenue
+from utils.jobs import REBUILDERS
+
+def revenue_rows():
+    db.session.expire_all()
+    return sorted(
+        (row.SaleDate, row.ISBN, row.Quantity, row.OrderLines, row.Revenue)
+        for row in DailyRevenue.query.all()
+    )
+
+def assert_matches_rebuild():
+    incremental = revenue_rows()
+    REBUILDERS['daily_revenue']()
+    assert incremental == revenue_rows()
+    return incremental
+
+def test_patch_sale_date_moves_revenue(client, admin_headers):
+    REBUILDERS['daily_revenue']()
+
+    response = client.patch('/api/v1/orders/ORD-0001', json={'SaleDate': '2024-07-01'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['order']['SaleDate'] == '2024-07-01'
+    rows = assert_matches_rebuild()
+    assert {row[0].isoformat() for row in rows} == {'2024-07-01', '2024-05-27', '2024-05-20'}
+
+def test_put_sale_date_and_lines(client, admin_headers):
+    REBUILDERS['daily_revenue']()
+
+    response = client.put('/api/v1/orders/ORD-0002', json={
+        'SaleDate': '2024-05-20',
+        'items': [{'ItemID': '1', 'ISBN': 'I3', 'Quantity': 4}]
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert_matches_rebuild()
+
+def test_invalid_sale_date_is_rejected(client, admin_headers):
+    for body in ({'SaleDate': '03/06/2024'}, {'SaleDate': 20240603}):
+        assert client.patch('/api/v1/orders/ORD-0001', json=body, headers=admin_headers).status_code == 422
+        assert client.put('/api/v1/orders/ORD-0001', json=body, headers=admin_headers).status_code == 422
+
+def test_create_adds_revenue(client, admin_headers):
+    REBUILDERS['daily_revenue']()
+
+    response = client.post('/api/v1/orders', json={
+        'OrderID': 'ORD-0004', 'SaleDate': '2024-06-03',
+        'items': [{'ISBN': 'I1', 'Quantity': 3}, {'ISBN': 'I3', 'Quantity': 1}]
+    }, headers=admin_headers)
+
+    assert response.status_code == 201
+    rows = assert_matches_rebuild()
+    # Added to ORD-0001's cell of the same day
+    assert [row for row in rows if row[0].isoformat() == '2024-06-03' and row[1] == 'I1'][0][2:4] == (4, 2)
+
+def test_item_patch_moves_revenue_between_isbns(client, admin_headers):
+    REBUILDERS['daily_revenue']()
+
+    response = client.patch('/api/v1/orders/ORD-0002/items/2', json={'ISBN': 'I3', 'Quantity': 5}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert_matches_rebuild()
+
+def test_delete_removes_revenue(client, admin_headers):
+    REBUILDERS['daily_revenue']()
+
+    response = client.delete('/api/v1/orders/ORD-0001', headers=admin_headers)
+
+    assert response.status_code == 200
+    rows = assert_matches_rebuild()
+    assert {row[0].isoformat() for row in rows} == {'2024-05-27', '2024-05-20'}
@@ -0,0 +1,49 @@
+"""
+In-memory sales cube (utils.sales_cube) and its change detection
+"""
+import pytest
+
+from utils.jobs import REBUILDERS
+from utils.sales_cube import sales_cube
+
+@pytest.fixture
+def cube(app):
+    app.config['SALES_CUBE_CHECK_SECONDS'] = 0
+    REBUILDERS['daily_revenue']()
+    sales_cube.aggregate()
+    return sales_cube
+
+@pytest.fixture
+def other_worker(monkeypatch):
+    # The write endpoints invalidate this process's cube; another worker's writes do not
+    monkeypatch.setattr(sales_cube, 'invalidate', lambda: None)
+
+def total(cube, **options):
+    return cube.aggregate(**options)[1]
+
+def test_isbn_swap_by_another_worker_is_picked_up(cube, other_worker, client, admin_headers):
+    assert total(cube)[0]['revenue'] == 150.0
+
+    response = client.patch('/api/v1/orders/ORD-0001/items/1', json={'ISBN': 'I3'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    # Same line count and quantity, I3 costs 30 instead of 10
+    assert total(cube)[0]['revenue'] == 170.0
+
+def test_date_move_by_another_worker_is_picked_up(cube, other_worker, client, admin_headers):
+    assert [row['month'] for row in total(cube, group_by=('month',))] == ['2024-05', '2024-06']
+
+    response = client.patch('/api/v1/orders/ORD-0001', json={'SaleDate': '2024-05-28'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert total(cube, group_by=('month',)) == [{'month': '2024-05', 'quantity': 9, 'revenue': 150.0, 'lines': 6}]
+
+def test_appended_order_keeps_the_fingerprint_current(cube, client, admin_headers):
+    response = client.post('/api/v1/orders', json={
+        'OrderID': 'ORD-0004', 'SaleDate': '2024-06-04',
+        'items': [{'ISBN': 'I1', 'Quantity': 2}, {'ISBN': 'I3', 'Quantity': 1}]
+    }, headers=admin_headers)
+
+    assert response.status_code == 201
+    assert sales_cube._fingerprint() == sales_cube._fingerprint_expected
+    assert total(cube)[0]['revenue'] == 200.0
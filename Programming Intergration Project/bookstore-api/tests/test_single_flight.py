@@ -0,0 +1,71 @@
+"""
+Request coalescing (utils.single_flight)
+"""
+import threading
+import time
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+def wait_for_waiters(flight, count):
+    deadline = time.monotonic() + 5
+    while flight.stats()['waiting'] < count:
+        assert time.monotonic() < deadline, "waiter never joined the call"
+        time.sleep(0.001)
+
+def run_follower(flight, key, results):
+    def follow():
+        try:
+            results.append(flight.do(key, lambda: 'own result'))
+        except Exception as e:
+            results.append(e)
+    
+    thread = threading.Thread(target=follow)
+    thread.start()
+    wait_for_waiters(flight, 1)
+    return thread
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    followers = []
+    threads = []
+
+    def leader():
+        # Returns only once the follower is waiting on this call
+        threads.append(run_follower(flight, 'key', followers))
+        return 'leader result'
+
+    result, shared = flight.do('key', leader)
+    threads[0].join(5)
+
+    assert (result, shared) == ('leader result', False)
+    assert followers == [('leader result', True)]
+    assert flight.stats() == {'computed': 1, 'shared': 1, 'in_flight': 0, 'waiting': 0}
+
+    # Nothing is cached once the call finished
+    assert flight.do('key', lambda: 'later') == ('later', False)
+
+def test_waiters_get_the_leaders_error():
+    flight = SingleFlight()
+    followers = []
+    threads = []
+
+    def leader():
+        threads.append(run_follower(flight, 'key', followers))
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        flight.do('key', leader)
+    threads[0].join(5)
+
+    assert len(followers) == 1 and isinstance(followers[0], ValueError)
+
+def test_other_keys_do_not_wait():
+    flight = SingleFlight()
+
+    def leader():
+        # Would deadlock if 'other' waited on 'key'
+        return flight.do('other', lambda: 'other result')
+
+    assert flight.do('key', leader) == (('other result', False), False)
@@ -0,0 +1,43 @@
+"""
+Typeahead prefix index (utils.suggest)
+"""
+import time
+from datetime import date
+
+import utils.suggest
+from models import db, Book
+from utils.suggest import suggest_index
+
+def suggested_orders(prefix='ord'):
+    return [order_id for order_id, _ in suggest_index.suggest(prefix, 50, ('orders',))['orders']]
+
+def test_put_order_evicts_the_oldest(app, monkeypatch):
+    monkeypatch.setattr(utils.suggest, 'RECENT_ORDERS', 3)
+    suggest_index.ensure_loaded()
+
+    suggest_index.put_order('ORD-0004', date(2024, 6, 10))
+    # ORD-0003 was sold 2024-05-20, the oldest
+    assert sorted(suggested_orders()) == ['ORD-0001', 'ORD-0002', 'ORD-0004']
+
+    # Re-dating an order supersedes its old heap entry
+    suggest_index.put_order('ORD-0002', date(2024, 6, 11))
+    suggest_index.put_order('ORD-0005', date(2024, 6, 12))
+    assert sorted(suggested_orders()) == ['ORD-0002', 'ORD-0004', 'ORD-0005']
+
+    # Removed orders leave room without evicting anyone
+    suggest_index.remove_order('ORD-0004')
+    suggest_index.put_order('ORD-0006', '2024-06-01')
+    assert sorted(suggested_orders()) == ['ORD-0002', 'ORD-0005', 'ORD-0006']
+
+def test_stale_index_reloads_in_the_background(app):
+    suggest_index.ensure_loaded()
+    db.session.add(Book(BookID='B4', Title='Dune', AuthID='A1'))
+    db.session.commit()
+    suggest_index.loaded_at = time.monotonic() - utils.suggest.REFRESH_SECONDS - 1
+
+    suggest_index.ensure_loaded()
+    # The refresh thread holds the load lock until it is done
+    with suggest_index._load_lock:
+        pass
+
+    assert suggest_index.suggest('dune', 10, ('titles',))['titles'] == [('B4', 'Dune')]
@@ -0,0 +1,66 @@
+"""
+Write-behind order creation (utils.order_buffer), flushed by hand
+"""
+import glob
+import os
+
+import pytest
+from sqlalchemy import func
+
+from models import db, DailyRevenue, Order
+from utils.order_buffer import order_buffer
+
+@pytest.fixture
+def settings(settings):
+    # A flush interval the tests never reach, they call flush() themselves
+    return dict(settings, ORDER_WRITE_BEHIND=True, ORDER_FLUSH_MS=600000)
+
+def new_order(order_id='ORD-0004', **fields):
+    return {'OrderID': order_id, 'SaleDate': '2024-06-04', 'items': [{'ISBN': 'I3', 'Quantity': 2}], **fields}
+
+def spooled_segments(settings):
+    return glob.glob(os.path.join(settings['ORDER_SPOOL_DIR'], '*', 'orders-*.jsonl'))
+
+def test_accepted_order_is_pending_until_flushed(settings, client, admin_headers):
+    response = client.post('/api/v1/orders', json=new_order(), headers=admin_headers)
+
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'pending'
+    response = client.get('/api/v1/orders/ORD-0004', headers=admin_headers)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'pending'
+    assert db.session.get(Order, 'ORD-0004') is None
+
+    order_buffer.flush()
+
+    response = client.get('/api/v1/orders/ORD-0004', headers=admin_headers)
+    assert response.status_code == 200
+    assert [(item['ISBN'], item['Quantity']) for item in response.get_json()['order']['OrderDetails']] == [('I3', 2)]
+    # Written together with its daily_revenue cell, and only the fresh empty segment is left
+    revenue = db.session.query(func.sum(DailyRevenue.Revenue)).filter(DailyRevenue.ISBN == 'I3').scalar()
+    assert float(revenue) == 60.0
+    assert order_buffer.stats()['flushed'] == 1
+    assert [os.path.getsize(path) for path in spooled_segments(settings)] == [0]
+
+def test_invalid_orders_are_refused_before_spooling(client, admin_headers):
+    response = client.post('/api/v1/orders', json=new_order(items=[{'ISBN': 'NOPE'}]), headers=admin_headers)
+    assert response.status_code == 400
+
+    response = client.post('/api/v1/orders', json=new_order(SaleDate='04/06/2024'), headers=admin_headers)
+    assert response.status_code == 400
+
+    assert client.post('/api/v1/orders', json=new_order(), headers=admin_headers).status_code == 202
+    # The same OrderID while the first one is still pending
+    assert client.post('/api/v1/orders', json=new_order(), headers=admin_headers).status_code == 409
+    assert order_buffer.stats()['pending'] == 1
+
+def test_flush_rejects_taken_order_ids(client, admin_headers):
+    assert client.post('/api/v1/orders', json=new_order('ORD-0001'), headers=admin_headers).status_code == 202
+    assert client.post('/api/v1/orders', json=new_order('ORD-0005'), headers=admin_headers).status_code == 202
+
+    order_buffer.flush()
+
+    assert order_buffer.status('ORD-0001') == ('rejected', 'OrderID already exists')
+    # The rest of the batch is written
+    assert client.get('/api/v1/orders/ORD-0005', headers=admin_headers).status_code == 200
+    assert [item.ISBN for item in db.session.get(Order, 'ORD-0001').order_details] == ['I1', 'I2']
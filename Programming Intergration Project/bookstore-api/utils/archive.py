@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import func, insert, literal, select, union_all
+from models import db, Order, OrderDetail, OrderArchive, OrderDetailArchive, OrderSearch, Edition
+from utils.partitions import PARTITIONED_TABLES, sale_date_filters, is_partitioned, drop_empty_partitions
+from utils.sales_cube import sales_cube
+from utils.suggest import suggest_index
+
+def archive_cutoff(days=None, today=None):
+    """
+    First SaleDate that stays hot, ORDER_ARCHIVE_DAYS before today by default
+    """
+    if days is None:
+        days = current_app.config['ORDER_ARCHIVE_DAYS']
+    return (today or date.today()) - timedelta(days=days)
+
+def archive_boundary():
+    """
+    Day after the newest archived SaleDate, None while the archive is empty
+    Date ranges starting at or after it are answered from the hot tables alone
+    """
+    newest = db.session.query(func.max(OrderArchive.SaleDate)).scalar()
+    return newest + timedelta(days=1) if newest is not None else None
+
+def reads_archive(start):
+    """
+    Whether a date range starting at start (None for open-ended) reaches into the archive
+    Ranges without a start stay on the hot tables, old orders have to be asked for
+    """
+    if start is None:
+        return False
+    boundary = archive_boundary()
+    return boundary is not None and start < boundary
+
+def archive_orders(before, batch_size=None, progress=None):
+    """
+    Move every order with SaleDate < before, lines included, into the archive
+    tables, oldest first; each batch is copied and deleted in one transaction
+    The order_search rows of archived orders are dropped, the daily_revenue
+    cells stay as they are, and the OrderIDs stay taken in order_ids
+    On partitioned MySQL tables the partitions emptied this way are dropped
+    Returns the number of orders archived
+    """
+    batch_size = batch_size or current_app.config['ORDER_ARCHIVE_BATCH']
+    old = sale_date_filters(None, before, Order.SaleDate)
+    total = db.session.query(func.count(Order.OrderID)).filter(*old).scalar()
+    
+    done = 0
+    while True:
+        order_ids = [order_id for (order_id,) in db.session.query(
+            Order.OrderID
+        ).filter(*old).order_by(Order.SaleDate, Order.OrderID).limit(batch_size)]
+        if not order_ids:
+            break
+        
+        db.session.execute(insert(OrderArchive).from_select(
+            ['OrderID', 'SaleDate'],
+            select(Order.OrderID, Order.SaleDate).where(Order.OrderID.in_(order_ids), *old)
+        ))
+        db.session.execute(insert(OrderDetailArchive).from_select(
+            ['OrderID', 'ItemID', 'ISBN', 'Quantity', 'SaleDate'],
+            select(
+                OrderDetail.OrderID, OrderDetail.ItemID, OrderDetail.ISBN, OrderDetail.Quantity, Order.SaleDate
+            ).join(
+                Order, OrderDetail.OrderID == Order.OrderID
+            ).where(Order.OrderID.in_(order_ids), *old)
+        ))
+        
+        # The SaleDate bound on every delete keeps partitioned tables pruned
+        OrderSearch.query.filter(
+            OrderSearch.OrderID.in_(order_ids), *sale_date_filters(None, before, OrderSearch.SaleDate)
+        ).delete(synchronize_session=False)
+        OrderDetail.query.filter(
+            OrderDetail.OrderID.in_(order_ids), *sale_date_filters(None, before, OrderDetail.SaleDate)
+        ).delete(synchronize_session=False)
+        Order.query.filter(Order.OrderID.in_(order_ids), *old).delete(synchronize_session=False)
+        db.session.commit()
+        
+        for order_id in order_ids:
+            suggest_index.remove_order(order_id)
+        
+        done += len(order_ids)
+        if progress:
+            progress(done, total)
+    
+    with db.engine.begin() as connection:
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(connection, table):
+                drop_empty_partitions(connection, table, before)
+    
+    sales_cube.invalidate()
+    return done
+
+def archive_query(start=None, end=None, isbn=None, book_id=None, order_id_clause=None):
+    """
+    OrderArchive query with the filters of the hot order lists
+    """
+    query = OrderArchive.query.filter(*sale_date_filters(start, end, OrderArchive.SaleDate))
+    
+    if order_id_clause is not None:
+        query = query.filter(order_id_clause)
+    
+    if isbn or book_id:
+        query = query.join(
+            OrderDetailArchive, OrderArchive.OrderID == OrderDetailArchive.OrderID
+        ).filter(*sale_date_filters(start, end, OrderDetailArchive.SaleDate))
+        if isbn:
+            query = query.filter(OrderDetailArchive.ISBN == isbn)
+        if book_id:
+            query = query.join(
+                Edition, OrderDetailArchive.ISBN == Edition.ISBN
+            ).filter(Edition.BookID == book_id)
+        query = query.distinct()
+    
+    return query
+
+def merged_page(hot_query, archived_query, page, per_page, with_catalog):
+    """
+    One page of hot and archived orders in (SaleDate, OrderID) order
+    Only the keys of both filtered queries are unioned, counted and paged;
+    the page's orders are then loaded from their own table
+    Returns (total count, orders)
+    """
+    keys = union_all(
+        hot_query.order_by(None).with_entities(
+            Order.OrderID.label('OrderID'), Order.SaleDate.label('SaleDate'), literal(False).label('archived')
+        ).statement,
+        archived_query.order_by(None).with_entities(
+            OrderArchive.OrderID.label('OrderID'), OrderArchive.SaleDate.label('SaleDate'), literal(True).label('archived')
+        ).statement
+    ).subquery()
+    
+    total_count = db.session.query(func.count()).select_from(keys).scalar()
+    rows = db.session.query(keys.c.OrderID, keys.c.archived).order_by(
+        keys.c.SaleDate, keys.c.OrderID
+    ).offset((page - 1) * per_page).limit(per_page).all()
+    
+    loaded = {}
+    for model, archived in ((Order, False), (OrderArchive, True)):
+        order_ids = [row.OrderID for row in rows if bool(row.archived) == archived]
+        if order_ids:
+            loaded.update({
+                (order.OrderID, archived): order
+                for order in model.query.options(
+                    *model.detail_load_options(with_catalog=with_catalog)
+                ).filter(model.OrderID.in_(order_ids))
+            })
+    
+    return total_count, [loaded[(row.OrderID, bool(row.archived))] for row in rows if (row.OrderID, bool(row.archived)) in loaded]
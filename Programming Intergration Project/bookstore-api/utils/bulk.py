@@ -0,0 +1,160 @@
+from datetime import datetime
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from models import db
+
+# Rows written per transaction
+BULK_CHUNK_SIZE = 500
+
+# Largest IN (...) list sent in one lookup query
+LOOKUP_CHUNK_SIZE = 1000
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def upsert_increment(model, rows, increments):
+    """
+    Insert rows, or add their values of the increments columns to the row
+    already under the same primary key, in one atomic statement
+    (INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT on SQLite), so
+    concurrent writers never read-modify-write or race on a missing row
+    """
+    if not rows:
+        return
+    
+    if db.session.get_bind().dialect.name == 'mysql':
+        statement = mysql_insert(model)
+        statement = statement.on_duplicate_key_update({
+            name: getattr(model, name) + statement.inserted[name] for name in increments
+        })
+    else:
+        statement = sqlite_insert(model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in model.__table__.primary_key.columns],
+            set_={name: getattr(model, name) + statement.excluded[name] for name in increments}
+        )
+    db.session.execute(statement, rows)
+
+def existing_keys(column, keys):
+    """
+    The subset of keys present in column, one IN query per LOOKUP_CHUNK_SIZE keys
+    """
+    keys = list({key for key in keys if key is not None})
+    found = set()
+    for chunk in chunked(keys, LOOKUP_CHUNK_SIZE):
+        found.update(key for (key,) in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
+def existing_pairs(key_column, value_column, keys):
+    """
+    {key: value} for the keys present in key_column, e.g. ISBN -> BookID
+    """
+    keys = list({key for key in keys if key is not None})
+    pairs = {}
+    for chunk in chunked(keys, LOOKUP_CHUNK_SIZE):
+        pairs.update(db.session.query(key_column, value_column).filter(key_column.in_(chunk)).all())
+    return pairs
+
+def parse_date(value):
+    """
+    Accept YYYY-MM-DD strings (or None) for Date columns, raise ValueError otherwise
+    """
+    if value is None or value == '':
+        return None
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+class BulkRow:
+    """
+    One validated input row and the writes it needs, in dependency order
+    operations is a list of (model, mapping, is_update)
+    """
+    def __init__(self, index, key, operations):
+        self.index = index
+        self.key = key
+        self.operations = operations
+    
+    @property
+    def is_update(self):
+        return self.operations[0][2]
+
+class BulkResult:
+    def __init__(self, received):
+        self.received = received
+        self.inserted = []
+        self.updated = []
+        self.errors = []
+    
+    def error(self, index, key, message):
+        self.errors.append({"index": index, "id": key, "message": message})
+    
+    def success(self, row):
+        (self.updated if row.is_update else self.inserted).append(row.key)
+    
+    def to_dict(self):
+        return {
+            "received": self.received,
+            "inserted": len(self.inserted),
+            "updated": len(self.updated),
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["index"])
+        }
+
+def _write(rows):
+    """
+    Write the rows with one bulk statement per (model, insert/update) pair,
+    models in the order they first appear so parents are written first
+    """
+    groups = {}
+    model_order = []
+    for row in rows:
+        for model, mapping, is_update in row.operations:
+            if model not in model_order:
+                model_order.append(model)
+            groups.setdefault((model, is_update), []).append(mapping)
+    
+    ordered = sorted(groups.items(), key=lambda group: (model_order.index(group[0][0]), group[0][1]))
+    for (model, is_update), mappings in ordered:
+        if is_update:
+            db.session.bulk_update_mappings(model, mappings)
+        else:
+            db.session.bulk_insert_mappings(model, mappings)
+
+def apply_bulk_rows(rows, result):
+    """
+    Write validated rows in chunks of BULK_CHUNK_SIZE, one commit per chunk
+    A chunk rejected by the database is retried row by row, so one bad row
+    is reported in result.errors without aborting the rest of the batch
+    """
+    for chunk in chunked(rows, BULK_CHUNK_SIZE):
+        try:
+            _write(chunk)
+            db.session.commit()
+            for row in chunk:
+                result.success(row)
+            continue
+        except SQLAlchemyError:
+            db.session.rollback()
+        
+        for row in chunk:
+            try:
+                _write([row])
+                db.session.commit()
+                result.success(row)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                result.error(row.index, row.key, f"Database error: {str(e.orig) if hasattr(e, 'orig') else str(e)}")
+    
+    return result
+
+def bulk_payload(data, plural):
+    """
+    Rows of a bulk request, sent either as a JSON list or as {plural: [...]}
+    Returns None when the body has neither shape
+    """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get(plural), list):
+        return data[plural]
+    return None
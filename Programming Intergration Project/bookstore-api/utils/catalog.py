@@ -0,0 +1,340 @@
+import sys
+import time
+import threading
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import db, Author, Publisher, Series, Book, Info, Edition
+
+# Models whose writes invalidate the snapshot
+CATALOG_MODELS = (Author, Publisher, Series, Book, Info, Edition)
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def _intern(value):
+    # Genres, formats and countries repeat across thousands of rows
+    return sys.intern(value) if isinstance(value, str) else value
+
+class AuthorRecord:
+    __slots__ = ('AuthID', 'FirstName', 'LastName', 'Birthday', 'CountryOfResidence', 'HrsWritingPerDay')
+    
+    def __init__(self, row):
+        self.AuthID = row.AuthID
+        self.FirstName = row.FirstName
+        self.LastName = row.LastName
+        self.Birthday = _iso(row.Birthday)
+        self.CountryOfResidence = _intern(row.CountryOfResidence)
+        self.HrsWritingPerDay = row.HrsWritingPerDay
+    
+    def to_dict(self):
+        return {
+            'AuthID': self.AuthID,
+            'FirstName': self.FirstName,
+            'LastName': self.LastName,
+            'Birthday': self.Birthday,
+            'CountryOfResidence': self.CountryOfResidence,
+            'HrsWritingPerDay': self.HrsWritingPerDay,
+            'FullName': f"{self.FirstName} {self.LastName}"
+        }
+
+class PublisherRecord:
+    __slots__ = ('PubID', 'PublishingHouse', 'City', 'State', 'Country', 'YearEstablished', 'MarketingSpend')
+    
+    def __init__(self, row):
+        self.PubID = row.PubID
+        self.PublishingHouse = row.PublishingHouse
+        self.City = _intern(row.City)
+        self.State = _intern(row.State)
+        self.Country = _intern(row.Country)
+        self.YearEstablished = row.YearEstablished
+        self.MarketingSpend = row.MarketingSpend
+    
+    def to_dict(self):
+        return {
+            'PubID': self.PubID,
+            'PublishingHouse': self.PublishingHouse,
+            'City': self.City,
+            'State': self.State,
+            'Country': self.Country,
+            'YearEstablished': self.YearEstablished,
+            'MarketingSpend': self.MarketingSpend
+        }
+
+class SeriesRecord:
+    __slots__ = ('SeriesID', 'SeriesName', 'PlannedVolumes', 'BookTourEvents')
+    
+    def __init__(self, row):
+        self.SeriesID = row.SeriesID
+        self.SeriesName = row.SeriesName
+        self.PlannedVolumes = row.PlannedVolumes
+        self.BookTourEvents = row.BookTourEvents
+    
+    def to_dict(self):
+        return {
+            'SeriesID': self.SeriesID,
+            'SeriesName': self.SeriesName,
+            'PlannedVolumes': self.PlannedVolumes,
+            'BookTourEvents': self.BookTourEvents
+        }
+
+class InfoRecord:
+    __slots__ = ('BookID', 'Genre', 'SeriesID', 'VolumeNumber', 'StaffComment')
+    
+    def __init__(self, row):
+        self.BookID = row.BookID
+        self.Genre = _intern(row.Genre)
+        self.SeriesID = _intern(row.SeriesID)
+        self.VolumeNumber = row.VolumeNumber
+        self.StaffComment = row.StaffComment
+    
+    def to_dict(self):
+        return {
+            'BookID': self.BookID,
+            'Genre': self.Genre,
+            'SeriesID': self.SeriesID,
+            'VolumeNumber': self.VolumeNumber,
+            'StaffComment': self.StaffComment
+        }
+
+class BookRecord:
+    __slots__ = ('BookID', 'Title', 'AuthID', 'info', 'isbns')
+    
+    def __init__(self, row):
+        self.BookID = row.BookID
+        self.Title = row.Title
+        self.AuthID = row.AuthID
+        self.info = None
+        self.isbns = ()
+    
+    def to_dict(self):
+        return {
+            'BookID': self.BookID,
+            'Title': self.Title,
+            'AuthID': self.AuthID
+        }
+
+class EditionRecord:
+    __slots__ = ('ISBN', 'BookID', 'Formatt', 'PubID', 'PublicationDate', 'Pages', 'PrintRunSizeK', 'Price')
+    
+    def __init__(self, row):
+        self.ISBN = row.ISBN
+        self.BookID = row.BookID
+        self.Formatt = _intern(row.Formatt)
+        self.PubID = _intern(row.PubID)
+        self.PublicationDate = _iso(row.PublicationDate)
+        self.Pages = row.Pages
+        self.PrintRunSizeK = row.PrintRunSizeK
+        self.Price = float(row.Price) if row.Price else None
+    
+    def to_dict(self):
+        return {
+            'ISBN': self.ISBN,
+            'BookID': self.BookID,
+            'Format': self.Formatt,
+            'PubID': self.PubID,
+            'PublicationDate': self.PublicationDate,
+            'Pages': self.Pages,
+            'PrintRunSizeK': self.PrintRunSizeK,
+            'Price': self.Price
+        }
+
+def _deep_size(value, seen):
+    """
+    Approximate retained size of a record graph in bytes
+    """
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(_deep_size(item, seen) for item in value)
+    elif hasattr(value, '__slots__'):
+        size += sum(_deep_size(getattr(value, slot), seen) for slot in value.__slots__)
+    return size
+
+class CatalogSnapshot:
+    """
+    Immutable in-memory copy of the catalog tables, indexed by primary key
+    """
+    def __init__(self, connection, version):
+        self.version = version
+        self.loaded_at = time.time()
+        
+        started = time.perf_counter()
+        self.authors = {row.AuthID: AuthorRecord(row) for row in connection.execute(select(Author.__table__))}
+        self.publishers = {row.PubID: PublisherRecord(row) for row in connection.execute(select(Publisher.__table__))}
+        self.series = {row.SeriesID: SeriesRecord(row) for row in connection.execute(select(Series.__table__))}
+        self.books = {row.BookID: BookRecord(row) for row in connection.execute(select(Book.__table__))}
+        self.editions = {
+            row.ISBN: EditionRecord(row)
+            for row in connection.execute(select(Edition.__table__).order_by(Edition.ISBN))
+        }
+        
+        for row in connection.execute(select(Info.__table__)):
+            book = self.books.get(row.BookID)
+            if book is not None:
+                book.info = InfoRecord(row)
+        
+        isbns_by_book = {}
+        for edition in self.editions.values():
+            isbns_by_book.setdefault(edition.BookID, []).append(edition.ISBN)
+        for book_id, isbns in isbns_by_book.items():
+            book = self.books.get(book_id)
+            if book is not None:
+                book.isbns = tuple(isbns)
+        
+        self.load_seconds = time.perf_counter() - started
+    
+    def book_extended(self, book_id):
+        """
+        Same shape as Book.to_dict_extended, resolved from memory
+        Returns None when the book is not in the snapshot
+        """
+        book = self.books.get(book_id)
+        if book is None:
+            return None
+        
+        author = self.authors.get(book.AuthID)
+        return {
+            **book.to_dict(),
+            'Author': author.to_dict() if author else None,
+            'Info': book.info.to_dict() if book.info else None,
+            'Editions': [self.editions[isbn].to_dict() for isbn in book.isbns]
+        }
+    
+    def footprint(self):
+        """
+        Row counts and approximate memory held by each index
+        """
+        seen = set()
+        tables = {
+            'authors': self.authors,
+            'publishers': self.publishers,
+            'series': self.series,
+            'books': self.books,
+            'editions': self.editions
+        }
+        report = {
+            name: {"rows": len(index), "bytes": _deep_size(index, seen)}
+            for name, index in tables.items()
+        }
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+            "tables": report,
+            "total_bytes": sum(table["bytes"] for table in report.values())
+        }
+
+class Catalog:
+    """
+    Holder for the current snapshot and the catalog change counter
+    The counter is bumped after every commit that touched a catalog model;
+    a snapshot older than the counter is reloaded before it is used again, so
+    this process always reads its own writes. One older than
+    CATALOG_REFRESH_SECONDS (to pick up writes made by other workers) keeps
+    being served while a background thread reloads it
+    """
+    def __init__(self):
+        self.version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+    
+    def bump(self):
+        self.version += 1
+    
+    def is_current(self, snapshot):
+        max_age = current_app.config.get('CATALOG_REFRESH_SECONDS', 60)
+        return snapshot.version == self.version and time.time() - snapshot.loaded_at < max_age
+    
+    def load(self):
+        """
+        Build a fresh snapshot on its own connection, so only committed
+        rows are ever captured
+        """
+        with self._lock:
+            return self._reload()
+    
+    def _reload(self):
+        # Caller holds the lock
+        version = self.version
+        with db.engine.connect() as connection:
+            self._snapshot = CatalogSnapshot(connection, version)
+        return self._snapshot
+    
+    def _refresh_in_background(self):
+        """
+        Reload in a thread unless a load is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        
+        app = current_app._get_current_object()
+        
+        def run():
+            try:
+                with app.app_context():
+                    self._reload()
+            except Exception as e:
+                print(f"Catalog snapshot refresh failed: {str(e)}")
+            finally:
+                self._lock.release()
+        
+        try:
+            threading.Thread(target=run, name='catalog-refresh', daemon=True).start()
+        except Exception:
+            self._lock.release()
+            raise
+    
+    def get(self):
+        """
+        Current snapshot, or None when disabled or the load fails
+        Callers then fall back to the ORM relationships
+        """
+        if not current_app.config.get('CATALOG_SNAPSHOT_ENABLED', True):
+            return None
+        
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            if not self.is_current(snapshot):
+                self._refresh_in_background()
+            return snapshot
+        
+        try:
+            with self._lock:
+                # Recheck: another request may have reloaded while this one waited
+                snapshot = self._snapshot
+                if snapshot is not None and snapshot.version == self.version:
+                    return snapshot
+                return self._reload()
+        except Exception as e:
+            print(f"Catalog snapshot load failed: {str(e)}")
+            return None
+    
+    def peek(self):
+        """
+        Current snapshot without triggering a reload
+        """
+        return self._snapshot
+
+# Shared per-process catalog
+catalog = Catalog()
+
+@event.listens_for(Session, 'after_flush')
+def _mark_catalog_writes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, CATALOG_MODELS):
+            session.info['catalog_changed'] = True
+            return
+
+@event.listens_for(Session, 'after_commit')
+def _bump_catalog_version(session):
+    if session.info.pop('catalog_changed', False):
+        catalog.bump()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_writes(session):
+    session.info.pop('catalog_changed', None)
@@ -0,0 +1,128 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import func, select
+from models import db, Checkout
+
+class CheckoutSnapshot:
+    """
+    Columnar copy of the checkouts table pivoted into a books x months matrix
+    All analytics are whole-array NumPy operations over this matrix
+    """
+    def __init__(self, frame, fingerprint):
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        
+        book_codes, self.book_ids = pd.factorize(frame['BookID'], sort=True)
+        month_codes, self.months = pd.factorize(frame['CheckoutMonth'], sort=True)
+        
+        self.matrix = np.zeros((len(self.book_ids), len(self.months)), dtype=np.int64)
+        np.add.at(self.matrix, (book_codes, month_codes), frame['NumberOfCheckouts'].fillna(0).to_numpy(dtype=np.int64))
+        self.book_index = {book_id: code for code, book_id in enumerate(self.book_ids)}
+        self.month_index = {int(month): code for code, month in enumerate(self.months)}
+    
+    def series(self, book_id=None):
+        """
+        Monthly checkout totals for one book, or summed over all books
+        """
+        if book_id is None:
+            return self.matrix.sum(axis=0)
+        return self.matrix[self.book_index[book_id]]
+    
+    def trend(self, book_id=None):
+        """
+        Monthly totals with absolute and relative month-over-month growth
+        """
+        totals = self.series(book_id)
+        if not len(totals):
+            return []
+        change = np.diff(totals, prepend=totals[:1])
+        previous = np.concatenate(([0], totals[:-1]))
+        growth = np.divide(change, previous, out=np.full(len(totals), np.nan), where=previous > 0)
+        growth[0] = np.nan
+        
+        return [{
+            "month": int(month),
+            "checkouts": int(total),
+            "change": int(delta) if index else None,
+            "growth": round(float(rate), 4) if not np.isnan(rate) else None
+        } for index, (month, total, delta, rate) in enumerate(zip(self.months, totals, change, growth))]
+    
+    def movers(self, from_month, to_month, limit):
+        """
+        Books with the largest checkout gains and losses between two months
+        """
+        before = self.matrix[:, self.month_index[from_month]]
+        after = self.matrix[:, self.month_index[to_month]]
+        change = after - before
+        growth = np.divide(change, before, out=np.full(len(change), np.nan), where=before > 0)
+        
+        # Stable sorts so ties keep BookID order
+        gainers = np.argsort(-change, kind='stable')[:limit]
+        losers = np.argsort(change, kind='stable')[:limit]
+        
+        def rows(codes, keep):
+            return [{
+                "BookID": self.book_ids[code],
+                "from_checkouts": int(before[code]),
+                "to_checkouts": int(after[code]),
+                "change": int(change[code]),
+                "growth": round(float(growth[code]), 4) if not np.isnan(growth[code]) else None
+            } for code in codes if keep(change[code])]
+        
+        return rows(gainers, lambda value: value > 0), rows(losers, lambda value: value < 0)
+
+class CheckoutAnalytics:
+    """
+    Cached CheckoutSnapshot, reloaded when the table fingerprint changes
+    The fingerprint (row count, checkout sum, month range) is checked at most
+    every CHECKOUT_ANALYTICS_CHECK_SECONDS, so a re-import through
+    import_data.py is picked up without a restart
+    """
+    def __init__(self):
+        self._snapshot = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+    
+    def _fingerprint(self):
+        return tuple(db.session.execute(select(
+            func.count(),
+            func.sum(Checkout.NumberOfCheckouts),
+            func.min(Checkout.CheckoutMonth),
+            func.max(Checkout.CheckoutMonth)
+        ).select_from(Checkout)).one())
+    
+    def _load(self, fingerprint):
+        with db.engine.connect() as connection:
+            frame = pd.read_sql(
+                select(Checkout.BookID, Checkout.CheckoutMonth, Checkout.NumberOfCheckouts),
+                connection
+            )
+        return CheckoutSnapshot(frame, fingerprint)
+    
+    def get(self):
+        interval = current_app.config.get('CHECKOUT_ANALYTICS_CHECK_SECONDS', 30)
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+        
+        with self._lock:
+            fingerprint = self._fingerprint()
+            if self._snapshot is None or self._snapshot.fingerprint != fingerprint:
+                self._snapshot = self._load(fingerprint)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+    
+    def peek(self):
+        """
+        Current snapshot without triggering a reload
+        """
+        return self._snapshot
+    
+    def invalidate(self):
+        self._snapshot = None
+
+# Shared per-process cache
+checkout_analytics = CheckoutAnalytics()
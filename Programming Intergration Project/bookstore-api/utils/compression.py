@@ -0,0 +1,174 @@
+import zlib
+from flask import request, current_app
+
+# Optional codecs, used when their packages are installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class GzipCodec:
+    name = 'gzip'
+    
+    def __init__(self, level):
+        self.level = level
+    
+    def compressor(self):
+        # wbits 31: deflate with a gzip header and trailer
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+    
+    def compress(self, data):
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data):
+        return self._compressor.process(data)
+    
+    def flush(self):
+        return self._compressor.finish()
+
+class BrotliCodec:
+    name = 'br'
+    
+    def __init__(self, quality):
+        self.quality = quality
+    
+    def compressor(self):
+        return _BrotliStream(self.quality)
+    
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+class ZstdCodec:
+    name = 'zstd'
+    
+    def __init__(self, level):
+        self.level = level
+    
+    def compressor(self):
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+    
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+def available_codecs(config):
+    """
+    Codecs that can be served, keyed by content-coding
+    """
+    codecs = {'gzip': GzipCodec(config['COMPRESSION_GZIP_LEVEL'])}
+    if brotli is not None:
+        codecs['br'] = BrotliCodec(config['COMPRESSION_BROTLI_QUALITY'])
+    if zstandard is not None:
+        codecs['zstd'] = ZstdCodec(config['COMPRESSION_ZSTD_LEVEL'])
+    return codecs
+
+def parse_accept_encoding(header):
+    """
+    {coding: q} from an Accept-Encoding header, e.g. "gzip;q=0.8, br"
+    """
+    weights = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    return weights
+
+def negotiate(header, config):
+    """
+    Codec for the request, or None to send the body as is
+    Highest client q-value wins, ties go to the COMPRESSION_ALGORITHMS order
+    """
+    weights = parse_accept_encoding(header)
+    codecs = available_codecs(config)
+    
+    best, best_q = None, 0.0
+    for name in config['COMPRESSION_ALGORITHMS'].split(','):
+        name = name.strip()
+        if name not in codecs:
+            continue
+        q = weights.get(name, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = codecs[name], q
+    return best
+
+def _stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compress_response(response):
+    """
+    after_request hook: compress JSON, CSV and text bodies for clients that
+    accept it. Buffered bodies under COMPRESSION_MIN_SIZE, or that would not
+    shrink, are sent as is; streamed bodies (e.g. export downloads) are
+    compressed chunk by chunk without buffering the whole file
+    """
+    config = current_app.config
+    if not config['COMPRESSION_ENABLED']:
+        return response
+    
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or request.method == 'HEAD'
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['COMPRESSION_MIMETYPES']):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    
+    codec = negotiate(request.headers.get('Accept-Encoding'), config)
+    if codec is None:
+        return response
+    
+    if response.is_streamed:
+        if response.content_length is not None and response.content_length < config['COMPRESSION_MIN_SIZE']:
+            return response
+        
+        response.response = _stream(response.response, codec.compressor())
+        response.direct_passthrough = False
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESSION_MIN_SIZE']:
+            return response
+        
+        compressed = codec.compress(data)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+    
+    response.headers['Content-Encoding'] = codec.name
+    
+    # The encoded body is a different byte sequence, a strong ETag no longer matches it
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    
+    return response
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -0,0 +1,221 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, text
+from models import db, Job
+from utils.catalog import catalog
+from utils.checkout_analytics import checkout_analytics
+from utils.jobs import job_runner
+from utils.order_buffer import order_buffer
+from utils.sales_cube import sales_cube
+from utils.single_flight import single_flight
+from utils.suggest import suggest_index
+from utils.warmup import warmup
+
+HEALTH_STATUSES = ('ok', 'degraded', 'down')
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def pool_status():
+    """
+    Connections of this process's pool in use against its capacity, no I/O
+    saturation is checked out / (pool size + max overflow), None for pools without a size
+    """
+    pool = db.engine.pool
+    if not hasattr(pool, 'size'):
+        return {'class': type(pool).__name__, 'saturation': None}
+    
+    capacity = pool.size() + max(getattr(pool, '_max_overflow', 0), 0)
+    checked_out = pool.checkedout()
+    return {
+        'class': type(pool).__name__,
+        'size': pool.size(),
+        'capacity': capacity,
+        'checked_out': checked_out,
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'saturation': round(checked_out / capacity, 3) if capacity else None
+    }
+
+def db_ping(pool=None):
+    """
+    Round trip of SELECT 1 on a pooled connection, checkout included
+    Skipped when the pool is exhausted, where the checkout would wait for pool_timeout
+    """
+    pool = pool or pool_status()
+    if pool['saturation'] is not None and pool['saturation'] >= 1:
+        return {'ok': False, 'latency_ms': None, 'error': "Connection pool exhausted"}
+    
+    started = time.perf_counter()
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return {'ok': False, 'latency_ms': _ms(started), 'error': str(e)}
+    return {'ok': True, 'latency_ms': _ms(started)}
+
+def cache_status():
+    """
+    Load state and age of the in-process snapshots and indexes, no I/O
+    """
+    snapshot = catalog.peek()
+    checkouts = checkout_analytics.peek()
+    return {
+        'catalog': {
+            'loaded': snapshot is not None,
+            'enabled': current_app.config.get('CATALOG_SNAPSHOT_ENABLED', True),
+            'version': catalog.version,
+            'is_current': snapshot is not None and catalog.is_current(snapshot),
+            'age_seconds': round(time.time() - snapshot.loaded_at, 1) if snapshot is not None else None
+        },
+        'suggest': {
+            'loaded': suggest_index.is_loaded,
+            'age_seconds': round(time.monotonic() - suggest_index.loaded_at, 1) if suggest_index.is_loaded else None
+        },
+        'sales_cube': {'loaded': sales_cube.is_loaded},
+        'checkout_analytics': {
+            'loaded': checkouts is not None,
+            'age_seconds': round(time.time() - checkouts.loaded_at, 1) if checkouts is not None else None
+        },
+        'single_flight': single_flight.stats()
+    }
+
+def job_backlog():
+    """
+    Queued and running jobs with the age of the oldest queued one, from idx_jobs_status_id
+    """
+    rows = db.session.query(
+        Job.Status, func.count(), func.min(Job.CreatedAt)
+    ).filter(
+        Job.Status.in_(('queued', 'running'))
+    ).group_by(Job.Status).all()
+    counts = {status: (count, oldest) for status, count, oldest in rows}
+    
+    queued, oldest = counts.get('queued', (0, None))
+    return {
+        'queued': queued,
+        'running': counts.get('running', (0, None))[0],
+        'oldest_queued_seconds': round((datetime.now() - oldest).total_seconds(), 1) if oldest else None,
+        'runner': job_runner.stats(),
+        'write_behind': order_buffer.stats() if order_buffer.is_running else None
+    }
+
+def replica_lag():
+    """
+    Seconds the connected MySQL server is behind its source, from SHOW REPLICA
+    STATUS (SHOW SLAVE STATUS before 8.0.22); None when it is not a replica
+    """
+    with db.engine.connect() as connection:
+        if connection.dialect.name != 'mysql':
+            return {'replica': False, 'lag_seconds': None}
+        
+        try:
+            result = connection.exec_driver_sql("SHOW REPLICA STATUS")
+        except Exception:
+            result = connection.exec_driver_sql("SHOW SLAVE STATUS")
+        row = result.mappings().first()
+    
+    if row is None:
+        return {'replica': False, 'lag_seconds': None}
+    
+    lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+    return {
+        'replica': True,
+        # NULL while the replication threads are stopped
+        'running': lag is not None,
+        'lag_seconds': lag
+    }
+
+def readiness():
+    """
+    (ready, report) for the load balancer: warm-up finished, pool not
+    exhausted and the database answering; one SELECT 1 at most
+    Failed warm-up steps are listed but do not make the process unready
+    """
+    pool = pool_status()
+    database = db_ping(pool)
+    ready = warmup.is_finished and database['ok']
+    return ready, {
+        'status': 'ready' if ready else ('warming_up' if not warmup.is_finished else 'unavailable'),
+        'warmup': warmup.report()['state'],
+        'warmup_failed': warmup.failed_steps(),
+        'database': database,
+        'pool': pool
+    }
+
+def _check(name, fn, checks):
+    started = time.perf_counter()
+    try:
+        checks[name] = fn()
+    except Exception as e:
+        checks[name] = {'error': str(e)}
+    finally:
+        db.session.remove()
+    checks[name]['check_ms'] = _ms(started)
+
+def _build_diagnostics():
+    config = current_app.config
+    checks = {}
+    started = time.perf_counter()
+    
+    pool = pool_status()
+    checks['pool'] = pool
+    _check('database', lambda: db_ping(pool), checks)
+    _check('caches', cache_status, checks)
+    _check('jobs', job_backlog, checks)
+    _check('replica', replica_lag, checks)
+    checks['warmup'] = warmup.report()
+    
+    problems = []
+    exhausted = pool['saturation'] is not None and pool['saturation'] >= 1
+    if not checks['database'].get('ok'):
+        problems.append('connection pool exhausted' if exhausted else 'database unreachable')
+    elif checks['database']['latency_ms'] > config['HEALTH_DB_LATENCY_MAX_MS']:
+        problems.append('database slow')
+    if not exhausted and pool['saturation'] is not None and pool['saturation'] >= config['HEALTH_POOL_SATURATION_MAX']:
+        problems.append('connection pool saturated')
+    if (checks['jobs'].get('oldest_queued_seconds') or 0) > config['HEALTH_JOB_BACKLOG_MAX_SECONDS']:
+        problems.append('job backlog')
+    if checks['replica'].get('replica') and (
+            not checks['replica']['running'] or checks['replica']['lag_seconds'] > config['HEALTH_REPLICA_LAG_MAX_SECONDS']):
+        problems.append('replica lagging')
+    if not warmup.is_finished:
+        problems.append('warming up')
+    elif warmup.failed_steps():
+        problems.append('warm-up step failed')
+    
+    if not checks['database'].get('ok'):
+        status = 'down'
+    else:
+        status = 'degraded' if problems else 'ok'
+    
+    return {
+        'status': status,
+        'problems': problems,
+        'checks': checks,
+        'checked_at': datetime.now().isoformat(),
+        'duration_ms': _ms(started)
+    }
+
+# Last deep report of this process and when it was built
+_diagnostics = {'report': None, 'built_at': 0}
+_diagnostics_lock = threading.Lock()
+
+def diagnostics():
+    """
+    Full report for /health/deep, rebuilt at most every HEALTH_DEEP_CACHE_SECONDS;
+    concurrent pollers share one rebuild through single_flight
+    """
+    max_age = current_app.config['HEALTH_DEEP_CACHE_SECONDS']
+    with _diagnostics_lock:
+        if _diagnostics['report'] is not None and time.monotonic() - _diagnostics['built_at'] < max_age:
+            return _diagnostics['report']
+    
+    report, shared = single_flight.do(('health', 'deep'), _build_diagnostics)
+    if not shared:
+        with _diagnostics_lock:
+            _diagnostics['report'] = report
+            _diagnostics['built_at'] = time.monotonic()
+    return report
@@ -0,0 +1,544 @@
+import json
+import random
+import re
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import inspect, insert, text
+from models import (
+    db, Author, Publisher, Series, Book, Edition, Info, Award,
+    Order, OrderKey, OrderDetail, Rating, Checkout
+)
+
+# Most columns in a proposed index
+MAX_INDEX_COLUMNS = 5
+
+# Column types MySQL cannot index without a prefix length
+UNINDEXABLE_TYPES = ('TEXT', 'BLOB', 'JSON')
+
+# Marker table written by generate_dataset; analysis runs DDL, so it refuses other databases
+DATASET_MARKER = 'index_advisor_dataset'
+
+_COLUMN_REF = re.compile(r'(?<![\w`"])[`"]?([A-Za-z_]\w*)[`"]?\.[`"]?([A-Za-z_]\w*)[`"]?')
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+[`"]?([A-Za-z_]\w*)[`"]?(?:\s+AS\s+[`"]?([A-Za-z_]\w*)[`"]?)?', re.I)
+_EQUALITY_AFTER = re.compile(r'\s*(=|IN\s*\()', re.I)
+_RANGE_AFTER = re.compile(r'\s*(<=|>=|<>|!=|<|>|BETWEEN\b|LIKE\b)', re.I)
+_EQUALITY_BEFORE = re.compile(r'=\s*$')
+_ACTUAL_TIME = re.compile(r'actual time=([\d.]+)\.\.([\d.]+) rows=[\d.e+]+ loops=(\d+)')
+
+class Statement:
+    """
+    One distinct SQL text of the captured workload
+    """
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.captured_ms = 0.0
+        self.endpoints = set()
+        self.samples = []
+        self.baseline_ms = None
+    
+    @property
+    def weight(self):
+        return self.captured_ms or self.count
+
+class IndexDef:
+    __slots__ = ('table', 'name', 'columns', 'unique', 'primary')
+    
+    def __init__(self, table, name, columns, unique=False, primary=False):
+        self.table = table
+        self.name = name
+        self.columns = tuple(columns)
+        self.unique = unique
+        self.primary = primary
+    
+    def describe(self):
+        kind = 'PRIMARY KEY' if self.primary else f"index {self.name}"
+        return f"{kind} ({', '.join(self.columns)})"
+
+class Proposal:
+    """
+    An index to add or drop, with its measured effect on the workload
+    gain_ms is per replay of the workload, weighted by statement counts
+    unique is kept for dropped unique indexes, so they are recreated as unique
+    """
+    def __init__(self, action, table, name, columns, reason, unique=False):
+        self.action = action
+        self.table = table
+        self.name = name
+        self.columns = tuple(columns)
+        self.reason = reason
+        self.unique = unique
+        self.statements = []
+        self.gain_ms = 0.0
+        self.baseline_ms = 0.0
+        self.error = None
+    
+    @property
+    def gain_pct(self):
+        return 100 * self.gain_ms / self.baseline_ms if self.baseline_ms else 0.0
+    
+    def create_sql(self):
+        kind = 'UNIQUE INDEX' if self.unique else 'INDEX'
+        return f"CREATE {kind} {self.name} ON {self.table} ({', '.join(self.columns)});"
+    
+    def drop_sql(self):
+        return f"DROP INDEX {self.name} ON {self.table};"
+
+# Workload
+
+def load_workload(path, dialect, max_samples=5):
+    """
+    Group the captured statements of one dialect by SQL text
+    Returns the statements and the number of records skipped for another dialect
+    """
+    statements = {}
+    skipped = 0
+    with open(path, encoding='utf-8') as capture:
+        for line in capture:
+            record = json.loads(line)
+            if record.get('dialect') != dialect:
+                skipped += 1
+                continue
+            
+            statement = statements.get(record['statement'])
+            if statement is None:
+                statement = statements[record['statement']] = Statement(record['statement'])
+            statement.count += 1
+            statement.captured_ms += record.get('duration_ms') or 0
+            if record.get('endpoint'):
+                statement.endpoints.add(record['endpoint'])
+            if len(statement.samples) < max_samples:
+                statement.samples.append(record.get('parameters'))
+    
+    return sorted(statements.values(), key=lambda s: s.weight, reverse=True), skipped
+
+# Schema
+
+def current_indexes(connection):
+    """
+    Secondary indexes and primary keys of every table, expression indexes left out
+    """
+    inspector = inspect(connection)
+    indexes = []
+    for table in inspector.get_table_names():
+        primary = inspector.get_pk_constraint(table).get('constrained_columns') or []
+        if primary:
+            indexes.append(IndexDef(table, 'PRIMARY', primary, unique=True, primary=True))
+        
+        for index in inspector.get_indexes(table):
+            columns = index.get('column_names') or []
+            if columns and all(columns):
+                indexes.append(IndexDef(table, index['name'], columns, unique=bool(index.get('unique'))))
+    return indexes
+
+def indexable_columns(connection):
+    """
+    {table: {column name lowercased: column name}} for columns an index can use
+    """
+    inspector = inspect(connection)
+    columns = {}
+    for table in inspector.get_table_names():
+        columns[table.lower()] = {
+            column['name'].lower(): column['name']
+            for column in inspector.get_columns(table)
+            if not str(column['type']).upper().startswith(UNINDEXABLE_TYPES)
+        }
+    return columns
+
+def redundant_indexes(indexes):
+    """
+    Secondary indexes whose columns are a left prefix of the primary key or of
+    another index: every lookup they serve is served by the longer one
+    """
+    proposals = []
+    for index in indexes:
+        if index.primary:
+            continue
+        
+        for other in indexes:
+            if other is index or other.table != index.table:
+                continue
+            if other.columns[:len(index.columns)] != index.columns:
+                continue
+            # Keep unique constraints unless an identical unique index exists
+            if index.unique and not (other.unique and other.columns == index.columns):
+                continue
+            # Of two identical indexes of the same kind, keep the one sorting first
+            if other.columns == index.columns and not other.primary and other.unique == index.unique and other.name > index.name:
+                continue
+            
+            proposals.append(Proposal(
+                'drop', index.table, index.name, index.columns,
+                f"duplicates {other.describe()}" if other.columns == index.columns
+                else f"left prefix of {other.describe()}",
+                unique=index.unique
+            ))
+            break
+    return proposals
+
+# Candidate indexes
+
+def table_access(sql, columns):
+    """
+    Columns a statement uses per table: equality and range predicates,
+    ORDER BY / GROUP BY keys and everything else it reads
+    A heuristic over the SQL text SQLAlchemy renders (qualified column names),
+    good enough to suggest candidates that are then measured
+    """
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        if table.lower() in columns:
+            aliases[(alias or table).lower()] = table.lower()
+    
+    order_spans = _clause_spans(sql, 'ORDER BY')
+    group_spans = _clause_spans(sql, 'GROUP BY')
+    
+    access = {}
+    for match in _COLUMN_REF.finditer(sql):
+        table = aliases.get(match.group(1).lower())
+        column = columns.get(table, {}).get(match.group(2).lower()) if table else None
+        if column is None:
+            continue
+        
+        entry = access.setdefault(table, {'eq': [], 'range': [], 'order': [], 'group': [], 'read': []})
+        after = sql[match.end():match.end() + 12]
+        before = sql[max(match.start() - 3, 0):match.start()]
+        position = match.start()
+        
+        if any(start <= position < end for start, end in order_spans):
+            kind = 'order'
+        elif any(start <= position < end for start, end in group_spans):
+            kind = 'group'
+        elif _EQUALITY_AFTER.match(after) or _EQUALITY_BEFORE.search(before):
+            kind = 'eq'
+        elif _RANGE_AFTER.match(after):
+            kind = 'range'
+        else:
+            kind = 'read'
+        
+        if column not in entry[kind]:
+            entry[kind].append(column)
+    return access
+
+def _clause_spans(sql, keyword):
+    spans = []
+    for match in re.finditer(keyword, sql, re.I):
+        end = re.search(r'\b(LIMIT|HAVING|ORDER BY|UNION)\b|\)', sql[match.end():], re.I)
+        spans.append((match.end(), match.end() + end.start() if end else len(sql)))
+    return spans
+
+def _candidate_columns(entry):
+    eq = entry['eq']
+    shapes = [
+        eq + entry['range'][:1],
+        eq + entry['order'],
+        eq + entry['group']
+    ]
+    # Covering variant: every column the statement touches on the table
+    covering = list(dict.fromkeys(eq + entry['range'][:1] + entry['group'] + entry['order'] + entry['range'][1:] + entry['read']))
+    if len(covering) <= MAX_INDEX_COLUMNS:
+        shapes.append(covering)
+    
+    for shape in shapes:
+        shape = list(dict.fromkeys(shape))[:MAX_INDEX_COLUMNS]
+        if shape:
+            yield tuple(shape)
+
+def candidate_indexes(statements, indexes, columns):
+    """
+    Index proposals to evaluate, skipping any already covered by an existing
+    index (same leading columns), most heavily used tables first
+    """
+    existing = {}
+    for index in indexes:
+        existing.setdefault(index.table.lower(), []).append(index.columns)
+    
+    candidates = {}
+    for statement in statements:
+        for table, entry in table_access(statement.sql, columns).items():
+            for shape in _candidate_columns(entry):
+                if any(cols[:len(shape)] == shape for cols in existing.get(table, ())):
+                    continue
+                
+                key = (table, shape)
+                if key not in candidates:
+                    name = f"idx_{table}_{'_'.join(column.lower() for column in shape)}"[:64]
+                    candidates[key] = Proposal('add', table, name, shape, "suggested by the workload predicates")
+                candidates[key].statements.append(statement)
+    
+    return sorted(
+        candidates.values(),
+        key=lambda proposal: sum(statement.weight for statement in proposal.statements),
+        reverse=True
+    )
+
+# Measurement
+
+def _parameters(sample):
+    if isinstance(sample, list):
+        return tuple(sample)
+    return sample or {}
+
+def measure(connection, statement, repeat=3):
+    """
+    Milliseconds one execution of the statement takes, over its captured samples
+    MySQL 8.0.18+ reports EXPLAIN ANALYZE actual times; other databases are
+    timed on the wall clock (best of repeat runs per sample)
+    """
+    timings = []
+    for sample in statement.samples or [None]:
+        parameters = _parameters(sample)
+        if connection.dialect.name == 'mysql':
+            plan = connection.exec_driver_sql(f"EXPLAIN ANALYZE {statement.sql}", parameters).scalar()
+            actual = _ACTUAL_TIME.search(plan or '')
+            if actual:
+                timings.append(float(actual.group(2)) * int(actual.group(3)))
+                continue
+        
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            connection.exec_driver_sql(statement.sql, parameters).fetchall()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+    return statistics.median(timings)
+
+def _analyze_table(connection, table):
+    if connection.dialect.name == 'mysql':
+        connection.exec_driver_sql(f"ANALYZE TABLE {table}").fetchall()
+    else:
+        connection.exec_driver_sql(f"ANALYZE {table}")
+
+def _workload_ms(connection, statements, repeat):
+    return sum(measure(connection, statement, repeat) * statement.count for statement in statements)
+
+def _drop_index(connection, proposal):
+    if connection.dialect.name == 'mysql':
+        connection.exec_driver_sql(proposal.drop_sql().rstrip(';'))
+    else:
+        connection.exec_driver_sql(f"DROP INDEX {proposal.name}")
+
+def evaluate_add(connection, proposal, repeat):
+    """
+    Measure the statements the index is meant for, build it, re-measure, drop it again
+    Measuring right before the change keeps cache warm-up out of the gain
+    """
+    proposal.baseline_ms = _workload_ms(connection, proposal.statements, repeat)
+    connection.exec_driver_sql(proposal.create_sql().rstrip(';'))
+    try:
+        _analyze_table(connection, proposal.table)
+        after = _workload_ms(connection, proposal.statements, repeat)
+    finally:
+        _drop_index(connection, proposal)
+    proposal.gain_ms = proposal.baseline_ms - after
+
+def evaluate_drop(connection, proposal, statements, repeat):
+    """
+    Measure the statements reading the index's table, drop it, re-measure, recreate it
+    A negative gain is the slowdown the drop would cause
+    """
+    table = proposal.table.lower()
+    proposal.statements = [
+        statement for statement in statements
+        if re.search(rf'\b{re.escape(table)}\b', statement.sql, re.I)
+    ]
+    proposal.baseline_ms = _workload_ms(connection, proposal.statements, repeat)
+    
+    _drop_index(connection, proposal)
+    try:
+        after = _workload_ms(connection, proposal.statements, repeat)
+    finally:
+        connection.exec_driver_sql(proposal.create_sql().rstrip(';'))
+    proposal.gain_ms = proposal.baseline_ms - after
+
+def _overlapping(proposal, accepted):
+    """
+    The accepted add on the same table that this one is a left prefix of, or extends
+    """
+    for other in accepted:
+        if other.action != 'add' or other.table != proposal.table:
+            continue
+        shorter, longer = sorted((proposal.columns, other.columns), key=len)
+        if longer[:len(shorter)] == shorter:
+            return other
+    return None
+
+def analyze(connection, statements, max_candidates=30, min_gain_pct=10.0, repeat=3, progress=None):
+    """
+    Measure the workload, then every drop and add proposal against it
+    Adds are evaluated one at a time, so of two overlapping adds on a table
+    (one a left prefix of the other) only the larger gain is kept
+    Returns (accepted proposals, rejected proposals)
+    """
+    indexes = current_indexes(connection)
+    columns = indexable_columns(connection)
+    
+    # The first pass warms the caches, the second is the reported baseline
+    for statement in statements:
+        measure(connection, statement, 1)
+    for done, statement in enumerate(statements, start=1):
+        statement.baseline_ms = measure(connection, statement, repeat)
+        if progress:
+            progress('baseline', done, len(statements))
+    
+    drops = redundant_indexes(indexes)
+    adds = candidate_indexes(statements, indexes, columns)[:max_candidates]
+    
+    accepted, rejected = [], []
+    for done, proposal in enumerate(drops + adds, start=1):
+        try:
+            if proposal.action == 'drop':
+                evaluate_drop(connection, proposal, statements, repeat)
+                # A redundant index may go unless the workload measurably slows down
+                keep = proposal.gain_pct >= -min_gain_pct
+            else:
+                evaluate_add(connection, proposal, repeat)
+                keep = proposal.gain_pct >= min_gain_pct
+        except Exception as e:
+            proposal.error = str(e).splitlines()[0]
+            keep = False
+        
+        if keep and proposal.action == 'add':
+            other = _overlapping(proposal, accepted)
+            if other is not None and other.gain_ms >= proposal.gain_ms:
+                proposal.reason = f"overlaps {other.name} with a larger gain"
+                keep = False
+            elif other is not None:
+                other.reason = f"overlaps {proposal.name} with a larger gain"
+                accepted.remove(other)
+                rejected.append(other)
+        
+        (accepted if keep else rejected).append(proposal)
+        if progress:
+            progress('proposals', done, len(drops) + len(adds))
+    
+    return accepted, rejected
+
+def migration_script(accepted, workload_path, statements):
+    """
+    SQL applying the accepted proposals, with the measured effect of each and a
+    commented rollback section
+    """
+    executions = sum(statement.count for statement in statements)
+    lines = [
+        f"-- Generated by index_advisor.py on {datetime.now():%Y-%m-%d %H:%M}",
+        f"-- Workload: {workload_path} ({len(statements)} statements, {executions} executions)",
+        ""
+    ]
+    for proposal in sorted(accepted, key=lambda proposal: (proposal.action != 'drop', -proposal.gain_ms)):
+        lines.append(
+            f"-- {proposal.action.upper()} {proposal.table}({', '.join(proposal.columns)}): {proposal.reason}; "
+            f"workload {proposal.gain_ms:+.1f} ms ({proposal.gain_pct:+.1f}%) over {len(proposal.statements)} statements"
+        )
+        lines.append(proposal.create_sql() if proposal.action == 'add' else proposal.drop_sql())
+        lines.append("")
+    
+    lines.append("-- Rollback")
+    for proposal in accepted:
+        lines.append(f"-- {proposal.drop_sql() if proposal.action == 'add' else proposal.create_sql()}")
+    return '\n'.join(lines) + '\n'
+
+# Generated dataset
+
+def _chunks(rows, size=5000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def _insert(model, rows):
+    for chunk in _chunks(rows):
+        db.session.execute(insert(model), chunk)
+
+def generate_dataset(scale=1, seed=42, progress=None):
+    """
+    Fill empty catalog and order tables with synthetic data shaped like the
+    bookstore's: 1,000 books, 2,000 editions and 20,000 orders per unit of scale
+    Requires an app context; writes the DATASET_MARKER table when done
+    """
+    if db.session.query(Order.OrderID).first() is not None:
+        raise ValueError("The target database already has orders, point DATABASE_URL at an empty scratch database")
+    
+    rng = random.Random(seed)
+    countries = ['USA', 'UK', 'Canada', 'Australia', 'Germany', 'France', 'Japan', 'India']
+    genres = ['Fantasy', 'Mystery', 'Science Fiction', 'Romance', 'Thriller', 'History', 'Biography', 'Poetry']
+    formats = ['Hardcover', 'Trade paperback', 'Mass market paperback', 'Ebook', 'Audiobook']
+    words = ['Night', 'River', 'Shadow', 'Garden', 'Empire', 'Letters', 'Storm', 'Silent', 'Crown', 'Winter', 'House', 'Glass']
+    
+    authors = [{
+        'AuthID': f"A{i}", 'FirstName': f"First{i}", 'LastName': f"Last{i % (100 * scale)}",
+        'Birthday': date(1940, 1, 1) + timedelta(days=rng.randrange(20000)),
+        'CountryOfResidence': rng.choice(countries), 'HrsWritingPerDay': rng.randint(1, 8)
+    } for i in range(1, 200 * scale + 1)]
+    publishers = [{
+        'PubID': f"P{i}", 'PublishingHouse': f"{rng.choice(words)} House {i}",
+        'Country': rng.choice(countries), 'YearEstablished': rng.randint(1850, 2015)
+    } for i in range(1, 20 * scale + 1)]
+    series = [{
+        'SeriesID': f"S{i}", 'SeriesName': f"The {rng.choice(words)} Saga {i}", 'PlannedVolumes': rng.randint(2, 9)
+    } for i in range(1, 50 * scale + 1)]
+    
+    books, info, editions, ratings, checkouts, awards = [], [], [], [], [], []
+    for i in range(1, 1000 * scale + 1):
+        book_id = f"B{i}"
+        books.append({
+            'BookID': book_id,
+            'Title': f"{rng.choice(words)} of the {rng.choice(words)} {i}",
+            'AuthID': rng.choice(authors)['AuthID']
+        })
+        in_series = rng.random() < 0.2
+        info.append({
+            'BookID': book_id, 'Genre': rng.choice(genres),
+            'SeriesID': rng.choice(series)['SeriesID'] if in_series else None,
+            'VolumeNumber': rng.randint(1, 9) if in_series else None,
+            'StaffComment': f"Staff pick number {i}" if rng.random() < 0.3 else None
+        })
+        for e in range(2):
+            editions.append({
+                'ISBN': f"978{i:07d}{e}", 'BookID': book_id, 'Formatt': rng.choice(formats),
+                'PubID': rng.choice(publishers)['PubID'],
+                'PublicationDate': date(1990, 1, 1) + timedelta(days=rng.randrange(12000)),
+                'Pages': rng.randint(90, 900), 'PrintRunSizeK': rng.randint(1, 200),
+                'Price': round(rng.uniform(4, 60), 2)
+            })
+        for _ in range(rng.randint(0, 10)):
+            ratings.append({'BookID': book_id, 'Rating': rng.randint(1, 5), 'ReviewerID': rng.randint(1, 5000 * scale)})
+        for month in range(1, 13):
+            checkouts.append({'BookID': book_id, 'CheckoutMonth': month, 'NumberOfCheckouts': rng.randint(0, 300)})
+        if rng.random() < 0.05:
+            awards.append({'BookID': book_id, 'AwardName': f"{rng.choice(words)} Prize", 'YearWon': rng.randint(1990, 2024)})
+    
+    isbns = [edition['ISBN'] for edition in editions]
+    orders, details = [], []
+    first_day = date.today() - timedelta(days=3 * 365)
+    for i in range(1, 20000 * scale + 1):
+        order_id = f"ORD-{i:08d}"
+        sale_date = first_day + timedelta(days=rng.randrange(3 * 365))
+        orders.append({'OrderID': order_id, 'SaleDate': sale_date})
+        for item in range(1, rng.randint(1, 4) + 1):
+            details.append({
+                'OrderID': order_id, 'ItemID': str(item), 'ISBN': rng.choice(isbns),
+                'Quantity': rng.randint(1, 3), 'SaleDate': sale_date
+            })
+    
+    tables = [
+        (Author, authors), (Publisher, publishers), (Series, series), (Book, books), (Info, info),
+        (Edition, editions), (Rating, ratings), (Checkout, checkouts), (Award, awards),
+        (Order, orders), (OrderKey, [{'OrderID': order['OrderID']} for order in orders]), (OrderDetail, details)
+    ]
+    for done, (model, rows) in enumerate(tables, start=1):
+        _insert(model, rows)
+        db.session.commit()
+        if progress:
+            progress(model.__tablename__, done, len(tables))
+    
+    db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {DATASET_MARKER} (Scale INT, Seed INT, CreatedAt VARCHAR(30))"))
+    db.session.execute(
+        text(f"INSERT INTO {DATASET_MARKER} (Scale, Seed, CreatedAt) VALUES (:scale, :seed, :created)"),
+        {'scale': scale, 'seed': seed, 'created': datetime.now().isoformat()}
+    )
+    db.session.commit()
+    return {model.__tablename__: len(rows) for model, rows in tables}
+
+def is_generated_dataset(connection):
+    return inspect(connection).has_table(DATASET_MARKER)
@@ -0,0 +1,429 @@
+import csv
+import json
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, update
+from models import db, Job, Order, OrderDetail
+from utils.archive import archive_cutoff, archive_orders
+from utils.bulk import parse_date
+from utils.order_search import rebuild_order_search
+from utils.ratings import rebuild_rating_summary
+from utils.revenue import rebuild_daily_revenue
+
+# Derived tables that can be rebuilt from the normalized data
+REBUILDERS = {
+    'daily_revenue': rebuild_daily_revenue,
+    'order_search': rebuild_order_search,
+    'rating_summary': rebuild_rating_summary
+}
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+
+# Orders written per batch by the export job
+EXPORT_BATCH_SIZE = 1000
+
+# Least time between two progress writes of one job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+class JobCancelled(Exception):
+    """
+    Raised from the progress callback once cancellation has been requested
+    """
+
+def validate_rebuild(params):
+    tables = params.get('tables') or sorted(REBUILDERS)
+    if not isinstance(tables, list):
+        raise ValueError("tables must be a list")
+    
+    unknown = [name for name in tables if name not in REBUILDERS]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(map(str, unknown))}")
+    
+    return {'tables': tables}
+
+def run_rebuild(params, progress):
+    """
+    Rebuild derived tables one after the other
+    Cancelling leaves the current table partially rebuilt, run the job again to finish it
+    """
+    rows = {}
+    for name in params['tables']:
+        progress(0, None, stage=name)
+        rows[name] = REBUILDERS[name](
+            progress=lambda done, total, name=name: progress(done, total, stage=name)
+        )
+    return {'rows': rows}
+
+def validate_export_orders(params):
+    try:
+        start_date = parse_date(params.get('start_date'))
+        end_date = parse_date(params.get('end_date'))
+    except ValueError:
+        raise ValueError("Invalid date format. Expected YYYY-MM-DD")
+    
+    if start_date and end_date and start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    
+    return {
+        'start_date': start_date.isoformat() if start_date else None,
+        'end_date': end_date.isoformat() if end_date else None
+    }
+
+def export_path(filename):
+    directory = current_app.config['JOB_EXPORT_DIR']
+    if not os.path.isabs(directory):
+        directory = os.path.join(current_app.root_path, directory)
+    return os.path.join(directory, filename)
+
+def run_export_orders(params, progress, job_id):
+    """
+    Write order lines to a CSV file, walking orders in OrderID batches
+    The file is written under a temporary name and renamed once complete
+    """
+    conditions = []
+    if params.get('start_date'):
+        conditions.append(Order.SaleDate >= parse_date(params['start_date']))
+    if params.get('end_date'):
+        conditions.append(Order.SaleDate <= parse_date(params['end_date']))
+    
+    total = db.session.query(func.count(Order.OrderID)).filter(*conditions).scalar()
+    
+    filename = f"job-{job_id}-orders.csv"
+    path = export_path(filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    done = 0
+    rows = 0
+    last_id = None
+    try:
+        with open(path + '.part', 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(['OrderID', 'SaleDate', 'ItemID', 'ISBN', 'Quantity'])
+            
+            while True:
+                query = db.session.query(Order.OrderID).filter(*conditions)
+                if last_id is not None:
+                    query = query.filter(Order.OrderID > last_id)
+                order_ids = [order_id for (order_id,) in query.order_by(Order.OrderID).limit(EXPORT_BATCH_SIZE)]
+                if not order_ids:
+                    break
+                
+                lines = db.session.query(
+                    Order.OrderID, Order.SaleDate, OrderDetail.ItemID, OrderDetail.ISBN, OrderDetail.Quantity
+                ).join(
+                    OrderDetail, OrderDetail.OrderID == Order.OrderID
+                ).filter(
+                    Order.OrderID.in_(order_ids)
+                ).order_by(Order.OrderID, OrderDetail.ItemID)
+                
+                for order_id, sale_date, item_id, isbn, quantity in lines:
+                    writer.writerow([order_id, sale_date.isoformat() if sale_date else '', item_id, isbn, quantity])
+                    rows += 1
+                
+                last_id = order_ids[-1]
+                done += len(order_ids)
+                
+                # End the read transaction between batches, the export does not need one snapshot
+                db.session.rollback()
+                progress(done, total)
+        
+        os.replace(path + '.part', path)
+    finally:
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+    
+    return {'file': filename, 'rows': rows, 'orders': done}
+
+def validate_archive_orders(params):
+    """
+    before=YYYY-MM-DD or days=N (default ORDER_ARCHIVE_DAYS), orders sold before it are archived
+    """
+    try:
+        before = parse_date(params.get('before'))
+    except ValueError:
+        raise ValueError("Invalid date format. Expected YYYY-MM-DD")
+    
+    if before is None:
+        days = params.get('days')
+        if days is not None and (not isinstance(days, int) or days < 0):
+            raise ValueError("days must be a non-negative integer")
+        before = archive_cutoff(days)
+    
+    return {'before': before.isoformat()}
+
+def run_archive_orders(params, progress):
+    """
+    Move orders sold before params['before'] into the archive tables
+    Cancelling stops after the current batch, archived batches stay archived
+    """
+    return {'orders': archive_orders(parse_date(params['before']), progress=progress)}
+
+# validate(params) returns the cleaned params or raises ValueError
+# run(params, progress[, job_id]) returns a JSON-serializable result
+JobKind = namedtuple('JobKind', ['validate', 'run', 'needs_job_id'])
+
+JOB_KINDS = {
+    'rebuild': JobKind(validate_rebuild, run_rebuild, False),
+    'export_orders': JobKind(validate_export_orders, run_export_orders, True),
+    'archive_orders': JobKind(validate_archive_orders, run_archive_orders, False)
+}
+
+def enqueue_job(kind, params=None, created_by=None):
+    """
+    Validate params and insert a queued job, raises ValueError for bad input
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}'. Choose from: {', '.join(sorted(JOB_KINDS))}")
+    if params is not None and not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    
+    job = Job(
+        Kind=kind,
+        Params=json.dumps(JOB_KINDS[kind].validate(params or {})),
+        Status='queued',
+        CreatedBy=created_by
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    job_runner.wake()
+    return job
+
+def cancel_job(job_id):
+    """
+    Cancel a queued job at once, or ask a running one to stop at its next progress report
+    Returns the updated Job, or None if it does not exist
+    """
+    db.session.execute(
+        update(Job).where(Job.JobID == job_id, Job.Status == 'queued').values(
+            Status='cancelled', CancelRequested=True, FinishedAt=datetime.now()
+        )
+    )
+    db.session.execute(
+        update(Job).where(Job.JobID == job_id, Job.Status == 'running').values(CancelRequested=True)
+    )
+    db.session.commit()
+    return db.session.get(Job, job_id)
+
+class JobProgress:
+    """
+    Progress callback handed to a running job
+    Writes go through their own connection so they are visible while the job's
+    session transaction is still open, and are throttled to PROGRESS_INTERVAL_SECONDS
+    """
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self._last_write = 0.0
+    
+    def __call__(self, done, total=None, stage=None):
+        now = time.monotonic()
+        stage_changed = stage is not None and stage != self.stage
+        self.done = done
+        self.total = total
+        self.stage = stage or self.stage
+        if not stage_changed and now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_write = now
+        
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(Job).where(Job.JobID == self.job_id).values(
+                    Stage=self.stage, Progress=done, Total=total, HeartbeatAt=datetime.now()
+                )
+            )
+            cancel_requested = connection.execute(
+                select(Job.CancelRequested).where(Job.JobID == self.job_id)
+            ).scalar()
+        
+        if cancel_requested:
+            raise JobCancelled()
+
+class JobRunner:
+    """
+    Worker pool fed from the jobs table
+    A dispatcher thread claims queued jobs with a conditional UPDATE, so several
+    processes (the app and worker.py) can share one queue without a broker
+    """
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._app = None
+        self._workers = 0
+        self._executor = None
+        self._dispatcher = None
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+    
+    @property
+    def is_running(self):
+        return self._executor is not None
+    
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self.is_running,
+                "worker_id": self.worker_id,
+                "workers": self._workers,
+                "active": len(self._active)
+            }
+    
+    def start(self, app, workers):
+        """
+        Start the pool and the dispatcher thread in this process
+        """
+        if self._executor is not None:
+            return
+        
+        self._setup(app, workers)
+        self._dispatcher = threading.Thread(target=self._loop, name='job-dispatcher', daemon=True)
+        self._dispatcher.start()
+    
+    def run_forever(self, app, workers, once=False):
+        """
+        Run the dispatcher in the calling thread, used by worker.py
+        With once set, return when the queue is empty and no job is running
+        """
+        self._setup(app, workers)
+        try:
+            self._loop(once=once)
+        finally:
+            self.stop()
+    
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def wake(self):
+        self._wake.set()
+    
+    def _setup(self, app, workers):
+        self._app = app
+        self._workers = workers
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+    
+    def _loop(self, once=False):
+        poll_seconds = self._app.config['JOB_POLL_SECONDS']
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                with self._app.app_context():
+                    self._heartbeat()
+                    self._fail_stale_jobs()
+                    claimed = self._dispatch()
+            except Exception as e:
+                print(f"Job dispatcher error: {str(e)}")
+                claimed = 0
+            
+            if once and not claimed:
+                with self._lock:
+                    if not self._active:
+                        return
+            self._wake.wait(poll_seconds)
+    
+    def _dispatch(self):
+        with self._lock:
+            free = self._workers - len(self._active)
+        if free <= 0:
+            return 0
+        
+        claimed = 0
+        candidates = db.session.query(Job.JobID).filter(
+            Job.Status == 'queued'
+        ).order_by(Job.JobID).limit(free).all()
+        
+        for (job_id,) in candidates:
+            now = datetime.now()
+            result = db.session.execute(
+                update(Job).where(Job.JobID == job_id, Job.Status == 'queued').values(
+                    Status='running', WorkerID=self.worker_id, StartedAt=now, HeartbeatAt=now
+                )
+            )
+            db.session.commit()
+            
+            # Another worker got there first
+            if result.rowcount != 1:
+                continue
+            
+            with self._lock:
+                self._active.add(job_id)
+            self._executor.submit(self._run, job_id)
+            claimed += 1
+        
+        db.session.remove()
+        return claimed
+    
+    def _heartbeat(self):
+        with self._lock:
+            active = list(self._active)
+        if active:
+            db.session.execute(
+                update(Job).where(Job.JobID.in_(active)).values(HeartbeatAt=datetime.now())
+            )
+            db.session.commit()
+    
+    def _fail_stale_jobs(self):
+        """
+        Fail running jobs whose worker stopped sending heartbeats, e.g. after a crash
+        """
+        cutoff = datetime.now() - timedelta(seconds=self._app.config['JOB_STALE_SECONDS'])
+        db.session.execute(
+            update(Job).where(Job.Status == 'running', Job.HeartbeatAt < cutoff).values(
+                Status='failed', Error='Worker stopped responding', FinishedAt=datetime.now()
+            )
+        )
+        db.session.commit()
+    
+    def _run(self, job_id):
+        try:
+            with self._app.app_context():
+                self._execute(job_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+            self._wake.set()
+    
+    def _execute(self, job_id):
+        job = db.session.get(Job, job_id)
+        kind = JOB_KINDS.get(job.Kind)
+        params = json.loads(job.Params) if job.Params else {}
+        progress = JobProgress(job_id)
+        db.session.commit()
+        
+        values = {}
+        try:
+            if kind is None:
+                raise ValueError(f"Unknown job kind '{job.Kind}'")
+            progress(0, None)
+            result = kind.run(params, progress, job_id) if kind.needs_job_id else kind.run(params, progress)
+            values = {'Status': 'succeeded', 'Result': json.dumps(result)}
+        except JobCancelled:
+            db.session.rollback()
+            values = {'Status': 'cancelled'}
+        except Exception as e:
+            db.session.rollback()
+            values = {'Status': 'failed', 'Error': str(e)}
+        finally:
+            db.session.execute(
+                update(Job).where(Job.JobID == job_id, Job.Status == 'running').values(
+                    Stage=progress.stage, Progress=progress.done, Total=progress.total,
+                    FinishedAt=datetime.now(), **values
+                )
+            )
+            db.session.commit()
+            db.session.remove()
+
+job_runner = JobRunner()
@@ -0,0 +1,400 @@
+import glob
+import importlib.util
+import os
+import re
+import threading
+import time
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from models import db, SchemaMigration
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+class MigrationError(Exception):
+    pass
+
+class Migration:
+    """
+    One versioned migration file: migrations/NNNN_name.py with upgrade(op) and
+    optionally downgrade(op)
+    """
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        self._module = None
+    
+    @property
+    def module(self):
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"migrations.m{self.version:04d}_{self.name}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+    
+    @property
+    def description(self):
+        return (self.module.__doc__ or '').strip().splitlines()[0] if self.module.__doc__ else ''
+    
+    @property
+    def reversible(self):
+        return hasattr(self.module, 'downgrade')
+
+def discover(directory=MIGRATIONS_DIR):
+    """
+    Migrations in version order; versions must be unique
+    """
+    migrations = {}
+    for path in glob.glob(os.path.join(directory, '*.py')):
+        match = _FILENAME.match(os.path.basename(path))
+        if not match:
+            continue
+        
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version:04d}")
+        migrations[version] = Migration(version, match.group(2), path)
+    return [migrations[version] for version in sorted(migrations)]
+
+class Operations:
+    """
+    Schema operations for migrations, bound to the database being migrated
+    Every operation is idempotent (it checks the live schema first), so a
+    migration interrupted part way, e.g. by a MySQL DDL implicit commit, can be
+    run again. On MySQL indexes and columns are changed with online DDL
+    (ALGORITHM=INPLACE/INSTANT, LOCK=NONE): the statement fails rather than
+    blocking writes to the table, and InnoDB stage progress is reported while
+    an index builds
+    """
+    def __init__(self, engine, config, progress=None):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.config = config
+        self.batch_size = config['MIGRATION_BATCH_SIZE']
+        self.lock_wait = config['MIGRATION_LOCK_WAIT_SECONDS']
+        self.progress_interval = config['MIGRATION_PROGRESS_SECONDS']
+        self._progress = progress
+    
+    def report(self, stage, done=None, total=None):
+        if self._progress:
+            self._progress(stage, done, total)
+    
+    # Introspection
+    
+    def has_table(self, table):
+        return inspect(self.engine).has_table(_table_name(table))
+    
+    def has_column(self, table, column):
+        return any(c['name'] == column for c in inspect(self.engine).get_columns(_table_name(table)))
+    
+    def has_index(self, table, name):
+        return any(index['name'] == name for index in inspect(self.engine).get_indexes(_table_name(table)))
+    
+    # Tables
+    
+    def create_table(self, model):
+        """
+        Create a model's table with its indexes, if missing
+        """
+        table = model.__table__
+        if self.has_table(table.name):
+            return False
+        self.report(f"create table {table.name}")
+        table.create(self.engine)
+        return True
+    
+    def create_all(self):
+        """
+        Create every model table that is missing; existing tables are left as they are
+        """
+        for table in db.metadata.sorted_tables:
+            if not self.has_table(table.name):
+                self.report(f"create table {table.name}")
+                table.create(self.engine)
+    
+    def drop_table(self, model):
+        table = model.__table__
+        if self.has_table(table.name):
+            self.report(f"drop table {table.name}")
+            table.drop(self.engine)
+    
+    # Columns
+    
+    def add_column(self, column):
+        """
+        Add a model column (e.g. OrderDetail.__table__.c.SaleDate) to its table
+        The column must be nullable or have a server default to be added online
+        """
+        table = column.table.name
+        if self.has_column(table, column.name):
+            return False
+        
+        definition = str(CreateColumn(column).compile(dialect=self.engine.dialect)).strip()
+        self.report(f"add column {table}.{column.name}")
+        if self.dialect == 'mysql':
+            # INSTANT only touches the data dictionary (8.0.12+); INPLACE rebuilds without blocking writes
+            try:
+                self._ddl(f"ALTER TABLE {table} ADD COLUMN {definition}, ALGORITHM=INSTANT")
+            except Exception:
+                self._tracked_ddl(f"ALTER TABLE {table} ADD COLUMN {definition}, ALGORITHM=INPLACE, LOCK=NONE", table)
+        else:
+            self._ddl(f"ALTER TABLE {table} ADD COLUMN {definition}")
+        return True
+    
+    def drop_column(self, table, column):
+        table = _table_name(table)
+        if not self.has_column(table, column):
+            return False
+        
+        self.report(f"drop column {table}.{column}")
+        if self.dialect == 'mysql':
+            self._tracked_ddl(f"ALTER TABLE {table} DROP COLUMN {column}, ALGORITHM=INPLACE, LOCK=NONE", table)
+        else:
+            self._ddl(f"ALTER TABLE {table} DROP COLUMN {column}")
+        return True
+    
+    # Indexes
+    
+    def create_index(self, table, name, columns, unique=False):
+        """
+        Build an index without blocking writes (MySQL) if no index has that name
+        """
+        table = _table_name(table)
+        if self.has_index(table, name):
+            return False
+        
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        self.report(f"create index {name} on {table}({', '.join(columns)})")
+        if self.dialect == 'mysql':
+            self._tracked_ddl(f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE", table)
+        else:
+            self._ddl(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+        return True
+    
+    def drop_index(self, table, name):
+        table = _table_name(table)
+        if not self.has_index(table, name):
+            return False
+        
+        self.report(f"drop index {name} on {table}")
+        if self.dialect == 'mysql':
+            self._ddl(f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE")
+        else:
+            self._ddl(f"DROP INDEX {name}")
+        return True
+    
+    # Tables too large for a plain ALTER to go unnoticed
+    
+    def alter_table(self, table, specification):
+        """
+        Run ALTER TABLE <table> <specification> with progress reports on MySQL
+        For changes MySQL cannot make online (e.g. PARTITION BY), which copy
+        the table and block writes while they run
+        """
+        table = _table_name(table)
+        self.report(f"alter table {table}: {specification[:80]}")
+        if self.dialect == 'mysql':
+            self._tracked_ddl(f"ALTER TABLE {table} {specification}", table)
+        else:
+            self._ddl(f"ALTER TABLE {table} {specification}")
+    
+    def foreign_keys(self):
+        """
+        (table, constraint name, referred table) of every named foreign key
+        """
+        inspector = inspect(self.engine)
+        return [
+            (table, key['name'], key['referred_table'])
+            for table in inspector.get_table_names()
+            for key in inspector.get_foreign_keys(table) if key.get('name')
+        ]
+    
+    def drop_foreign_key(self, table, name):
+        if self.dialect != 'mysql':
+            raise MigrationError(f"Dropping foreign key {name} is only supported on MySQL")
+        self.report(f"drop foreign key {name} on {table}")
+        self._ddl(f"ALTER TABLE {table} DROP FOREIGN KEY {name}")
+    
+    # Data
+    
+    def backfill(self, table, key, update, where=None, params=None):
+        """
+        Run an UPDATE over the table in batches of about MIGRATION_BATCH_SIZE rows
+        by an indexed key column (e.g. the leading primary key column), committing
+        each batch, so locks stay short and progress is reported as it goes
+        update is the SET clause, where an optional extra condition, e.g.
+            op.backfill('orderdetails', 'OrderID', "SaleDate = (SELECT ...)", where="SaleDate IS NULL")
+        Batches are bounded by key value ranges: "key > :after AND key <= :upto"
+        """
+        table = _table_name(table)
+        condition = f" AND ({where})" if where else ''
+        params = params or {}
+        
+        with self.engine.connect() as connection:
+            total = connection.execute(text(f"SELECT COUNT(*) FROM {table} WHERE 1=1{condition}"), params).scalar()
+        if not total:
+            return 0
+        
+        done = 0
+        after = None
+        self.report(f"backfill {table}", 0, total)
+        while True:
+            with self.engine.begin() as connection:
+                bound = f"{key} > :after" if after is not None else "1=1"
+                upto = connection.execute(text(
+                    f"SELECT MAX({key}) FROM (SELECT {key} FROM {table} WHERE {bound} ORDER BY {key} LIMIT :limit) batch"
+                ), {'after': after, 'limit': self.batch_size}).scalar()
+                if upto is None:
+                    break
+                
+                result = connection.execute(
+                    text(f"UPDATE {table} SET {update} WHERE {bound} AND {key} <= :upto{condition}"),
+                    {**params, 'after': after, 'upto': upto}
+                )
+                done += result.rowcount
+            
+            after = upto
+            self.report(f"backfill {table}", min(done, total), total)
+        return done
+    
+    def execute(self, sql, params=None):
+        with self.engine.begin() as connection:
+            return connection.execute(text(sql), params or {})
+    
+    # DDL execution
+    
+    def _ddl(self, sql):
+        with self.engine.begin() as connection:
+            if self.dialect == 'mysql':
+                # Give up quickly instead of queueing every later query behind a metadata lock
+                connection.exec_driver_sql(f"SET SESSION lock_wait_timeout = {int(self.lock_wait)}")
+            connection.exec_driver_sql(sql)
+    
+    def _tracked_ddl(self, sql, table):
+        """
+        Run a MySQL ALTER in a thread and report its stage progress (InnoDB
+        online build or table copy) from performance_schema while it runs (when stage instrumentation is enabled,
+        else only the elapsed time)
+        """
+        outcome = {}
+        
+        def run():
+            try:
+                self._ddl(sql)
+            except Exception as e:
+                outcome['error'] = e
+        
+        worker = threading.Thread(target=run, name='online-ddl', daemon=True)
+        started = time.monotonic()
+        worker.start()
+        
+        while worker.is_alive():
+            worker.join(self.progress_interval)
+            if not worker.is_alive():
+                break
+            
+            stage = self._innodb_stage()
+            if stage is not None:
+                name, done, total = stage
+                self.report(f"{table}: {name}", done, total)
+            else:
+                self.report(f"{table}: {int(time.monotonic() - started)}s elapsed")
+        
+        if 'error' in outcome:
+            raise outcome['error']
+    
+    def _innodb_stage(self):
+        try:
+            with self.engine.connect() as connection:
+                row = connection.exec_driver_sql(
+                    "SELECT EVENT_NAME, WORK_COMPLETED, WORK_ESTIMATED "
+                    "FROM performance_schema.events_stages_current "
+                    "WHERE EVENT_NAME LIKE 'stage/innodb/alter%%' OR EVENT_NAME = 'stage/sql/copy to tmp table' LIMIT 1"
+                ).first()
+        except Exception:
+            return None
+        if row is None:
+            return None
+        return row[0].rsplit('/', 1)[-1], row[1], row[2]
+
+def _table_name(table):
+    if isinstance(table, str):
+        return table
+    return getattr(table, '__tablename__', None) or table.name
+
+class MigrationRunner:
+    """
+    Applies pending migrations in version order and records each one in
+    schema_migrations once its upgrade completes
+    """
+    def __init__(self, app, directory=MIGRATIONS_DIR, progress=None):
+        self.app = app
+        self.directory = directory
+        self.progress = progress
+    
+    def _operations(self):
+        return Operations(db.engine, self.app.config, self.progress)
+    
+    def applied(self):
+        """
+        {version: SchemaMigration} of the applied migrations
+        """
+        SchemaMigration.__table__.create(db.engine, checkfirst=True)
+        return {row.Version: row for row in SchemaMigration.query.all()}
+    
+    def status(self):
+        applied = self.applied()
+        return [(migration, applied.get(migration.version)) for migration in discover(self.directory)]
+    
+    def pending(self, target=None):
+        applied = self.applied()
+        return [
+            migration for migration in discover(self.directory)
+            if migration.version not in applied and (target is None or migration.version <= target)
+        ]
+    
+    def upgrade(self, target=None):
+        """
+        Apply pending migrations up to target (default: all), returns those applied
+        """
+        done = []
+        for migration in self.pending(target):
+            if self.progress:
+                self.progress(f"upgrade {migration.version:04d}_{migration.name}", None, None)
+            
+            started = time.perf_counter()
+            migration.module.upgrade(self._operations())
+            db.session.add(SchemaMigration(
+                Version=migration.version,
+                Name=migration.name,
+                DurationMs=int((time.perf_counter() - started) * 1000)
+            ))
+            db.session.commit()
+            done.append(migration)
+        return done
+    
+    def downgrade(self, target):
+        """
+        Revert applied migrations newer than target, newest first
+        """
+        applied = self.applied()
+        migrations = [
+            migration for migration in reversed(discover(self.directory))
+            if migration.version in applied and migration.version > target
+        ]
+        irreversible = [migration for migration in migrations if not migration.reversible]
+        if irreversible:
+            raise MigrationError(f"Migration {irreversible[0].version:04d}_{irreversible[0].name} cannot be reverted")
+        
+        done = []
+        for migration in migrations:
+            if self.progress:
+                self.progress(f"downgrade {migration.version:04d}_{migration.name}", None, None)
+            
+            migration.module.downgrade(self._operations())
+            db.session.delete(applied[migration.version])
+            db.session.commit()
+            done.append(migration)
+        return done
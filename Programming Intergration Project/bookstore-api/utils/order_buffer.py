@@ -0,0 +1,418 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError
+from models import db, Order, OrderDetail, OrderArchive, OrderKey, Edition
+from utils.bulk import chunked, existing_keys
+from utils.catalog import catalog
+from utils.order_search import sync_orders
+from utils.revenue import sync_daily_revenue
+from utils.sales_cube import sales_cube
+from utils.suggest import suggest_index
+
+# Rejected orders remembered for status lookups
+REJECTED_KEEP = 10000
+
+SEGMENT_PATTERN = 'orders-*.jsonl'
+
+# Each process spools into its own <ORDER_SPOOL_DIR>/worker-<pid>-<ns> directory,
+# holding an exclusive lock on its LOCK_FILE while it runs
+WORKER_DIR_PATTERN = 'worker-*'
+LOCK_FILE = '.lock'
+
+# Errors that say nothing about the order itself (database down, lost
+# connection, deadlock): the segment is kept and retried on the next tick
+RETRYABLE_ERRORS = (OperationalError, InterfaceError)
+
+try:
+    import fcntl
+    
+    def _try_lock(handle):
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+except ImportError:
+    import msvcrt
+    
+    def _try_lock(handle):
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+class OrderBuffer:
+    """
+    Write-behind buffer for create_order
+    Accepted orders are appended to a local spool segment (fsync'd before the
+    client is answered) and queued in memory; a flusher thread writes them to
+    the database in multi-row INSERTs every ORDER_FLUSH_MS or every
+    ORDER_FLUSH_BATCH orders. A segment is only deleted once all of its orders
+    are committed, and segments left behind by a crash are replayed on start
+    Processes sharing ORDER_SPOOL_DIR each write to a locked directory of their
+    own and only adopt the segments of directories whose lock is free, i.e.
+    whose process has exited
+    """
+    def __init__(self):
+        self._app = None
+        self._dir = None
+        self._dir_lock = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopping = False
+        
+        self._segment = None
+        self._segment_path = None
+        self._queue = []
+        # (segment path, orders, recovered) waiting to be written, oldest first
+        self._sealed = []
+        self._pending = {}
+        self._rejected = OrderedDict()
+        
+        self._isbns = None
+        self._isbns_version = None
+        
+        self.flushed = 0
+        self.flushes = 0
+        self.last_flush_ms = None
+        self.last_error = None
+    
+    @property
+    def is_running(self):
+        return self._thread is not None
+    
+    # Lifecycle
+    
+    def start(self, app):
+        """
+        Replay leftover spool segments and start the flusher thread
+        """
+        if self._thread is not None:
+            return
+        
+        self._app = app
+        self._stopping = False
+        self._claim_dir()
+        self._recover()
+        self._open_segment()
+        
+        self._thread = threading.Thread(target=self._loop, name='order-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+    
+    def stop(self):
+        """
+        Stop the flusher after a final flush; anything left stays in the spool
+        """
+        if self._thread is None:
+            return
+        
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        
+        # Whatever is left in the directory is adopted by the next process to start
+        self._segment.close()
+        self._dir_lock.close()
+    
+    def _spool_dir(self):
+        directory = self._app.config['ORDER_SPOOL_DIR']
+        if not os.path.isabs(directory):
+            directory = os.path.join(self._app.root_path, directory)
+        return directory
+    
+    def _claim_dir(self):
+        """
+        Create and lock this process's own spool directory
+        """
+        self._dir = os.path.join(self._spool_dir(), f"worker-{os.getpid()}-{time.time_ns()}")
+        os.makedirs(self._dir)
+        self._dir_lock = open(os.path.join(self._dir, LOCK_FILE), 'a+')
+        if not _try_lock(self._dir_lock):
+            raise RuntimeError(f"Cannot lock spool directory {self._dir}")
+    
+    def _open_segment(self):
+        # Nanosecond names keep segments in write order
+        self._segment_path = os.path.join(self._dir, f"orders-{time.time_ns()}.jsonl")
+        self._segment = open(self._segment_path, 'a', encoding='utf-8')
+    
+    def _adopt(self, directory):
+        """
+        Move the segments of a spool directory into our own
+        Segments another process moved first are skipped
+        """
+        for path in glob.glob(os.path.join(directory, SEGMENT_PATTERN)):
+            try:
+                os.replace(path, os.path.join(self._dir, os.path.basename(path)))
+            except FileNotFoundError:
+                pass
+    
+    def _recover(self):
+        """
+        Queue the orders of segments left by exited processes: directories
+        whose lock can be taken, plus segments of the former flat layout
+        A torn last line was never fsync'd, so its order was never acknowledged
+        """
+        self._adopt(self._spool_dir())
+        for directory in glob.glob(os.path.join(self._spool_dir(), WORKER_DIR_PATTERN)):
+            if directory == self._dir:
+                continue
+            try:
+                lock = open(os.path.join(directory, LOCK_FILE), 'a+')
+            except FileNotFoundError:
+                continue
+            with lock:
+                if not _try_lock(lock):
+                    # Owned by a running process
+                    continue
+                self._adopt(directory)
+                try:
+                    os.remove(os.path.join(directory, LOCK_FILE))
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+        
+        for path in sorted(glob.glob(os.path.join(self._dir, SEGMENT_PATTERN)), key=os.path.basename):
+            orders = []
+            with open(path, encoding='utf-8') as segment:
+                for line in segment:
+                    try:
+                        orders.append(json.loads(line))
+                    except ValueError:
+                        break
+            
+            for order in orders:
+                self._pending[order['OrderID']] = order
+            self._sealed.append((path, orders, True))
+    
+    # Accepting orders
+    
+    def known_isbns(self):
+        """
+        ISBNs of the catalog, from the catalog snapshot when it is enabled,
+        else from a set reloaded whenever the catalog version changes
+        """
+        snapshot = catalog.get()
+        if snapshot is not None:
+            return snapshot.editions
+        
+        if self._isbns is None or self._isbns_version != catalog.version:
+            version = catalog.version
+            self._isbns = set(db.session.execute(select(Edition.ISBN)).scalars())
+            self._isbns_version = version
+        return self._isbns
+    
+    def is_pending(self, order_id):
+        return order_id in self._pending
+    
+    def submit(self, order):
+        """
+        Spool and queue a validated order, returns once it is durable
+        order is {"OrderID", "SaleDate" (YYYY-MM-DD), "items": [{"ItemID", "ISBN", "Quantity"}]}
+        Raises ValueError if the OrderID is already waiting to be written
+        """
+        order = dict(order, AcceptedAt=datetime.now().isoformat())
+        line = json.dumps(order) + '\n'
+        
+        with self._lock:
+            if order['OrderID'] in self._pending:
+                raise ValueError(f"Order {order['OrderID']} is already pending")
+            
+            self._segment.write(line)
+            self._segment.flush()
+            if self._app.config['ORDER_SPOOL_FSYNC']:
+                os.fsync(self._segment.fileno())
+            
+            self._rejected.pop(order['OrderID'], None)
+            self._pending[order['OrderID']] = order
+            self._queue.append(order)
+            queued = len(self._queue)
+        
+        if queued >= self._app.config['ORDER_FLUSH_BATCH']:
+            self._wake.set()
+        return order
+    
+    def status(self, order_id):
+        """
+        ('pending', order), ('rejected', reason) or (None, None) once written or unknown
+        """
+        order = self._pending.get(order_id)
+        if order is not None:
+            return 'pending', order
+        
+        reason = self._rejected.get(order_id)
+        if reason is not None:
+            return 'rejected', reason
+        return None, None
+    
+    # Flushing
+    
+    def _loop(self):
+        interval = self._app.config['ORDER_FLUSH_MS'] / 1000
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            stopping = self._stopping
+            
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                # Database unavailable: keep the segments and retry on the next tick
+                self.last_error = str(e)
+                print(f"Order write-behind flush failed: {str(e)}")
+                if stopping:
+                    return
+                time.sleep(interval)
+            
+            if stopping:
+                return
+    
+    def flush(self):
+        """
+        Seal the current segment and write every sealed segment, oldest first
+        Requires an app context
+        """
+        with self._lock:
+            if self._queue:
+                self._segment.close()
+                self._sealed.append((self._segment_path, self._queue, False))
+                self._queue = []
+                self._open_segment()
+        
+        while self._sealed:
+            path, orders, recovered = self._sealed[0]
+            started = time.perf_counter()
+            
+            try:
+                self._write(orders, recovered)
+            except Exception:
+                # Part of the segment may be committed, retry it like a replay
+                self._sealed[0] = (path, orders, True)
+                raise
+            
+            os.remove(path)
+            self._sealed.pop(0)
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.last_error = None
+    
+    def _write(self, orders, recovered):
+        """
+        Write orders in ORDER_FLUSH_BATCH chunks of multi-row INSERTs
+        OrderIDs already in the database are rejected, except when replaying a
+        segment, where they were written just before the crash
+        A chunk the database refuses is retried order by order so only the
+        offending orders are rejected (constraint, data or statement errors);
+        connection-level errors propagate and the segment is retried
+        """
+        malformed = [order for order in orders if not isinstance(order.get('OrderID'), str)]
+        for order in malformed:
+            self._reject(order.get('OrderID'), "Malformed OrderID")
+        orders = [order for order in orders if isinstance(order.get('OrderID'), str)]
+        
+        # Archived OrderIDs stay taken, as in create_order
+        order_ids = [order['OrderID'] for order in orders]
+        existing = existing_keys(Order.OrderID, order_ids)
+        archived = existing_keys(OrderArchive.OrderID, order_ids)
+        fresh = []
+        for order in orders:
+            if order['OrderID'] in archived:
+                self._reject(order['OrderID'], "OrderID already exists")
+            elif order['OrderID'] not in existing:
+                fresh.append(order)
+            elif recovered:
+                self._settle(order['OrderID'])
+            else:
+                self._reject(order['OrderID'], "OrderID already exists")
+        db.session.rollback()
+        
+        for chunk in chunked(fresh, self._app.config['ORDER_FLUSH_BATCH']):
+            try:
+                self._insert(chunk)
+                written = chunk
+            except RETRYABLE_ERRORS:
+                raise
+            except (SQLAlchemyError, ValueError, TypeError, KeyError):
+                db.session.rollback()
+                written = []
+                for order in chunk:
+                    try:
+                        self._insert([order])
+                        written.append(order)
+                    except RETRYABLE_ERRORS:
+                        raise
+                    except (SQLAlchemyError, ValueError, TypeError, KeyError) as e:
+                        db.session.rollback()
+                        self._reject(order['OrderID'], f"Error creating order: {str(getattr(e, 'orig', None) or e)}")
+            
+            order_ids = [order['OrderID'] for order in written]
+            for order in written:
+                suggest_index.put_order(order['OrderID'], order['SaleDate'])
+            sales_cube.append_orders(order_ids)
+            db.session.rollback()
+            
+            for order_id in order_ids:
+                self._settle(order_id)
+            self.flushed += len(order_ids)
+    
+    def _insert(self, orders):
+        order_ids = [order['OrderID'] for order in orders]
+        order_rows = [
+            {"OrderID": order['OrderID'], "SaleDate": datetime.strptime(order['SaleDate'], '%Y-%m-%d').date()}
+            for order in orders
+        ]
+        detail_rows = [
+            {"OrderID": row['OrderID'], "SaleDate": row['SaleDate'], **item}
+            for order, row in zip(orders, order_rows) for item in order['items']
+        ]
+        
+        # order_ids' primary key rejects duplicate OrderIDs atomically
+        db.session.execute(insert(OrderKey), [{"OrderID": order_id} for order_id in order_ids])
+        db.session.execute(insert(Order), order_rows)
+        if detail_rows:
+            db.session.execute(insert(OrderDetail), detail_rows)
+        sync_orders(order_ids)
+        sync_daily_revenue(order_ids)
+        db.session.commit()
+    
+    def _settle(self, order_id):
+        with self._lock:
+            self._pending.pop(order_id, None)
+    
+    def _reject(self, order_id, reason):
+        print(f"Order {order_id} rejected by write-behind flush: {reason}")
+        if not isinstance(order_id, str):
+            return
+        with self._lock:
+            self._pending.pop(order_id, None)
+            self._rejected[order_id] = reason
+            while len(self._rejected) > REJECTED_KEEP:
+                self._rejected.popitem(last=False)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self.is_running,
+                "queued": len(self._queue),
+                "sealed_segments": len(self._sealed),
+                "pending": len(self._pending),
+                "rejected": len(self._rejected),
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "last_error": self.last_error
+            }
+
+# Shared per-process buffer, started by create_app when ORDER_WRITE_BEHIND is on
+order_buffer = OrderBuffer()
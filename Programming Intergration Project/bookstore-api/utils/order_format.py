@@ -0,0 +1,161 @@
+from utils.catalog import catalog
+
+RESPONSE_FORMATS = ('full', 'compact')
+
+# Types that fields[<type>]=a,b,c can narrow
+FIELD_TYPES = ('orders', 'lines', 'books', 'authors', 'editions')
+
+# Side-loaded maps of the compact format
+INCLUDE_TYPES = ('books', 'authors', 'editions')
+
+def _select(data, fields):
+    if data is None or not fields:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+class OrderSerializer:
+    """
+    Order serialization for the order list endpoints
+    format=full (default) keeps the Order.to_dict shape, every line embedding
+    its extended book; format=compact gives lines with BookID only and side-loads
+    each book, author and edition once in an "included" section keyed by ID
+    fields[orders], fields[lines], fields[books], fields[authors] and
+    fields[editions] narrow each object to the listed keys in both formats
+    """
+    def __init__(self, response_format='full', fields=None, include=INCLUDE_TYPES):
+        self.format = response_format
+        self.fields = fields or {}
+        self.include = include
+        self.snapshot = catalog.get()
+        self.books = {}
+        self.authors = {}
+        self.editions = {}
+        # ISBN -> (BookID, Price), whatever fields[editions] keeps
+        self._edition_refs = {}
+    
+    @classmethod
+    def from_request(cls, args):
+        """
+        Build from the query string, raises ValueError for bad parameters
+        """
+        response_format = args.get('format', 'full')
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Invalid format. Choose from: {', '.join(RESPONSE_FORMATS)}")
+        
+        fields = {}
+        for key, value in args.items():
+            if not key.startswith('fields[') or not key.endswith(']'):
+                continue
+            field_type = key[len('fields['):-1]
+            if field_type not in FIELD_TYPES:
+                raise ValueError(f"Invalid fields type '{field_type}'. Choose from: {', '.join(FIELD_TYPES)}")
+            fields[field_type] = {name.strip() for name in value.split(',') if name.strip()}
+        
+        include = INCLUDE_TYPES
+        if 'include' in args:
+            include = tuple(name.strip() for name in args['include'].split(',') if name.strip())
+            invalid = [name for name in include if name not in INCLUDE_TYPES]
+            if invalid:
+                raise ValueError(f"Invalid include: {', '.join(invalid)}. Choose from: {', '.join(INCLUDE_TYPES)}")
+        
+        return cls(response_format, fields, include)
+    
+    @property
+    def needs_catalog_rows(self):
+        """
+        Whether the ORM has to load editions and books, i.e. no snapshot to read them from
+        """
+        return self.snapshot is None
+    
+    def order(self, order):
+        if self.format == 'full':
+            data = order.to_dict()
+            data['OrderDetails'] = [self._full_line(line) for line in data['OrderDetails']]
+        else:
+            data = {
+                'OrderID': order.OrderID,
+                'SaleDate': order.SaleDate.isoformat() if order.SaleDate else None,
+                'OrderDetails': [self._compact_line(detail) for detail in order.order_details]
+            }
+        return _select(data, self.fields.get('orders'))
+    
+    def included(self):
+        """
+        Extra top-level keys for the response: the side-loaded maps in compact format
+        """
+        if self.format != 'compact':
+            return {}
+        
+        maps = {'books': self.books, 'authors': self.authors, 'editions': self.editions}
+        return {"included": {name: maps[name] for name in self.include}}
+    
+    # Full format
+    
+    def _full_line(self, line):
+        book = line.get('Book')
+        if book is not None and self.fields:
+            book = _select(book, self.fields.get('books'))
+            if book.get('Author') is not None:
+                book['Author'] = _select(book['Author'], self.fields.get('authors'))
+            if book.get('Editions') is not None:
+                book['Editions'] = [_select(edition, self.fields.get('editions')) for edition in book['Editions']]
+            line = dict(line, Book=book)
+        return _select(line, self.fields.get('lines'))
+    
+    # Compact format
+    
+    def _compact_line(self, detail):
+        book_id, price = self._edition_ref(detail)
+        if book_id is not None and book_id not in self.books:
+            self._add_book(book_id, detail)
+        
+        return _select({
+            'ItemID': detail.ItemID,
+            'ISBN': detail.ISBN,
+            'Quantity': detail.Quantity,
+            'Price': price,
+            'BookID': book_id
+        }, self.fields.get('lines'))
+    
+    def _edition_ref(self, detail):
+        """
+        (BookID, Price) of the line's edition, recording the edition in the editions map
+        """
+        if detail.ISBN in self._edition_refs:
+            return self._edition_refs[detail.ISBN]
+        
+        if self.snapshot is not None and detail.ISBN in self.snapshot.editions:
+            edition = self.snapshot.editions[detail.ISBN].to_dict()
+        elif detail.ISBN is not None and detail.edition is not None:
+            edition = detail.edition.to_dict()
+        else:
+            return None, None
+        
+        self.editions[detail.ISBN] = _select(edition, self.fields.get('editions'))
+        self._edition_refs[detail.ISBN] = (edition['BookID'], edition['Price'])
+        return self._edition_refs[detail.ISBN]
+    
+    def _add_book(self, book_id, detail):
+        if self.snapshot is not None and book_id in self.snapshot.books:
+            record = self.snapshot.books[book_id]
+            book = {
+                **record.to_dict(),
+                'Info': record.info.to_dict() if record.info else None,
+                'ISBNs': list(record.isbns)
+            }
+            author = self.snapshot.authors.get(record.AuthID)
+            author = author.to_dict() if author else None
+        else:
+            model = detail.edition.book if detail.edition else None
+            if model is None:
+                return
+            book = {
+                **model.to_dict(),
+                'Info': model.info.to_dict() if model.info else None,
+                'ISBNs': [edition.ISBN for edition in model.editions]
+            }
+            author = model.author.to_dict() if model.author else None
+        
+        self.books[book_id] = _select(book, self.fields.get('books'))
+        if author is not None and author['AuthID'] not in self.authors:
+            self.authors[author['AuthID']] = _select(author, self.fields.get('authors'))
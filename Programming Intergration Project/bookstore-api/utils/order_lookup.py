@@ -0,0 +1,98 @@
+from sqlalchemy import and_, text
+from models import db, Order
+
+# Lookup strategies, picked from the shape of the search term
+EXACT = 'exact'
+PREFIX = 'prefix'
+CONTAINS = 'contains'
+
+# Shortest term the ngram parser indexes (MySQL ngram_token_size default)
+NGRAM_TOKEN_SIZE = 2
+
+def choose_strategy(term):
+    """
+    Pick how an OrderID search term is matched:
+      =ORD-1001 or "ORD-1001"  -> exact primary key lookup
+      *1001 or *1001*          -> substring match
+      ORD-10 or ORD-10*        -> prefix range scan (the default, since
+                                  staff almost always type the start of an ID)
+    Returns the strategy and the bare term
+    """
+    term = term.strip()
+    
+    if term.startswith('='):
+        return EXACT, term[1:].strip()
+    if len(term) > 1 and term.startswith('"') and term.endswith('"'):
+        return EXACT, term[1:-1]
+    if term.startswith('*'):
+        return CONTAINS, term.strip('*')
+    return PREFIX, term.rstrip('*')
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _prefix_upper_bound(prefix):
+    """
+    Smallest string greater than every string starting with prefix
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _is_mysql():
+    return db.session.get_bind().dialect.name == 'mysql'
+
+# Engine URL -> whether Orders has the ngram FULLTEXT index, checked once per process
+_fulltext = {}
+
+def _has_fulltext_index():
+    """
+    Partitioning Orders (migration 0004) drops the FULLTEXT index, which
+    partitioned tables cannot have; substring search then falls back to LIKE
+    """
+    bind = db.session.get_bind()
+    key = str(bind.url)
+    if key not in _fulltext:
+        _fulltext[key] = db.session.execute(text(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = 'orders' AND INDEX_TYPE = 'FULLTEXT'"
+        )).scalar() > 0
+    return _fulltext[key]
+
+def order_id_filter(column, term, use_fulltext=True):
+    """
+    Build the filter expression for an OrderID search against column
+    (Order.OrderID, OrderSearch.OrderID, ...)
+    Exact and prefix lookups are plain comparisons that use the primary key
+    on MySQL and SQLite alike; substring search uses the ngram FULLTEXT
+    index on MySQL when the table has it and falls back to LIKE elsewhere;
+    pass use_fulltext=False for columns outside Orders/order_search (the archive)
+    Returns (strategy, expression), expression is None for an empty term
+    """
+    strategy, value = choose_strategy(term)
+    
+    if not value:
+        return strategy, None
+    
+    if strategy == EXACT:
+        return strategy, column == value
+    
+    if strategy == PREFIX:
+        # The range keeps the scan on the index, LIKE keeps it exact under
+        # case-insensitive collations
+        return strategy, and_(
+            column >= value,
+            column < _prefix_upper_bound(value),
+            column.like(f'{_escape_like(value)}%', escape='\\')
+        )
+    
+    substring = column.like(f'%{_escape_like(value)}%', escape='\\')
+    if use_fulltext and _is_mysql() and len(value) >= NGRAM_TOKEN_SIZE and _has_fulltext_index():
+        # Phrase search over the ngram index narrows the candidates, the
+        # LIKE re-check drops ngram false positives
+        candidates = db.session.query(Order.OrderID).filter(
+            text("MATCH(Orders.OrderID) AGAINST(:phrase IN BOOLEAN MODE)").bindparams(
+                phrase='"' + value.replace('"', '') + '"'
+            )
+        )
+        return strategy, and_(column.in_(candidates), substring)
+    
+    return strategy, substring
@@ -0,0 +1,145 @@
+from sqlalchemy import func, insert, select
+from models import db, Order, OrderDetail, Edition, Book, Author, OrderSearch
+
+# Orders copied per statement when rebuilding the whole read model
+REBUILD_BATCH_SIZE = 5000
+
+SEARCH_COLUMNS = [
+    OrderSearch.OrderID,
+    OrderSearch.ItemID,
+    OrderSearch.SaleDate,
+    OrderSearch.ISBN,
+    OrderSearch.BookID,
+    OrderSearch.TitleLower,
+    OrderSearch.LastNameLower,
+    OrderSearch.Quantity,
+    OrderSearch.Price
+]
+
+def _source_select(condition):
+    """
+    Build the OrderDetails -> Orders -> Edition -> Book -> Author join
+    that produces order_search rows for the lines matching condition
+    """
+    return select(
+        OrderDetail.OrderID,
+        OrderDetail.ItemID,
+        Order.SaleDate,
+        OrderDetail.ISBN,
+        Edition.BookID,
+        func.lower(Book.Title),
+        func.lower(Author.LastName),
+        OrderDetail.Quantity,
+        Edition.Price
+    ).select_from(
+        OrderDetail
+    ).join(
+        Order, OrderDetail.OrderID == Order.OrderID
+    ).outerjoin(
+        Edition, OrderDetail.ISBN == Edition.ISBN
+    ).outerjoin(
+        Book, Edition.BookID == Book.BookID
+    ).outerjoin(
+        Author, Book.AuthID == Author.AuthID
+    ).where(condition)
+
+def _copy_rows(condition):
+    """
+    Copy the matching lines into order_search with one INSERT ... SELECT
+    """
+    db.session.execute(
+        insert(OrderSearch).from_select(
+            [column.key for column in SEARCH_COLUMNS],
+            _source_select(condition)
+        )
+    )
+
+def sync_orders(order_ids):
+    """
+    Re-derive the order_search rows of the given orders
+    Call inside the write transaction, after the order lines are flushed
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+    
+    db.session.flush()
+    OrderSearch.query.filter(
+        OrderSearch.OrderID.in_(order_ids)
+    ).delete(synchronize_session=False)
+    _copy_rows(OrderDetail.OrderID.in_(order_ids))
+
+def sync_books(book_ids):
+    """
+    Re-derive the order_search rows of every line selling the given books
+    Used when a title, author or the book itself changes
+    """
+    book_ids = list(book_ids)
+    if not book_ids:
+        return
+    
+    db.session.flush()
+    OrderSearch.query.filter(
+        OrderSearch.BookID.in_(book_ids)
+    ).delete(synchronize_session=False)
+    _copy_rows(Edition.BookID.in_(book_ids))
+
+def sync_author(auth_id):
+    """
+    Re-derive the order_search rows of every book written by an author
+    """
+    sync_authors([auth_id])
+
+def sync_authors(auth_ids):
+    """
+    Re-derive the order_search rows of every book written by the given authors
+    """
+    auth_ids = list(auth_ids)
+    if not auth_ids:
+        return
+    
+    db.session.flush()
+    book_ids = [book_id for (book_id,) in db.session.query(Book.BookID).filter(Book.AuthID.in_(auth_ids))]
+    sync_books(book_ids)
+
+def rebuild_order_search(progress=None):
+    """
+    Rebuild the whole read model from the normalized tables
+    Orders are copied in keyset-paginated batches so no single statement
+    has to hold the full join; returns the number of rows written
+    Everything runs in one transaction: readers keep seeing the old rows
+    until the commit, order writes that sync rows wait for it instead of
+    being lost, and a failed or cancelled rebuild rolls back to the old table
+    SQLite has a single writer, so there progress is only reported after the
+    commit: a progress write from another connection (utils.jobs.JobProgress)
+    would wait on this transaction until it fails with "database is locked"
+    """
+    report = progress if db.engine.dialect.name != 'sqlite' else None
+    
+    OrderSearch.query.delete(synchronize_session=False)
+    
+    total_orders = db.session.query(func.count(Order.OrderID)).scalar() or 0
+    copied_orders = 0
+    last_order_id = None
+    
+    while True:
+        batch_query = db.session.query(Order.OrderID).order_by(Order.OrderID)
+        if last_order_id is not None:
+            batch_query = batch_query.filter(Order.OrderID > last_order_id)
+        order_ids = [order_id for (order_id,) in batch_query.limit(REBUILD_BATCH_SIZE)]
+        
+        if not order_ids:
+            break
+        
+        _copy_rows(OrderDetail.OrderID.between(order_ids[0], order_ids[-1]))
+        
+        copied_orders += len(order_ids)
+        last_order_id = order_ids[-1]
+        if report:
+            report(copied_orders, total_orders)
+    
+    rows = db.session.query(func.count()).select_from(OrderSearch).scalar()
+    db.session.commit()
+    if progress and not report:
+        progress(copied_orders, total_orders)
+    return rows
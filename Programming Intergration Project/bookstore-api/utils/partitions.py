@@ -0,0 +1,134 @@
+from collections import namedtuple
+from datetime import date, timedelta
+
+# Tables range-partitioned by SaleDate (migration 0004, MySQL only)
+PARTITIONED_TABLES = ('orders', 'orderdetails')
+
+PARTITION_INTERVALS = ('month', 'year')
+
+# Catch-all last partition; new periods are split off it by add_future_partitions
+MAXVALUE_PARTITION = 'pmax'
+
+Partition = namedtuple('Partition', ['name', 'bound', 'rows'])
+
+def sale_date_filters(start, end, *columns):
+    """
+    Conditions keeping each SaleDate column in [start, end), either bound optional
+    Plain comparisons against constant dates are what MySQL partition pruning
+    recognizes; give OrderDetail.SaleDate alongside Order.SaleDate on joins so
+    both tables are pruned (the optimizer does not carry a range across the join)
+    """
+    conditions = []
+    for column in columns:
+        if start is not None:
+            conditions.append(column >= start)
+        if end is not None:
+            conditions.append(column < end)
+    return conditions
+
+def period_start(day, interval):
+    if interval == 'year':
+        return date(day.year, 1, 1)
+    return date(day.year, day.month, 1)
+
+def next_period(start, interval):
+    if interval == 'year':
+        return date(start.year + 1, 1, 1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def horizon(interval, ahead, today=None):
+    """
+    First day of the period `ahead` intervals after today's
+    """
+    day = period_start(today or date.today(), interval)
+    for _ in range(ahead):
+        day = next_period(day, interval)
+    return day
+
+def partition_name(start, interval):
+    return f"p{start:%Y}" if interval == 'year' else f"p{start:%Y%m}"
+
+def partition_definitions(first_day, last_day, interval):
+    """
+    (name, exclusive upper bound) of every period from first_day's through last_day's
+    """
+    definitions = []
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        bound = next_period(start, interval)
+        definitions.append((partition_name(start, interval), bound))
+        start = bound
+    return definitions
+
+def _partition_sql(definitions):
+    return ', '.join(
+        [f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" for name, bound in definitions]
+        + [f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)"]
+    )
+
+def partition_clause(definitions):
+    return f"PARTITION BY RANGE COLUMNS(SaleDate) ({_partition_sql(definitions)})"
+
+def list_partitions(connection, table):
+    """
+    Partitions of a table in order, bound None for MAXVALUE; rows is InnoDB's estimate
+    Empty when the table is not partitioned
+    """
+    rows = connection.exec_driver_sql(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = %s AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION",
+        (table.lower(),)
+    ).all()
+    
+    partitions = []
+    for name, description, table_rows in rows:
+        bound = None if description == 'MAXVALUE' else date.fromisoformat(description.strip("'"))
+        partitions.append(Partition(name, bound, table_rows))
+    return partitions
+
+def is_partitioned(connection, table):
+    if connection.dialect.name != 'mysql':
+        return False
+    return bool(list_partitions(connection, table))
+
+def add_future_partitions(connection, table, interval, ahead, today=None):
+    """
+    Split periods off the MAXVALUE partition until the partition for the
+    period `ahead` intervals from today exists, so new orders never land in
+    pmax; only pmax is rewritten, and it is normally empty
+    Returns the names of the partitions added
+    """
+    partitions = list_partitions(connection, table)
+    if not partitions or partitions[-1].name != MAXVALUE_PARTITION:
+        raise ValueError(f"{table} is not partitioned by SaleDate with a {MAXVALUE_PARTITION} partition")
+    
+    last_day = horizon(interval, ahead, today)
+    bounded = [partition for partition in partitions if partition.bound is not None]
+    first_day = bounded[-1].bound if bounded else period_start(today or date.today(), interval)
+    definitions = partition_definitions(first_day, last_day, interval)
+    if not definitions:
+        return []
+    
+    connection.exec_driver_sql(
+        f"ALTER TABLE {table} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO ({_partition_sql(definitions)})"
+    )
+    return [name for name, _ in definitions]
+
+def drop_empty_partitions(connection, table, before):
+    """
+    Drop the partitions holding only days before `before` that no longer
+    have rows, e.g. once archive_orders has moved their orders out
+    DROP PARTITION is a metadata operation that gives the space back at once
+    Returns the names of the partitions dropped
+    """
+    dropped = []
+    for partition in list_partitions(connection, table):
+        if partition.bound is None or partition.bound > before:
+            continue
+        
+        has_rows = connection.exec_driver_sql(f"SELECT 1 FROM {table} PARTITION ({partition.name}) LIMIT 1").first()
+        if has_rows is None:
+            connection.exec_driver_sql(f"ALTER TABLE {table} DROP PARTITION {partition.name}")
+            dropped.append(partition.name)
+    return dropped
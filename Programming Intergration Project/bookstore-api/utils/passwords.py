@@ -0,0 +1,121 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_ROUNDS = 12
+
+class HasherBusy(Exception):
+    """
+    Raised when the password pool queue is full or a job timed out
+    """
+
+def configured_rounds():
+    if has_app_context():
+        return current_app.config.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS)
+    return DEFAULT_ROUNDS
+
+def hash_password(password, rounds=None):
+    """
+    bcrypt hash of password at the given (or configured) cost
+    Runs in the calling thread, the request path goes through password_pool
+    """
+    salt = bcrypt.gensalt(rounds or configured_rounds())
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def verify_password(password, stored_hash):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+def hash_rounds(stored_hash):
+    """
+    Cost factor of a $2b$12$... hash, or None if it cannot be read
+    """
+    try:
+        return int(stored_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(stored_hash, rounds=None):
+    return hash_rounds(stored_hash) != (rounds or configured_rounds())
+
+class PasswordPool:
+    """
+    bcrypt work in a dedicated process pool, so a burst of logins burns those
+    processes' CPU instead of holding the GIL in the API workers
+    At most PASSWORD_QUEUE_MAX jobs are queued or running; beyond that callers
+    get HasherBusy straight away instead of piling up behind the pool
+    With PASSWORD_WORKERS = 0 the work runs in the calling thread
+    """
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._dummy_hash = None
+    
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                # spawn: the API process runs threads, forking it is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['PASSWORD_WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._slots = threading.BoundedSemaphore(config['PASSWORD_QUEUE_MAX'])
+            return self._executor, self._slots
+    
+    def _run(self, fn, *args):
+        if current_app.config['PASSWORD_WORKERS'] <= 0:
+            return fn(*args)
+        
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            raise HasherBusy("Password queue is full")
+        
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self.shutdown()
+            raise HasherBusy("Password pool restarted")
+        
+        # The slot is freed when the job really ends, even after a timeout
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=current_app.config['PASSWORD_TIMEOUT_SECONDS'])
+        except FutureTimeout:
+            raise HasherBusy("Password check timed out")
+        except BrokenProcessPool:
+            self.shutdown()
+            raise HasherBusy("Password pool restarted")
+    
+    def hash(self, password):
+        return self._run(hash_password, password, configured_rounds())
+    
+    def verify(self, password, stored_hash):
+        return self._run(verify_password, password, stored_hash)
+    
+    def verify_unknown_user(self, password):
+        """
+        Spend the same time as a real check, so response times do not reveal
+        which usernames exist
+        """
+        if self._dummy_hash is None or needs_rehash(self._dummy_hash):
+            self._dummy_hash = self.hash('dummy password')
+        self.verify(password, self._dummy_hash)
+        return False
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+# Shared per-process password pool, started on first use
+password_pool = PasswordPool()
@@ -0,0 +1,63 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+
+class QueryCapture:
+    """
+    Append the SELECT statements the API runs to a JSON lines file, with the
+    endpoint that issued them, their parameters and duration
+    The file is the workload replayed by index_advisor.py
+    Enabled by QUERY_CAPTURE_PATH; QUERY_CAPTURE_SAMPLE keeps a fraction of statements
+    """
+    def __init__(self):
+        self.path = None
+        self.sample = 1.0
+        self._lock = threading.Lock()
+        self._output = None
+    
+    def init_app(self, app, engine):
+        self.path = app.config['QUERY_CAPTURE_PATH']
+        self.sample = app.config['QUERY_CAPTURE_SAMPLE']
+        if not self.path or engine in _listening:
+            return
+        
+        self._output = open(self.path, 'a', encoding='utf-8')
+        dialect = engine.dialect.name
+        _listening.add(engine)
+        
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _start(conn, cursor, statement, parameters, context, executemany):
+            context._capture_started = time.perf_counter()
+        
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, '_capture_started', None)
+            if started is None or executemany or not statement.lstrip().upper().startswith('SELECT'):
+                return
+            if self.sample < 1.0 and random.random() >= self.sample:
+                return
+            
+            self.write({
+                'captured_at': datetime.now().isoformat(),
+                'dialect': dialect,
+                'endpoint': request.endpoint if has_request_context() else None,
+                'statement': statement,
+                'parameters': parameters,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3)
+            })
+    
+    def write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            self._output.write(line)
+            self._output.flush()
+
+# Engines that already have the listeners attached
+_listening = set()
+
+# Shared per-process capture, enabled by create_app when QUERY_CAPTURE_PATH is set
+query_capture = QueryCapture()
@@ -0,0 +1,50 @@
+import threading
+import time
+
+# Buckets kept before idle (full) ones are dropped
+MAX_BUCKETS = 100000
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets keyed by any string, e.g. a username or an IP
+    Each bucket holds up to burst tokens and refills at per_minute tokens per minute
+    Limits are per process, which is enough to slow down guessing on one worker
+    """
+    def __init__(self, burst, per_minute):
+        if burst < 1 or per_minute <= 0:
+            raise ValueError("burst and per_minute must be positive")
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def consume(self, key, tokens=1):
+        """
+        Take tokens from key's bucket
+        Returns 0 when allowed, otherwise the seconds until enough tokens are back
+        """
+        now = time.monotonic()
+        with self._lock:
+            available, updated = self._buckets.get(key, (self.burst, now))
+            available = min(self.burst, available + (now - updated) * self.rate)
+            
+            if available < tokens:
+                self._buckets[key] = (available, now)
+                return (tokens - available) / self.rate
+            
+            self._buckets[key] = (available - tokens, now)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now)
+            return 0
+    
+    def _prune(self, now):
+        full_after = self.burst / self.rate
+        self._buckets = {
+            key: (available, updated)
+            for key, (available, updated) in self._buckets.items()
+            if now - updated < full_after
+        }
+    
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
@@ -0,0 +1,95 @@
+from flask import current_app
+from sqlalchemy import case, func, insert, select
+from models import db, Rating, RatingSummary
+from utils.bulk import upsert_increment
+
+STAR_COLUMNS = {
+    1: 'Stars1',
+    2: 'Stars2',
+    3: 'Stars3',
+    4: 'Stars4',
+    5: 'Stars5'
+}
+
+def prior_weight():
+    """
+    Number of virtual votes at the global mean added to every book
+    """
+    return current_app.config.get('RATING_PRIOR_WEIGHT', 10)
+
+def global_mean():
+    """
+    Mean rating over all books, read from the summary table not from ratings
+    """
+    total_sum, total_count = db.session.query(
+        func.sum(RatingSummary.RatingSum),
+        func.sum(RatingSummary.RatingCount)
+    ).one()
+    return float(total_sum) / total_count if total_count else 0.0
+
+def rebuild_rating_summary(progress=None):
+    """
+    Rebuild the summary from ratings with a single grouped INSERT ... SELECT,
+    then derive every Bayesian average in one UPDATE
+    Returns the number of books summarized
+    """
+    RatingSummary.query.delete(synchronize_session=False)
+    
+    star_sums = [
+        func.sum(case((Rating.Rating == stars, 1), else_=0))
+        for stars in STAR_COLUMNS
+    ]
+    db.session.execute(
+        insert(RatingSummary).from_select(
+            ['BookID', 'RatingCount', 'RatingSum', *STAR_COLUMNS.values()],
+            select(
+                Rating.BookID,
+                func.count(Rating.ReviewID),
+                func.coalesce(func.sum(Rating.Rating), 0),
+                *star_sums
+            ).where(
+                Rating.BookID.isnot(None),
+                Rating.Rating.isnot(None)
+            ).group_by(Rating.BookID)
+        )
+    )
+    
+    mean = global_mean()
+    weight = prior_weight()
+    db.session.query(RatingSummary).update({
+        RatingSummary.BayesianAverage:
+            (weight * mean + RatingSummary.RatingSum) / (weight + RatingSummary.RatingCount)
+    }, synchronize_session=False)
+    db.session.commit()
+    
+    books = db.session.query(func.count()).select_from(RatingSummary).scalar()
+    if progress:
+        progress(books, books)
+    return books
+
+def apply_rating(book_id, stars, delta=1):
+    """
+    Add (delta=1) or remove (delta=-1) one rating from a book's summary
+    Call inside the write transaction; the counters are incremented by one
+    upsert and the Bayesian average is derived from them in the same row
+    update, so concurrent ratings of a book never lose an update
+    The average uses the current global mean, other books pick up its drift
+    on the next rebuild
+    """
+    upsert_increment(RatingSummary, [{
+        'BookID': book_id,
+        'RatingCount': delta,
+        'RatingSum': delta * stars,
+        **{column: delta if number == stars else 0 for number, column in STAR_COLUMNS.items()}
+    }], ('RatingCount', 'RatingSum', *STAR_COLUMNS.values()))
+    
+    mean = global_mean()
+    weight = prior_weight()
+    db.session.query(RatingSummary).filter(RatingSummary.BookID == book_id).update({
+        RatingSummary.BayesianAverage: case(
+            (RatingSummary.RatingCount + weight == 0, None),
+            else_=(weight * mean + RatingSummary.RatingSum) / (weight + RatingSummary.RatingCount)
+        )
+    }, synchronize_session=False)
+    
+    return db.session.get(RatingSummary, book_id, populate_existing=True)
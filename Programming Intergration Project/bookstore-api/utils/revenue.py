@@ -0,0 +1,163 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import func, insert, select, tuple_, union_all
+from models import db, Order, OrderDetail, OrderDetailArchive, Edition, DailyRevenue
+from utils.bulk import upsert_increment
+
+def month_expression(column):
+    """
+    YYYY-MM of a date column on MySQL and SQLite
+    """
+    if db.session.get_bind().dialect.name == 'mysql':
+        return func.date_format(column, '%Y-%m')
+    return func.strftime('%Y-%m', column)
+
+def _rollup_select(condition):
+    """
+    Revenue grouped per (SaleDate, ISBN) for the order lines matching
+    condition(sale_date_column, isbn_column), hot and archived lines alike
+    Revenue is Quantity * Edition.Price at the time the cell is computed
+    """
+    lines = union_all(
+        select(
+            Order.SaleDate.label('SaleDate'), OrderDetail.ISBN.label('ISBN'), OrderDetail.Quantity.label('Quantity')
+        ).select_from(
+            OrderDetail
+        ).join(
+            Order, OrderDetail.OrderID == Order.OrderID
+        ).where(
+            condition(Order.SaleDate, OrderDetail.ISBN),
+            Order.SaleDate.isnot(None),
+            OrderDetail.ISBN.isnot(None)
+        ),
+        select(
+            OrderDetailArchive.SaleDate, OrderDetailArchive.ISBN, OrderDetailArchive.Quantity
+        ).where(
+            condition(OrderDetailArchive.SaleDate, OrderDetailArchive.ISBN),
+            OrderDetailArchive.ISBN.isnot(None)
+        )
+    ).subquery()
+    
+    return select(
+        lines.c.SaleDate,
+        lines.c.ISBN,
+        func.sum(lines.c.Quantity),
+        func.count(),
+        func.coalesce(func.sum(lines.c.Quantity * Edition.Price), 0)
+    ).select_from(
+        lines
+    ).outerjoin(
+        Edition, lines.c.ISBN == Edition.ISBN
+    ).group_by(
+        lines.c.SaleDate, lines.c.ISBN
+    )
+
+def _copy_cells(condition):
+    db.session.execute(
+        insert(DailyRevenue).from_select(
+            ['SaleDate', 'ISBN', 'Quantity', 'OrderLines', 'Revenue'],
+            _rollup_select(condition)
+        )
+    )
+
+def revenue_cells(order_ids):
+    """
+    What the given orders currently add to daily_revenue:
+    {(SaleDate, ISBN): (Quantity, OrderLines, Revenue)}
+    Capture this before changing an order, so sync_daily_revenue can take
+    the old contribution back out
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return {}
+    
+    db.session.flush()
+    rows = db.session.query(
+        Order.SaleDate,
+        OrderDetail.ISBN,
+        func.sum(OrderDetail.Quantity),
+        func.count(),
+        func.coalesce(func.sum(OrderDetail.Quantity * Edition.Price), 0)
+    ).join(
+        OrderDetail, Order.OrderID == OrderDetail.OrderID
+    ).outerjoin(
+        Edition, OrderDetail.ISBN == Edition.ISBN
+    ).filter(
+        Order.OrderID.in_(order_ids),
+        Order.SaleDate.isnot(None),
+        OrderDetail.ISBN.isnot(None)
+    ).group_by(
+        Order.SaleDate, OrderDetail.ISBN
+    ).all()
+    
+    return {
+        (sale_date if isinstance(sale_date, date) else date.fromisoformat(str(sale_date)), isbn):
+            (int(quantity or 0), lines, Decimal(str(revenue or 0)))
+        for sale_date, isbn, quantity, lines, revenue in rows
+    }
+
+def sync_daily_revenue(order_ids, previous_cells=None):
+    """
+    Apply the change of the given orders' contribution to daily_revenue as
+    per-cell deltas: added with one atomic upsert, so concurrent orders for
+    the same day and ISBN never rescan the cell or race on a missing row
+    previous_cells is revenue_cells() from before the write, empty for new orders
+    Call inside the write transaction, after the order lines are flushed
+    Deltas use the current edition price; rebuild_daily_revenue recomputes
+    every cell from scratch
+    """
+    previous = previous_cells or {}
+    current = revenue_cells(order_ids)
+    
+    rows = []
+    emptied = []
+    for cell in sorted(set(previous) | set(current)):
+        old = previous.get(cell, (0, 0, Decimal(0)))
+        new = current.get(cell, (0, 0, Decimal(0)))
+        quantity, lines, revenue = (new[0] - old[0], new[1] - old[1], new[2] - old[2])
+        if not (quantity or lines or revenue):
+            continue
+        rows.append({'SaleDate': cell[0], 'ISBN': cell[1], 'Quantity': quantity, 'OrderLines': lines, 'Revenue': revenue})
+        if lines < 0:
+            emptied.append(cell)
+    
+    # Cells sorted by key, so concurrent writers lock them in the same order
+    upsert_increment(DailyRevenue, rows, ('Quantity', 'OrderLines', 'Revenue'))
+    
+    # Cells whose last line went away; these rows exist, so no gap locks
+    if emptied:
+        DailyRevenue.query.filter(
+            tuple_(DailyRevenue.SaleDate, DailyRevenue.ISBN).in_(emptied),
+            DailyRevenue.OrderLines <= 0
+        ).delete(synchronize_session=False)
+
+def rebuild_daily_revenue(progress=None):
+    """
+    Rebuild the rollup from OrderDetails and the archived lines joined to
+    Edition, one grouped INSERT ... SELECT per sale month; returns the number
+    of cells written
+    """
+    DailyRevenue.query.delete(synchronize_session=False)
+    db.session.commit()
+    
+    hot = db.session.query(func.min(Order.SaleDate), func.max(Order.SaleDate)).one()
+    archived = db.session.query(func.min(OrderDetailArchive.SaleDate), func.max(OrderDetailArchive.SaleDate)).one()
+    days = [day for day in (*hot, *archived) if day is not None]
+    if not days:
+        return 0
+    first_day, last_day = min(days), max(days)
+    
+    months = []
+    year, month = first_day.year, first_day.month
+    while (year, month) <= (last_day.year, last_day.month):
+        months.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    for done, month_start in enumerate(months, start=1):
+        month_end = date(month_start.year + 1, 1, 1) if month_start.month == 12 else date(month_start.year, month_start.month + 1, 1)
+        _copy_cells(lambda sale_date, isbn: (sale_date >= month_start) & (sale_date < month_end))
+        db.session.commit()
+        if progress:
+            progress(done, len(months))
+    
+    return db.session.query(func.count()).select_from(DailyRevenue).scalar()
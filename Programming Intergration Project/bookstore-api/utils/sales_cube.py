@@ -0,0 +1,326 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import extract, func, select, union_all
+from models import db, Order, OrderDetail, OrderDetailArchive, DailyRevenue, Edition, Book, Info, Author, Publisher
+from utils.catalog import catalog
+
+# Dimensions that can be grouped on or filtered by
+DIMENSIONS = ('genre', 'publisher', 'format', 'author_country', 'month')
+
+# Catalog attributes behind the per-edition dimensions
+EDITION_DIMENSIONS = {
+    'genre': Info.Genre,
+    'publisher': Publisher.PublishingHouse,
+    'format': Edition.Formatt,
+    'author_country': Author.CountryOfResidence
+}
+
+METRICS = ('quantity', 'revenue', 'lines')
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+def _month_label(month_key):
+    if month_key < 0:
+        return None
+    year, month = divmod(int(month_key), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+def _day_number(value):
+    return int((np.datetime64(value, 'D') - EPOCH).astype(np.int64))
+
+def _day_key(column):
+    # Increases with the date, and computes the same in SQL on MySQL and SQLite as in Python
+    return extract('year', column) * 372 + extract('month', column) * 31 + extract('day', column)
+
+class SalesCube:
+    """
+    In-memory, dictionary-encoded fact table of order lines
+    Each line is stored as an ISBN code, a day number, a month key and a
+    quantity; the per-edition dimensions (genre, publisher, format, author
+    country) and the price live in small lookup arrays indexed by ISBN code
+    and are gathered per query, so catalog edits never touch the facts
+    
+    New orders from this process are appended incrementally, anything else
+    (updates, deletes, other workers, imports) is detected through a
+    fingerprint and triggers a full reload within SALES_CUBE_CHECK_SECONDS
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._checked_at = 0
+        self._pending = []
+    
+    @property
+    def is_loaded(self):
+        return self._loaded
+    
+    # Loading
+    
+    def _isbn_code(self, isbn):
+        code = self.isbn_codes.get(isbn)
+        if code is None:
+            code = self.isbn_codes[isbn] = len(self.isbn_values)
+            self.isbn_values.append(isbn)
+            self._dimensions_version = None
+        return code
+    
+    def _fingerprint(self):
+        """
+        Hot line count and quantity, plus per ISBN the quantity, line count
+        and date-weighted quantity held in daily_revenue, which every order
+        write path updates in its own transaction: a moved SaleDate, a swapped
+        ISBN or quantities shifted between lines change it, whichever worker
+        made the write
+        """
+        count, total = db.session.execute(select(
+            func.count(),
+            func.coalesce(func.sum(OrderDetail.Quantity), 0)
+        ).select_from(OrderDetail)).one()
+        
+        cells = db.session.query(
+            DailyRevenue.ISBN,
+            func.sum(DailyRevenue.Quantity),
+            func.sum(DailyRevenue.OrderLines),
+            func.sum(DailyRevenue.Quantity * _day_key(DailyRevenue.SaleDate))
+        ).group_by(DailyRevenue.ISBN)
+        
+        return int(count), int(total), {
+            isbn: (int(quantity or 0), int(lines or 0), int(weighted or 0))
+            for isbn, quantity, lines, weighted in cells
+        }
+    
+    def _load_facts(self):
+        fingerprint = self._fingerprint()
+        
+        with db.engine.connect() as connection:
+            # Archived lines keep their history in the cube
+            frame = pd.read_sql(
+                union_all(
+                    select(
+                        OrderDetail.ISBN, Order.SaleDate, OrderDetail.Quantity
+                    ).select_from(OrderDetail).join(Order, OrderDetail.OrderID == Order.OrderID),
+                    select(OrderDetailArchive.ISBN, OrderDetailArchive.SaleDate, OrderDetailArchive.Quantity)
+                ),
+                connection
+            )
+        
+        isbn_codes, isbn_values = pd.factorize(frame['ISBN'].fillna(''))
+        self.isbn_values = list(isbn_values)
+        self.isbn_codes = {isbn: code for code, isbn in enumerate(self.isbn_values)}
+        
+        dates = pd.to_datetime(frame['SaleDate'])
+        missing = dates.isna().to_numpy()
+        days = ((dates - pd.Timestamp('1970-01-01')).dt.days).fillna(-1).to_numpy(dtype=np.int32)
+        months = (dates.dt.year * 12 + dates.dt.month - 1).fillna(-1).to_numpy(dtype=np.int32)
+        days[missing] = -1
+        
+        self.isbn = isbn_codes.astype(np.int32)
+        self.day = days
+        self.month = months
+        self.quantity = frame['Quantity'].fillna(0).to_numpy(dtype=np.int64)
+        
+        self._pending = []
+        self._fingerprint_expected = fingerprint
+        self._dimensions_version = None
+        self._loaded = True
+    
+    def _load_dimensions(self):
+        """
+        Per-ISBN lookup arrays for the edition dimensions and price
+        """
+        rows = db.session.query(
+            Edition.ISBN, Edition.Price, *EDITION_DIMENSIONS.values()
+        ).outerjoin(
+            Book, Edition.BookID == Book.BookID
+        ).outerjoin(
+            Info, Edition.BookID == Info.BookID
+        ).outerjoin(
+            Author, Book.AuthID == Author.AuthID
+        ).outerjoin(
+            Publisher, Edition.PubID == Publisher.PubID
+        ).all()
+        
+        version = catalog.version
+        by_isbn = {row[0]: row for row in rows}
+        for isbn in by_isbn:
+            self._isbn_code(isbn)
+        
+        self.prices = np.array([
+            float(by_isbn[isbn][1]) if isbn in by_isbn and by_isbn[isbn][1] else 0.0
+            for isbn in self.isbn_values
+        ])
+        
+        self.dimension_values = {}
+        self.dimension_codes = {}
+        for position, name in enumerate(EDITION_DIMENSIONS, start=2):
+            values = []
+            index = {}
+            codes = np.empty(len(self.isbn_values), dtype=np.int32)
+            for code, isbn in enumerate(self.isbn_values):
+                value = by_isbn[isbn][position] if isbn in by_isbn else None
+                if value not in index:
+                    index[value] = len(values)
+                    values.append(value)
+                codes[code] = index[value]
+            self.dimension_values[name] = values
+            self.dimension_codes[name] = codes
+        
+        self._dimensions_version = version
+    
+    def refresh(self):
+        """
+        Bring the cube up to date before a query
+        """
+        interval = current_app.config.get('SALES_CUBE_CHECK_SECONDS', 30)
+        
+        if not self._loaded:
+            self._load_facts()
+            self._checked_at = time.monotonic()
+        elif time.monotonic() - self._checked_at >= interval:
+            if self._fingerprint() != self._fingerprint_expected:
+                self._load_facts()
+            self._checked_at = time.monotonic()
+        
+        if self._pending:
+            isbn, day, month, quantity = zip(*self._pending)
+            self.isbn = np.concatenate((self.isbn, np.array(isbn, dtype=np.int32)))
+            self.day = np.concatenate((self.day, np.array(day, dtype=np.int32)))
+            self.month = np.concatenate((self.month, np.array(month, dtype=np.int32)))
+            self.quantity = np.concatenate((self.quantity, np.array(quantity, dtype=np.int64)))
+            self._pending = []
+        
+        if self._dimensions_version != catalog.version:
+            self._load_dimensions()
+    
+    # Incremental maintenance, called by the order endpoints after commit
+    
+    def append_order(self, order_id):
+        """
+        Append the lines of a newly created order
+        """
+        self.append_orders([order_id])
+    
+    def append_orders(self, order_ids):
+        """
+        Append the lines of newly created orders with one query
+        """
+        with self._lock:
+            if not self._loaded or not order_ids:
+                return
+            
+            lines = db.session.query(
+                OrderDetail.ISBN, Order.SaleDate, OrderDetail.Quantity
+            ).join(
+                Order, OrderDetail.OrderID == Order.OrderID
+            ).filter(
+                OrderDetail.OrderID.in_(order_ids)
+            ).all()
+            
+            count, total, cells = self._fingerprint_expected
+            cells = dict(cells)
+            for isbn, sale_date, quantity in lines:
+                sale_date = pd.Timestamp(sale_date)
+                self._pending.append((
+                    self._isbn_code(isbn or ''),
+                    _day_number(sale_date),
+                    sale_date.year * 12 + sale_date.month - 1,
+                    quantity or 0
+                ))
+                count += 1
+                total += quantity or 0
+                
+                # The order's daily_revenue cells, added in its transaction
+                if isbn is not None:
+                    cell_quantity, cell_lines, weighted = cells.get(isbn, (0, 0, 0))
+                    day_key = sale_date.year * 372 + sale_date.month * 31 + sale_date.day
+                    cells[isbn] = (cell_quantity + (quantity or 0), cell_lines + 1, weighted + (quantity or 0) * day_key)
+            self._fingerprint_expected = (count, total, cells)
+    
+    def invalidate(self):
+        """
+        Force a full reload on the next query, e.g. after an order update or delete
+        """
+        with self._lock:
+            self._loaded = False
+    
+    # Querying
+    
+    def _row_codes(self, dimension):
+        """
+        Per-line codes and decoded values of a dimension
+        """
+        if dimension == 'month':
+            months, codes = np.unique(self.month, return_inverse=True)
+            return codes.astype(np.int64), [_month_label(month) for month in months]
+        return self.dimension_codes[dimension][self.isbn].astype(np.int64), self.dimension_values[dimension]
+    
+    def aggregate(self, group_by=(), filters=None, start_date=None, end_date=None, sort='quantity', limit=100):
+        """
+        Group the order lines by any combination of DIMENSIONS
+        filters maps a dimension to the accepted values (case-insensitive)
+        Returns (total number of groups, the first limit groups by sort desc)
+        """
+        with self._lock:
+            self.refresh()
+            
+            mask = np.ones(len(self.isbn), dtype=bool)
+            
+            if start_date is not None:
+                mask &= self.day >= _day_number(start_date)
+            if end_date is not None:
+                mask &= (self.day >= 0) & (self.day <= _day_number(end_date))
+            
+            for dimension, accepted in (filters or {}).items():
+                codes, values = self._row_codes(dimension)
+                accepted = {str(value).lower() for value in accepted}
+                allowed = [code for code, value in enumerate(values) if str(value).lower() in accepted]
+                mask &= np.isin(codes, allowed)
+            
+            # Mixed-radix key over the requested dimensions
+            keys = np.zeros(int(mask.sum()), dtype=np.int64)
+            decoders = []
+            for dimension in group_by:
+                codes, values = self._row_codes(dimension)
+                keys = keys * len(values) + codes[mask]
+                decoders.append((dimension, values))
+            
+            quantity = self.quantity[mask]
+            revenue = quantity * self.prices[self.isbn[mask]]
+            
+            groups, inverse = np.unique(keys, return_inverse=True)
+            totals = {
+                'quantity': np.bincount(inverse, weights=quantity, minlength=len(groups)),
+                'revenue': np.bincount(inverse, weights=revenue, minlength=len(groups)),
+                'lines': np.bincount(inverse, minlength=len(groups))
+            }
+            
+            order = np.argsort(-totals[sort], kind='stable')[:limit]
+            
+            results = []
+            for group in order:
+                key = int(groups[group])
+                labels = {}
+                for dimension, values in reversed(decoders):
+                    key, code = divmod(key, len(values))
+                    labels[dimension] = values[code]
+                results.append({
+                    **{dimension: labels[dimension] for dimension in group_by},
+                    'quantity': int(totals['quantity'][group]),
+                    'revenue': round(float(totals['revenue'][group]), 2),
+                    'lines': int(totals['lines'][group])
+                })
+            
+            return len(groups), results
+    
+    def stats(self):
+        return {
+            "loaded": self._loaded,
+            "lines": int(len(self.isbn)) + len(self._pending) if self._loaded else 0,
+            "editions": len(self.isbn_values) if self._loaded else 0
+        }
+
+# Shared per-process cube
+sales_cube = SalesCube()
@@ -0,0 +1,99 @@
+import threading
+from functools import wraps
+from flask import current_app, request
+
+class _Call:
+    """
+    One in-flight computation and the threads waiting on it
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one computation
+    The first caller runs fn, callers arriving while it runs wait for it and
+    get the same result (or exception); nothing is cached once it finishes
+    Coalescing is per process, across the threads of one worker
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'computed': 0, 'shared': 0}
+    
+    def do(self, key, fn, timeout=None):
+        """
+        Run fn() for key, or wait for the call already running for it
+        A waiter that gives up after timeout seconds runs fn() itself
+        Returns (result, shared)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                leader = False
+        
+        if not leader:
+            if call.done.wait(timeout):
+                with self._lock:
+                    self._stats['shared'] += 1
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            return fn(), False
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._stats['computed'] += 1
+            call.done.set()
+        return call.result, False
+    
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': len(self._calls),
+                'waiting': sum(call.waiters for call in self._calls.values())
+            }
+
+single_flight = SingleFlight()
+
+def request_key():
+    """
+    Endpoint and normalized query string: repeated values kept in order,
+    parameters sorted, so ?days=30&limit=10 and ?limit=10&days=30 coalesce
+    """
+    args = tuple(sorted((name, tuple(request.args.getlist(name))) for name in request.args))
+    return (request.endpoint, tuple(sorted(request.view_args.items())) if request.view_args else (), args)
+
+def coalesce(fn):
+    """
+    Decorator sharing one run of a GET view between identical concurrent requests
+    Only for views whose response depends on the URL alone, not on the caller;
+    put it below the auth decorators so every request is still authorized
+    The body, status and headers are shared, each waiter gets its own response
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        def compute():
+            response = current_app.make_response(fn(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers.items())
+        
+        body, status, headers = single_flight.do(
+            request_key(), compute, timeout=current_app.config['SINGLE_FLIGHT_WAIT_SECONDS']
+        )[0]
+        return current_app.response_class(body, status=status, headers=headers)
+    
+    return wrapper
@@ -0,0 +1,232 @@
+import time
+import heapq
+import bisect
+import threading
+from flask import current_app
+from models import db, Book, Author, Order
+
+# Recent orders kept in the OrderID index
+RECENT_ORDERS = 10000
+
+# Full reload interval, picks up writes made by other workers and scripts
+REFRESH_SECONDS = 300
+
+def normalize(value):
+    """
+    Case-fold and collapse whitespace so keys compare the way users type
+    """
+    return ' '.join((value or '').casefold().split())
+
+class PrefixIndex:
+    """
+    Sorted array of (key, value) pairs searched with bisect
+    A value may be reachable through several keys, e.g. every word of a title
+    """
+    def __init__(self):
+        self._keys = []
+        self._keys_by_value = {}
+        self._labels = {}
+    
+    def __len__(self):
+        return len(self._labels)
+    
+    def load(self, items):
+        """
+        Bulk load (value, label, keys) triples, sorting once
+        """
+        keys = []
+        keys_by_value = {}
+        labels = {}
+        for value, label, item_keys in items:
+            item_keys = [key for key in dict.fromkeys(item_keys) if key]
+            keys.extend((key, value) for key in item_keys)
+            keys_by_value[value] = item_keys
+            labels[value] = label
+        keys.sort()
+        self._keys, self._keys_by_value, self._labels = keys, keys_by_value, labels
+    
+    def add(self, value, label, keys):
+        self.remove(value)
+        keys = [key for key in dict.fromkeys(keys) if key]
+        for key in keys:
+            bisect.insort(self._keys, (key, value))
+        self._keys_by_value[value] = keys
+        self._labels[value] = label
+    
+    def remove(self, value):
+        for key in self._keys_by_value.pop(value, []):
+            position = bisect.bisect_left(self._keys, (key, value))
+            if position < len(self._keys) and self._keys[position] == (key, value):
+                del self._keys[position]
+        self._labels.pop(value, None)
+    
+    def search(self, prefix, limit):
+        """
+        Return up to limit (value, label) pairs with a key starting with prefix
+        """
+        results = []
+        seen = set()
+        position = bisect.bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(results) < limit:
+            key, value = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            if value not in seen:
+                seen.add(value)
+                results.append((value, self._labels[value]))
+            position += 1
+        return results
+
+def title_keys(title):
+    """
+    Index a title under every word start, so "potter" finds "Harry Potter"
+    """
+    words = normalize(title).split(' ')
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+def author_keys(first_name, last_name):
+    return [normalize(f"{first_name or ''} {last_name or ''}"), normalize(last_name)]
+
+def author_label(first_name, last_name):
+    return f"{first_name} {last_name}"
+
+class SuggestIndex:
+    """
+    In-memory typeahead index over book titles, author names and recent OrderIDs
+    Loaded on first use, updated incrementally by the write endpoints and
+    reloaded in the background every REFRESH_SECONDS, serving the old index meanwhile
+    """
+    def __init__(self):
+        self.titles = PrefixIndex()
+        self.authors = PrefixIndex()
+        self.orders = PrefixIndex()
+        self._order_dates = {}
+        # (date key, OrderID) min-heap for eviction; entries whose order was
+        # removed or re-dated are skipped when popped
+        self._order_heap = []
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self.loaded_at = None
+    
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+    
+    def load(self):
+        """
+        Build all three indexes with one query each
+        The new indexes are built aside and swapped in, lookups keep using the old ones
+        """
+        books = db.session.query(Book.BookID, Book.Title).all()
+        authors = db.session.query(Author.AuthID, Author.FirstName, Author.LastName).all()
+        orders = db.session.query(Order.OrderID, Order.SaleDate).order_by(
+            Order.SaleDate.desc(), Order.OrderID.desc()
+        ).limit(RECENT_ORDERS).all()
+        
+        titles, authors_index, orders_index = PrefixIndex(), PrefixIndex(), PrefixIndex()
+        titles.load((book_id, title, title_keys(title)) for book_id, title in books)
+        authors_index.load(
+            (auth_id, author_label(first, last), author_keys(first, last))
+            for auth_id, first, last in authors
+        )
+        orders_index.load((order_id, sale_date, [normalize(order_id)]) for order_id, sale_date in orders)
+        order_dates = dict(orders)
+        order_heap = [(str(sale_date), order_id) for order_id, sale_date in order_dates.items()]
+        heapq.heapify(order_heap)
+        
+        with self._lock:
+            self.titles, self.authors, self.orders = titles, authors_index, orders_index
+            self._order_dates, self._order_heap = order_dates, order_heap
+            self.loaded_at = time.monotonic()
+    
+    def _refresh_in_background(self):
+        """
+        Reload in a thread unless a load is already running
+        """
+        if not self._load_lock.acquire(blocking=False):
+            return
+        
+        app = current_app._get_current_object()
+        
+        def run():
+            try:
+                with app.app_context():
+                    self.load()
+            except Exception as e:
+                print(f"Suggest index refresh failed: {str(e)}")
+            finally:
+                self._load_lock.release()
+        
+        try:
+            threading.Thread(target=run, name='suggest-refresh', daemon=True).start()
+        except Exception:
+            self._load_lock.release()
+            raise
+    
+    def ensure_loaded(self):
+        """
+        Load synchronously on first use, afterwards refresh stale indexes in the background
+        """
+        if self.loaded_at is None:
+            with self._load_lock:
+                # Recheck: another request may have loaded while this one waited
+                if self.loaded_at is None:
+                    self.load()
+        elif time.monotonic() - self.loaded_at > REFRESH_SECONDS:
+            self._refresh_in_background()
+    
+    def suggest(self, prefix, limit=10, kinds=('titles', 'authors', 'orders')):
+        prefix = normalize(prefix)
+        with self._lock:
+            return {kind: getattr(self, kind).search(prefix, limit) for kind in kinds}
+    
+    # Incremental updates, called by the write endpoints after commit.
+    # An index that was never loaded is left alone, the first lookup loads it
+    
+    def put_book(self, book_id, title):
+        if self.is_loaded:
+            with self._lock:
+                self.titles.add(book_id, title, title_keys(title))
+    
+    def remove_book(self, book_id):
+        if self.is_loaded:
+            with self._lock:
+                self.titles.remove(book_id)
+    
+    def put_author(self, auth_id, first_name, last_name):
+        if self.is_loaded:
+            with self._lock:
+                self.authors.add(auth_id, author_label(first_name, last_name), author_keys(first_name, last_name))
+    
+    def remove_author(self, auth_id):
+        if self.is_loaded:
+            with self._lock:
+                self.authors.remove(auth_id)
+    
+    def put_order(self, order_id, sale_date):
+        if not self.is_loaded:
+            return
+        with self._lock:
+            self.orders.add(order_id, sale_date, [normalize(order_id)])
+            self._order_dates[order_id] = sale_date
+            heapq.heappush(self._order_heap, (str(sale_date), order_id))
+            
+            # Evict the oldest orders once over capacity
+            while len(self._order_dates) > RECENT_ORDERS:
+                date_key, old_order_id = heapq.heappop(self._order_heap)
+                if old_order_id in self._order_dates and str(self._order_dates[old_order_id]) == date_key:
+                    self.remove_order(old_order_id)
+            
+            # Drop stale entries once they outnumber the live ones
+            if len(self._order_heap) > 2 * max(len(self._order_dates), RECENT_ORDERS):
+                self._order_heap = [(str(sale_date), order_id) for order_id, sale_date in self._order_dates.items()]
+                heapq.heapify(self._order_heap)
+    
+    def remove_order(self, order_id):
+        if self.is_loaded:
+            with self._lock:
+                self.orders.remove(order_id)
+                self._order_dates.pop(order_id, None)
+
+# Shared per-process index
+suggest_index = SuggestIndex()
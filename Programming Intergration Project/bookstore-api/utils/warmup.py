@@ -0,0 +1,148 @@
+import threading
+import time
+from datetime import timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from models import db
+from utils.catalog import catalog
+from utils.checkout_analytics import checkout_analytics
+from utils.sales_cube import sales_cube
+from utils.suggest import suggest_index
+
+# Steps in the order they run, WARMUP_STEPS picks a subset
+WARMUP_STEPS = ('pool', 'mappers', 'catalog', 'suggest', 'sales_cube', 'checkout_analytics', 'requests')
+
+WARMUP_STATES = ('pending', 'running', 'finished')
+
+def _warm_pool(app):
+    """
+    Open up to WARMUP_POOL_CONNECTIONS connections at once so the pool starts full
+    """
+    pool = db.engine.pool
+    wanted = app.config['WARMUP_POOL_CONNECTIONS']
+    if hasattr(pool, 'size'):
+        wanted = min(wanted, pool.size())
+    
+    connections = []
+    try:
+        for _ in range(wanted):
+            connection = db.engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return {'connections': len(connections)}
+
+def _warm_requests(app):
+    """
+    GET each of WARMUP_PATHS once through the full stack, which compiles and
+    caches their SQL and loads whatever the views touch
+    Protected paths get a short-lived token that never leaves the process
+    The step fails when any path answers with a server error
+    """
+    headers = {'Authorization': 'Bearer ' + create_access_token(identity='warmup', expires_delta=timedelta(minutes=5))}
+    client = app.test_client()
+    
+    paths = {}
+    for path in app.config['WARMUP_PATHS']:
+        started = time.perf_counter()
+        status = client.get(path, headers=headers).status_code
+        paths[path] = {'status': status, 'ms': round((time.perf_counter() - started) * 1000, 1)}
+    
+    failed = [path for path, result in paths.items() if result['status'] >= 500]
+    if failed:
+        return {'ok': False, 'error': f"server error from {', '.join(failed)}", 'failed': failed, 'paths': paths}
+    return {'paths': paths}
+
+_STEP_FUNCTIONS = {
+    'pool': _warm_pool,
+    'mappers': lambda app: configure_mappers(),
+    'catalog': lambda app: {'loaded': catalog.get() is not None},
+    'suggest': lambda app: suggest_index.ensure_loaded(),
+    'sales_cube': lambda app: sales_cube.aggregate(group_by=('month',), limit=1),
+    'checkout_analytics': lambda app: checkout_analytics.get(),
+    'requests': _warm_requests
+}
+
+class Warmup:
+    """
+    Startup warm-up of one API process: fills the connection pool, configures
+    the mappers, loads the in-memory snapshots and sends the common requests
+    once, timing every step. A failing step is recorded and the next one runs
+    The process reports ready (GET /health/ready) once the warm-up has finished
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = 'pending'
+        self.steps = {}
+        self.duration_ms = None
+        self._thread = None
+    
+    @property
+    def is_finished(self):
+        return self.state == 'finished'
+    
+    def failed_steps(self):
+        with self._lock:
+            return [name for name, step in self.steps.items() if not step['ok']]
+    
+    def start(self, app, background=True):
+        """
+        Run the configured steps, in a daemon thread when background is set
+        """
+        with self._lock:
+            if self.state != 'pending':
+                return
+            self.state = 'running'
+        
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(app,), name='warmup', daemon=True)
+            self._thread.start()
+        else:
+            self._run(app)
+    
+    def skip(self):
+        """
+        Mark the warm-up finished without running it (WARMUP_ENABLED off)
+        """
+        with self._lock:
+            self.state = 'finished'
+            self.duration_ms = 0
+    
+    def _run(self, app):
+        started = time.perf_counter()
+        with app.app_context():
+            for name in [name for name in WARMUP_STEPS if name in app.config['WARMUP_STEPS']]:
+                step_started = time.perf_counter()
+                try:
+                    # Dict results are kept as step details, anything else is discarded
+                    detail = _STEP_FUNCTIONS[name](app)
+                    result = {'ok': True, **(detail if isinstance(detail, dict) else {})}
+                except Exception as e:
+                    result = {'ok': False, 'error': str(e)}
+                finally:
+                    # Each step starts from a clean session
+                    db.session.remove()
+                result['ms'] = round((time.perf_counter() - step_started) * 1000, 1)
+                with self._lock:
+                    self.steps[name] = result
+        
+        with self._lock:
+            self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.state = 'finished'
+        
+        timings = ', '.join(f"{name} {step['ms']} ms" + ('' if step['ok'] else ' (failed)') for name, step in self.steps.items())
+        print(f"Warm-up finished in {self.duration_ms} ms: {timings}")
+    
+    def report(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'duration_ms': self.duration_ms,
+                'steps': {name: dict(step) for name, step in self.steps.items()}
+            }
+
+# Warm-up state of this process
+warmup = Warmup()
@@ -0,0 +1,33 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from config import Config
+from models import db
+
+# Ensure the correct path is added to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.jobs import job_runner
+
+# Create a Flask application
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Initialize the database
+db.init_app(app)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued background jobs outside the API process")
+    parser.add_argument('--workers', type=int, default=Config.JOB_WORKERS, help="jobs run in parallel")
+    parser.add_argument('--once', action='store_true', help="exit when the queue is empty")
+    args = parser.parse_args()
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    print(f"Worker {job_runner.worker_id} running with {args.workers} workers. Press Ctrl+C to stop.")
+    try:
+        job_runner.run_forever(app, args.workers, once=args.once)
+    except KeyboardInterrupt:
+        print("Stopping, waiting for running jobs to finish...")
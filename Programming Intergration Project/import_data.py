@@ -52,7 +52,7 @@ with engine.begin() as connection:
 
     # NEW: Split Sales into Orders and OrderDetails
     orders_df = sales_df[["OrderID", "SaleDate"]].drop_duplicates()
-    order_details_df = sales_df[["OrderID", "ItemID", "ISBN"]]
+    order_details_df = sales_df[["OrderID", "ItemID", "ISBN", "SaleDate"]]
     
     # ----------------------
     # 🚀 Refresh + Push data
@@ -68,6 +68,7 @@ with engine.begin() as connection:
         "ratings": ratings_df,
         "award": award_df,
         "orders": orders_df,
+        "order_ids": orders_df[["OrderID"]],
         "orderdetails": order_details_df
     }
     
@@ -83,6 +84,9 @@ with engine.begin() as connection:
         except Exception as e:
             print(f"❌ Error processing '{table_name}': {e}")
     
+    # Archived OrderIDs stay taken
+    connection.execute(text("INSERT IGNORE INTO order_ids (OrderID) SELECT OrderID FROM orders_archive"))
+    
     # Re-enable foreign key checks
     connection.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
 